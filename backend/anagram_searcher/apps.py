@@ -1,6 +1,79 @@
+import logging
+import os
+import sys
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, connections
+from django.db.models.signals import post_migrate
+
+logger = logging.getLogger(__name__)
+
+INDEX_BUILD_MODES = ('startup', 'lazy', 'background')
+# Commands that only read or write the database: their processes neither build nor update the in-memory index, so
+# their memory does not grow with the corpus.
+DATABASE_COMMANDS = frozenset({
+    'dump_corpus_snapshot', 'export_corpus', 'import_corpus', 'load_words_from_file', 'serve_shared_index'
+})
+
+
+def _management_command():
+    """Name of the command run by ``manage.py``, ``django-admin`` or ``python -m django``, if any."""
+    if len(sys.argv) > 1 and os.path.basename(sys.argv[0]) in ('manage.py', 'django-admin', '__main__.py'):
+        return sys.argv[1]
+
+    return None
+
+
+def _load_index():
+    from backend.anagram_searcher.index import anagram_index
+
+    try:
+        anagram_index.load()
+    except DatabaseError:
+        logger.exception('Building the anagram index failed, it is built on first use instead')
+    finally:
+        connections.close_all()
 
 
 class AnagramSearcherConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.anagram_searcher'
+
+    def ready(self):
+        from backend.anagram_searcher.index import anagram_index
+        from backend.anagram_searcher.metrics import install_query_timer
+        from backend.anagram_searcher.models import Word
+        from backend.anagram_searcher.signals import rebuild_index_after_migrate
+
+        post_migrate.connect(rebuild_index_after_migrate, sender=self)
+        # Before any connection is opened, so request metrics see the queries of every thread.
+        install_query_timer()
+
+        build = settings.ANAGRAM_INDEX_BUILD
+
+        if build not in INDEX_BUILD_MODES:
+            raise ImproperlyConfigured(
+                f'ANAGRAM_INDEX_BUILD must be one of {", ".join(INDEX_BUILD_MODES)}, got {build!r}'
+            )
+
+        if _management_command() in DATABASE_COMMANDS:
+            anagram_index.disable()
+
+            return
+
+        if build != 'startup':
+            anagram_index.defer(Word.build_index)
+
+            if build == 'background':
+                threading.Thread(target=_load_index, name='anagram-index', daemon=True).start()
+
+            return
+
+        try:
+            Word.build_index()
+        except DatabaseError:
+            # The table does not exist yet, the index is built once migrations have run.
+            pass
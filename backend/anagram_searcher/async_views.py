@@ -0,0 +1,202 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+
+from backend.anagram_searcher.canonical import get_canonical_form
+from backend.anagram_searcher.grouping import describe_anagram_classes
+from backend.anagram_searcher.http_cache import response_cache
+from backend.anagram_searcher.index import anagram_index
+from backend.anagram_searcher.models import WordLengthCount
+from backend.anagram_searcher.serializers import LimitSerializer
+
+
+async def _ndjson_lines(objects):
+    for obj in objects:
+        yield json.dumps(obj) + '\n'
+
+
+def ndjson_response(objects):
+    """
+    Stream ``objects`` as newline-delimited JSON, like the sync views' ``ndjson_response``.
+
+    The content is an async iterator, so an ASGI server consumes it on the event loop instead of a thread.
+    """
+    return StreamingHttpResponse(_ndjson_lines(objects), content_type='application/x-ndjson')
+
+
+class AsyncAPIView(View):
+    """
+    Read endpoints with coroutine handlers, mounted under ``/async/``.
+
+    Under an ASGI server they run on the event loop: answers come from the in-memory index or the async
+    ORM, so a request never waits for a thread of the sync adapter's pool. GET responses go through
+    ``response_cache`` unless ``cached`` is false, as for views reading the database.
+
+    A deferred index is loaded, or waited for, in a thread first: loading queries the database and holds the
+    index lock, neither of which may happen on the event loop.
+    """
+
+    cached = True
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Like DRF's APIView, the API does not rely on session cookies.
+        view.csrf_exempt = True
+
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if not anagram_index.is_loaded:
+            await sync_to_async(anagram_index.load)()
+
+        if request.method != 'GET' or not self.cached:
+            return await super().dispatch(request, *args, **kwargs)
+
+        key, response = response_cache.lookup(request)
+
+        if response is not None:
+            return response
+
+        return response_cache.store(key, await super().dispatch(request, *args, **kwargs))
+
+    @staticmethod
+    def parse_body(request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+
+        return data if isinstance(data, dict) else None
+
+    @staticmethod
+    def wants_ndjson(request):
+        return request.GET.get('stream') == 'ndjson'
+
+    @staticmethod
+    def error(message, status=400):
+        return JsonResponse({'error': message}, status=status)
+
+
+class AsyncAnagramView(AsyncAPIView):
+    async def get(self, request, word):
+        limit = request.GET.get('limit')
+        include_proper_nouns = request.GET.get('include_proper_nouns', 'false').lower() == 'true'
+
+        anagrams = anagram_index.get_anagrams(
+            get_canonical_form(word),
+            exclude=word,
+            include_proper_nouns=include_proper_nouns,
+            limit=int(limit) if limit is not None else None
+        )
+
+        if self.wants_ndjson(request):
+            return ndjson_response({'word': anagram} for anagram in anagrams)
+
+        return JsonResponse({'anagrams': anagrams})
+
+
+class AsyncBulkAnagramView(AsyncAPIView):
+    async def post(self, request):
+        data = self.parse_body(request)
+
+        if data is None:
+            return self.error('Request body must be a JSON object')
+
+        words = data.get('words')
+
+        if not words:
+            return self.error('No words provided')
+
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            return self.error('words must be a list of strings')
+
+        query = LimitSerializer(data=data)
+
+        if not query.is_valid():
+            return self.error(query.errors)
+
+        include_proper_nouns = str(data.get('include_proper_nouns', 'false')).lower() == 'true'
+
+        anagrams = anagram_index.get_anagrams_of_words(
+            ((word, get_canonical_form(word)) for word in words),
+            include_proper_nouns=include_proper_nouns,
+            limit=query.validated_data.get('limit')
+        )
+
+        return JsonResponse({'anagrams': anagrams})
+
+
+class AsyncCorpusStatsView(AsyncAPIView):
+    cached = False
+
+    async def get(self, request):
+        include_proper_nouns = request.GET.get('include_proper_nouns', 'true').lower() == 'true'
+
+        return JsonResponse(await WordLengthCount.aget_stats(include_proper_nouns))
+
+
+class AsyncMostAnagramsView(AsyncAPIView):
+    async def get(self, request):
+        k = request.GET.get('k')
+        include_proper_nouns = request.GET.get('include_proper_nouns', 'true').lower() == 'true'
+
+        if k is not None and (not k.isdigit() or int(k) < 1):
+            return self.error('k must be a positive integer')
+
+        if not anagram_index.has_group_sizes:
+            # Bucketing every group, as after a snapshot reset, takes long enough to stall the event loop.
+            await sync_to_async(anagram_index.build_group_sizes)()
+
+        if self.wants_ndjson(request):
+            return ndjson_response(
+                {'canonical_form': canonical_form, 'count': len(group), 'words': group}
+                for canonical_form, group in anagram_index.get_largest_groups(
+                    int(k) if k is not None else None, include_proper_nouns
+                )
+            )
+
+        if k is None:
+            words = [
+                word
+                for _, group in anagram_index.get_largest_groups(include_proper_nouns=include_proper_nouns)
+                for word in group
+            ]
+
+            return JsonResponse({'words': words})
+
+        groups = [
+            {'canonical_form': canonical_form, 'count': len(group), 'words': group}
+            for canonical_form, group in anagram_index.get_largest_groups(int(k), include_proper_nouns)
+        ]
+
+        return JsonResponse({'groups': groups})
+
+
+class AsyncCheckAnagramsView(AsyncAPIView):
+    async def post(self, request):
+        data = self.parse_body(request)
+
+        if data is None:
+            return self.error('Request body must be a JSON object')
+
+        words = data.get('words', [])
+
+        if not words:
+            return self.error('No words provided')
+
+        if str(data.get('groups', 'false')).lower() != 'true':
+            canonical_forms = {get_canonical_form(word) for word in words}
+
+            return JsonResponse({'are_anagrams': len(canonical_forms) == 1})
+
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            return self.error('words must be a list of strings')
+
+        in_corpus = str(data.get('in_corpus', 'false')).lower() == 'true'
+        # Grouping a large batch takes long enough to stall every other request on the event loop.
+        describe = sync_to_async(describe_anagram_classes, thread_sensitive=False)
+
+        return JsonResponse(await describe(words, in_corpus))
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from urllib.parse import quote
+
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+
+from backend.anagram_searcher.ingest import ingest_queue
+from backend.anagram_searcher.load_test import LoadTestResult, run_requests
+from backend.anagram_searcher.models import Word
+
+CLIENT = 'client'
+SERVER = 'server'
+PERCENTILES = (50, 95, 99)
+SYNTHETIC_PREFIX = 'zzbench'
+
+
+class Scenario:
+    """
+    One endpoint exercised with ``requests(mode, n)``, a list of ``(method, path, body)``.
+
+    Scenarios that write to the corpus get their own words from ``setup`` so the reads are not disturbed.
+    The first ``warmup`` requests are sent but not measured, they pay for lazily built structures.
+    """
+
+    def __init__(self, name, requests, setup=None, max_requests=None, warmup=0):
+        self.name = name
+        self._requests = requests
+        self._setup = setup
+        self.max_requests = max_requests
+        self.warmup = warmup
+
+    def requests(self, mode, n):
+        n = min(n, self.max_requests or n)
+
+        if self._setup is not None:
+            self._setup(mode, n)
+
+        return self._requests(mode, n + self.warmup)
+
+
+def _json(data):
+    return json.dumps(data).encode()
+
+
+def _cycle(items, n):
+    return [items[i % len(items)] for i in range(n)]
+
+
+def _synthetic_words(mode, prefix, n):
+    return [f'{SYNTHETIC_PREFIX}{prefix}{mode}{i}' for i in range(n)]
+
+
+def build_scenarios(words, seed=0):
+    """Scenarios for every endpoint in ``config/urls.py``, reading words sampled from the corpus."""
+    rng = random.Random(seed)
+    samples = rng.sample(words, min(len(words), 1000))
+    racks = [word.lower() for word in samples if 7 <= len(word) <= 10 and word.isalpha()] or ['anagram']
+    quoted = [quote(word) for word in samples]
+
+    def add_words(prefix):
+        return lambda mode, n: Word.add_list_of_words(_synthetic_words(mode, prefix, n))
+
+    batch_ids = []
+
+    def submit_batches(mode, n):
+        batch_ids[:] = [ingest_queue.submit(_synthetic_words(mode, f'batch{i}x', 10)).id for i in range(n)]
+        # Status lookups are measured, not the writes, which the first lookups would otherwise wait for.
+        ingest_queue.flush()
+
+    read_scenarios = [
+        Scenario('anagrams', lambda mode, n: [
+            ('GET', f'/anagrams/{word}/', None) for word in _cycle(quoted, n)
+        ], warmup=1),
+        Scenario('anagrams_bulk', lambda mode, n: [
+            ('POST', '/anagrams/', _json({'words': _cycle(samples[i:] + samples[:i], 50)})) for i in range(n)
+        ], warmup=1),
+        Scenario('sub_anagrams', lambda mode, n: [
+            ('GET', f'/sub_anagrams/{rack}/?limit=50', None) for rack in _cycle(racks, n)
+        ], warmup=1),
+        Scenario('near_anagrams', lambda mode, n: [
+            ('GET', f'/near_anagrams/{word}/?limit=10', None) for word in _cycle(quoted, n)
+        ], warmup=1),
+        Scenario('pattern', lambda mode, n: [
+            ('GET', f'/pattern/{quote(rack[0] + "?" * (len(rack) - 2) + "*")}/?limit=50', None)
+            for rack in _cycle(racks, n)
+        ], warmup=1),
+        Scenario('phrase_anagrams', lambda mode, n: [
+            ('GET', f'/phrase_anagrams/{rack}/?max_results=10&time_budget_ms=100', None) for rack in _cycle(racks, n)
+        ], max_requests=50, warmup=1),
+        Scenario('corpus_stats', lambda mode, n: [('GET', '/corpus_stats/', None)] * n, warmup=1),
+        Scenario('most_anagrams', lambda mode, n: [
+            ('GET', f'/most_anagrams/?k={i % 10 + 1}', None) for i in range(n)
+        ], warmup=1),
+        Scenario('check_anagrams', lambda mode, n: [
+            ('POST', '/check_anagrams/', _json({'words': [samples[i % len(samples)], racks[i % len(racks)]]}))
+            for i in range(n)
+        ], warmup=1),
+        Scenario('anagram_group', lambda mode, n: [
+            ('GET', f'/anagram_group/{i % 5 + 2}/?limit=100&offset={i % 10 * 100}', None) for i in range(n)
+        ], warmup=1),
+        Scenario('metrics', lambda mode, n: [('GET', '/metrics', None)] * n, warmup=1),
+        Scenario('async_anagrams', lambda mode, n: [
+            ('GET', f'/async/anagrams/{word}/', None) for word in _cycle(quoted, n)
+        ], warmup=1),
+        Scenario('async_anagrams_bulk', lambda mode, n: [
+            ('POST', '/async/anagrams/', _json({'words': _cycle(samples[i:] + samples[:i], 50)})) for i in range(n)
+        ], warmup=1),
+        Scenario('async_corpus_stats', lambda mode, n: [('GET', '/async/corpus_stats/', None)] * n, warmup=1),
+        Scenario('async_most_anagrams', lambda mode, n: [
+            ('GET', f'/async/most_anagrams/?k={i % 10 + 1}', None) for i in range(n)
+        ], warmup=1),
+        Scenario('async_check_anagrams', lambda mode, n: [
+            ('POST', '/async/check_anagrams/', _json({'words': [samples[i % len(samples)], racks[i % len(racks)]]}))
+            for i in range(n)
+        ], warmup=1),
+    ]
+
+    write_scenarios = [
+        Scenario('add_words', lambda mode, n: [
+            ('POST', '/words/', _json({'words': _synthetic_words(mode, f'add{i}x', 10)})) for i in range(n)
+        ]),
+        Scenario('ingest_batch', lambda mode, n: [
+            ('GET', f'/words/batches/{batch_id}/?wait=1', None) for batch_id in _cycle(batch_ids, n)
+        ], setup=submit_batches),
+        Scenario('delete_word', lambda mode, n: [
+            ('DELETE', f'/words/{word}/', None) for word in _synthetic_words(mode, 'delete', n)
+        ], setup=add_words('delete')),
+        Scenario('delete_anagram_group', lambda mode, n: [
+            ('DELETE', f'/delete_word/{word}/', None) for word in _synthetic_words(mode, 'group', n)
+        ], setup=add_words('group')),
+        # Concurrent readers and writers: every fourth request adds words while the others look up anagrams.
+        Scenario('read_write', lambda mode, n: [
+            ('POST', '/words/', _json({'words': _synthetic_words(mode, f'mixed{i}x', 5)})) if i % 4 == 3
+            else ('GET', f'/anagrams/{quoted[i % len(quoted)]}/', None)
+            for i in range(n)
+        ]),
+    ]
+    # Runs once, last, it empties the corpus.
+    final_scenario = Scenario('delete_all_words', lambda mode, n: [('DELETE', '/words/', None)], max_requests=1)
+
+    return read_scenarios, write_scenarios, final_scenario
+
+
+class QueryCounter:
+    """
+    Counts SQL queries on every database connection, including the ones opened by server and ingest threads.
+
+    The wrapper stays on the connections it was installed on, so persistent connections opened while an earlier
+    counter was active are counted too.
+    """
+
+    _active = set()
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.count = 0
+
+    @classmethod
+    def _count(cls, execute, sql, params, many, context):
+        with cls._lock:
+            for counter in cls._active:
+                counter.count += 1
+
+        return execute(sql, params, many, context)
+
+    @classmethod
+    def _install(cls, connection, **kwargs):
+        if cls._count not in connection.execute_wrappers:
+            connection.execute_wrappers.append(cls._count)
+
+    def __enter__(self):
+        for connection in connections.all():
+            self._install(connection)
+
+        connection_created.connect(QueryCounter._install, dispatch_uid='anagram_searcher.benchmark')
+
+        with self._lock:
+            self._active.add(self)
+
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self._active.discard(self)
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    # Headers and body are sent separately, with Nagle's algorithm the body waits for a delayed ACK.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalServer:
+    """The WSGI application served by Django's threaded development server on a free local port."""
+
+    def __enter__(self):
+        self._server = ThreadedWSGIServer(('127.0.0.1', 0), QuietWSGIRequestHandler, allow_reuse_address=False)
+        self._server.set_app(get_wsgi_application())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self.url = f'http://127.0.0.1:{self._server.server_port}'
+
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+def run_with_client(requests):
+    client = Client()
+    result = LoadTestResult()
+    start = time.monotonic()
+
+    for method, path, body in requests:
+        started_at = time.perf_counter()
+        response = client.generic(method, path, body or b'', content_type='application/json')
+
+        if response.streaming:
+            b''.join(response.streaming_content)
+
+        result.latencies.append(time.perf_counter() - started_at)
+        result.statuses[response.status_code] += 1
+
+    result.elapsed = time.monotonic() - start
+
+    return result
+
+
+def run_scenario(scenario, mode, n, server=None, concurrency=1):
+    requests = scenario.requests(mode, n)
+
+    def run(requests):
+        if mode == CLIENT:
+            return run_with_client(requests)
+
+        return asyncio.run(run_requests(server.url, requests, concurrency=concurrency))
+
+    if scenario.warmup:
+        run(requests[:scenario.warmup])
+
+    with QueryCounter() as queries:
+        result = run(requests[scenario.warmup:])
+        # Queued ingest answers before storing, the queries of the stored words belong to this scenario.
+        ingest_queue.flush()
+
+    return summarize(scenario.name, mode, result, queries.count)
+
+
+def summarize(name, mode, result, queries):
+    errors = result.errors + sum(count for status, count in result.statuses.items() if status >= 400)
+    summary = {
+        'scenario': name,
+        'mode': mode,
+        'requests': result.requests,
+        'errors': errors,
+        'requests_per_second': round(result.requests_per_second, 1),
+        'queries_per_request': round(queries / result.requests, 2) if result.requests else None,
+    }
+
+    for p in PERCENTILES:
+        latency = result.percentile(p)
+        summary[f'p{p}_ms'] = round(latency * 1000, 3) if latency is not None else None
+
+    return summary
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare ``results`` with a previous run: slower p95, lower throughput or more queries per request than
+    the baseline allows by ``threshold`` (0.2 is 20%) are regressions.
+    """
+    previous = {(row['scenario'], row['mode']): row for row in baseline['results']}
+    regressions = []
+
+    for row in results:
+        base = previous.get((row['scenario'], row['mode']))
+
+        if base is None:
+            continue
+
+        checks = [
+            ('p95_ms', row['p95_ms'], base['p95_ms'], lambda new, old: new > old * (1 + threshold)),
+            ('requests_per_second', row['requests_per_second'], base['requests_per_second'],
+             lambda new, old: new < old * (1 - threshold)),
+            ('queries_per_request', row['queries_per_request'], base['queries_per_request'],
+             lambda new, old: new > old),
+        ]
+
+        for metric, new, old, regressed in checks:
+            if new is not None and old is not None and regressed(new, old):
+                regressions.append(f'{row["scenario"]} ({row["mode"]}): {metric} {old} -> {new}')
+
+    return regressions
@@ -0,0 +1,19 @@
+import re
+from hashlib import blake2b
+
+LOWERCASE_WORD = re.compile(r'[a-z]+')
+
+
+def get_canonical_form(word):
+    """Letters of ``word`` lowercased and sorted, shared by every word of an anagram class."""
+    return ''.join(sorted(word.lower()))
+
+
+def get_canonical_key(canonical_form):
+    """Signed 64-bit hash of a canonical form, stored next to it so lookups compare integers."""
+    return int.from_bytes(blake2b(canonical_form.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+def is_proper_noun(word):
+    """Words with anything but lowercase ASCII letters are treated as proper nouns."""
+    return LOWERCASE_WORD.fullmatch(word) is None
@@ -0,0 +1,146 @@
+import gzip
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections import namedtuple
+from itertools import accumulate
+
+MAGIC = b'ANAGCORP'
+VERSION = 1
+HEADER = struct.Struct('<8sH')
+BLOCK = struct.Struct('<II')
+# Words per block; blocks end on a group boundary, so a group is never split.
+BLOCK_WORDS = 65536
+
+CorpusBlock = namedtuple('CorpusBlock', 'canonical_forms canonical_keys sizes words proper_nouns')
+
+
+class CorpusFileError(Exception):
+    pass
+
+
+def _pack(values, typecode):
+    values = array(typecode, values)
+
+    if sys.byteorder == 'big':
+        values.byteswap()
+
+    return values.tobytes()
+
+
+def _pack_strings(strings):
+    encoded = [string.encode() for string in strings]
+
+    return _pack(map(len, encoded), 'H') + b''.join(encoded)
+
+
+def _write_block(file, groups):
+    words = [word for _, _, members in groups for word, _ in members]
+
+    file.write(BLOCK.pack(len(groups), len(words)))
+    file.write(_pack_strings(canonical_form for canonical_form, _, _ in groups))
+    file.write(_pack((canonical_key for _, canonical_key, _ in groups), 'q'))
+    file.write(_pack((len(members) for _, _, members in groups), 'I'))
+    file.write(_pack_strings(words))
+    file.write(bytes(proper_noun for _, _, members in groups for _, proper_noun in members))
+
+    return len(words)
+
+
+def write_corpus(path, groups):
+    """
+    Write ``(canonical_form, canonical_key, [(word, proper_noun), ...])`` groups to a gzip compressed corpus file.
+
+    The file is a header, then blocks of columns: group count and word count, the canonical forms, keys and sizes
+    of the groups, the words and one proper noun byte per word. Strings are UTF-8 with ``uint16`` length prefixes,
+    numbers little-endian. An empty block ends the file. It is written next to ``path`` and moved over it.
+    Returns the number of groups and words written.
+    """
+    tmp_path = f'{path}.tmp'
+    group_count = word_count = 0
+
+    with gzip.open(tmp_path, 'wb', compresslevel=6) as file:
+        file.write(HEADER.pack(MAGIC, VERSION))
+        block, block_words = [], 0
+
+        for canonical_form, canonical_key, members in groups:
+            block.append((canonical_form, canonical_key, members))
+            block_words += len(members)
+
+            if block_words >= BLOCK_WORDS:
+                word_count += _write_block(file, block)
+                group_count += len(block)
+                block, block_words = [], 0
+
+        if block:
+            word_count += _write_block(file, block)
+            group_count += len(block)
+
+        file.write(BLOCK.pack(0, 0))
+
+    os.replace(tmp_path, path)
+
+    return group_count, word_count
+
+
+def _read(file, size):
+    data = file.read(size)
+
+    if len(data) != size:
+        raise CorpusFileError('Corpus file is truncated')
+
+    return data
+
+
+def _unpack(file, typecode, count):
+    values = array(typecode)
+    values.frombytes(_read(file, values.itemsize * count))
+
+    if sys.byteorder == 'big':
+        values.byteswap()
+
+    return values
+
+
+def _unpack_strings(file, count):
+    lengths = _unpack(file, 'H', count)
+    data = _read(file, sum(lengths))
+    text = data.decode()
+    offsets = list(accumulate(lengths, initial=0))
+
+    if len(text) != len(data):
+        # Not ASCII: the lengths count bytes, not characters.
+        return [data[start:end].decode() for start, end in zip(offsets, offsets[1:])]
+
+    return [text[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+def read_corpus(path):
+    """Yield the ``CorpusBlock`` columns of a file written by ``write_corpus``."""
+    with gzip.open(path, 'rb') as file:
+        try:
+            magic, version = HEADER.unpack(file.read(HEADER.size))
+        except (OSError, struct.error):
+            raise CorpusFileError(f'{path} is not a corpus file')
+
+        if magic != MAGIC or version != VERSION:
+            raise CorpusFileError(f'{path} is not a version {VERSION} corpus file')
+
+        try:
+            while True:
+                group_count, word_count = BLOCK.unpack(_read(file, BLOCK.size))
+
+                if not group_count:
+                    return
+
+                yield CorpusBlock(
+                    _unpack_strings(file, group_count),
+                    _unpack(file, 'q', group_count),
+                    _unpack(file, 'I', group_count),
+                    _unpack_strings(file, word_count),
+                    _read(file, word_count),
+                )
+        except (EOFError, zlib.error):
+            raise CorpusFileError('Corpus file is truncated or corrupt')
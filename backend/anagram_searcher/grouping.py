@@ -0,0 +1,44 @@
+from backend.anagram_searcher.index import anagram_index
+
+
+def group_anagrams(words):
+    """
+    Partition ``words`` into anagram classes.
+
+    Returns ``(group_ids, canonical_forms)``: the class of each word, numbered in order of first appearance, and
+    the canonical form of each class.
+    """
+    # Same forms as get_canonical_form, with the lowercasing, sorting and joining of every word mapped in C.
+    forms = list(map(''.join, map(sorted, map(str.lower, words))))
+    canonical_forms = {}
+    group_ids = [canonical_forms.setdefault(form, len(canonical_forms)) for form in forms]
+
+    return group_ids, list(canonical_forms)
+
+
+def describe_anagram_classes(words, in_corpus=False):
+    """
+    Body of ``POST /check_anagrams/`` with ``"groups": true``: the class of each word and the members of each class,
+    plus whether each word is stored if ``in_corpus``.
+    """
+    group_ids, canonical_forms = group_anagrams(words)
+    members = [[] for _ in canonical_forms]
+
+    for word, group_id in zip(words, group_ids):
+        members[group_id].append(word)
+
+    data = {
+        'are_anagrams': len(canonical_forms) == 1,
+        'group_ids': group_ids,
+        'groups': [
+            {'id': group_id, 'canonical_form': canonical_form, 'size': len(group), 'words': group}
+            for group_id, (canonical_form, group) in enumerate(zip(canonical_forms, members))
+        ],
+    }
+
+    if in_corpus:
+        data['in_corpus'] = anagram_index.contains_words(
+            (word, canonical_forms[group_id]) for word, group_id in zip(words, group_ids)
+        )
+
+    return data
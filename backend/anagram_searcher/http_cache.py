@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+from backend.anagram_searcher.index import anagram_index
+
+
+class ResponseCache:
+    """
+    LRU cache of rendered GET responses keyed on (path, query, accepted type, corpus version).
+
+    The version is the one of this process's in-memory index, so only views answering from the index may be
+    cached: their responses are as fresh as the index they came from. A write through this process changes the
+    version and old entries are dropped as soon as a response for the new version is stored. Views reading the
+    database would keep serving, and 304-ing, what they read before another process wrote.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._responses = OrderedDict()
+        self._version = None
+
+    def __len__(self):
+        return len(self._responses)
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+    def lookup(self, request):
+        """
+        Return ``(key, response)``: a 304 when ``If-None-Match`` holds the current ETag, a copy of the cached
+        response, or ``None`` when the view has to run. ``key`` is passed on to ``store``.
+        """
+        version = anagram_index.version
+        key = (request.path, request.META.get('QUERY_STRING', ''), request.META.get('HTTP_ACCEPT', ''), version)
+
+        etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+
+        if '*' in etags or _etag(version) in etags:
+            return key, self._finalize(HttpResponseNotModified(), version)
+
+        with self._lock:
+            cached = self._responses.get(key)
+
+            if cached is not None:
+                self._responses.move_to_end(key)
+
+        if cached is None:
+            return key, None
+
+        content, content_type, headers = cached
+        response = HttpResponse(content, content_type=content_type, headers=headers)
+
+        return key, self._finalize(response, version)
+
+    def store(self, key, response):
+        """Add caching headers to ``response`` and keep a copy of it if it is a complete 200."""
+        version = key[-1]
+
+        if response.status_code != 200 or response.streaming:
+            return response
+
+        if hasattr(response, 'render'):
+            response.render()
+
+        max_size = settings.ANAGRAM_RESPONSE_CACHE_SIZE
+        headers = {name: value for name, value in response.items() if name.lower() != 'content-type'}
+
+        with self._lock:
+            if version != self._version:
+                self._responses.clear()
+                self._version = version
+
+            if max_size:
+                self._responses[key] = (response.content, response['Content-Type'], headers)
+
+                while len(self._responses) > max_size:
+                    self._responses.popitem(last=False)
+
+        return self._finalize(response, version)
+
+    @staticmethod
+    def _finalize(response, version):
+        response['ETag'] = _etag(version)
+        patch_cache_control(response, max_age=settings.ANAGRAM_CACHE_MAX_AGE)
+
+        return response
+
+
+def _etag(version):
+    return f'"{version}"'
+
+
+response_cache = ResponseCache()
+
+
+class CachedGetMixin:
+    """Serves GET requests of a DRF view answering from ``anagram_index`` through ``response_cache``."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return super().dispatch(request, *args, **kwargs)
+
+        key, response = response_cache.lookup(request)
+
+        if response is not None:
+            return response
+
+        return response_cache.store(key, super().dispatch(request, *args, **kwargs))
@@ -0,0 +1,656 @@
+import secrets
+import threading
+from bisect import bisect
+from contextlib import ExitStack, contextmanager
+from itertools import combinations_with_replacement, islice
+
+from backend.anagram_searcher.letter_counts import LetterCountIndex
+from backend.anagram_searcher.patterns import PatternIndex
+
+# Groups whose words are copied per hold of the lock by `iter_sub_anagram_groups`.
+GROUP_BATCH_SIZE = 1000
+
+
+def _common_size(group):
+    return sum(1 for proper_noun in group.values() if not proper_noun)
+
+
+def _letters(canonical_form):
+    """The letters of ``canonical_form``, without hyphens and other characters words may hold."""
+    return [c for c in canonical_form if c.isalpha()]
+
+
+class SizeBuckets:
+    """Canonical forms bucketed by group size, so the largest groups are listed without sorting."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._max_size = 0
+
+    def add(self, canonical_form, size):
+        if size:
+            self._buckets.setdefault(size, {})[canonical_form] = None
+            self._max_size = max(self._max_size, size)
+
+    def move(self, canonical_form, old_size, new_size):
+        if old_size == new_size:
+            return
+
+        if old_size:
+            bucket = self._buckets[old_size]
+            del bucket[canonical_form]
+
+            if not bucket:
+                del self._buckets[old_size]
+
+        self.add(canonical_form, new_size)
+
+        while self._max_size and self._max_size not in self._buckets:
+            self._max_size -= 1
+
+    def largest(self, k=None):
+        if k is None:
+            return list(self._buckets.get(self._max_size, ()))
+
+        return list(islice(
+            (
+                canonical_form
+                for size in range(self._max_size, 0, -1)
+                for canonical_form in self._buckets.get(size, ())
+            ),
+            k
+        ))
+
+
+class GroupSizes:
+    """
+    Groups bucketed by size, with and without their proper nouns.
+
+    Like the other search structures it is built in bulk, or starts out built and empty for an empty index, and then
+    follows every change.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    @property
+    def is_built(self):
+        return self._sizes is not None
+
+    @property
+    def is_stale(self):
+        return not self.is_built
+
+    def build(self, rows):
+        """Bucket ``(canonical_form, size, size without proper nouns)`` rows."""
+        self._sizes = SizeBuckets()
+        self._common_sizes = SizeBuckets()
+
+        for canonical_form, size, common_size in rows:
+            self._sizes.add(canonical_form, size)
+            self._common_sizes.add(canonical_form, common_size)
+
+    def clear(self):
+        self._sizes = self._common_sizes = None
+
+    def move(self, canonical_form, old_size, new_size, old_common_size, new_common_size):
+        if self.is_built:
+            self._sizes.move(canonical_form, old_size, new_size)
+            self._common_sizes.move(canonical_form, old_common_size, new_common_size)
+
+    def largest(self, k=None, include_proper_nouns=True):
+        return (self._sizes if include_proper_nouns else self._common_sizes).largest(k)
+
+
+class Alphabet:
+    """
+    Letters used by the corpus, probed by near-anagram and blank tile searches.
+
+    Letters are not dropped with the last form using them, probing an unused letter only misses.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    @property
+    def is_built(self):
+        return self._used_letters is not None
+
+    @property
+    def is_stale(self):
+        return not self.is_built
+
+    def build(self, canonical_forms):
+        self._used_letters = {letter for letter in set(''.join(canonical_forms)) if letter.isalpha()}
+
+    def clear(self):
+        self._used_letters = None
+
+    def add(self, canonical_form):
+        if self.is_built:
+            self._used_letters.update(_letters(canonical_form))
+
+    def sorted(self):
+        return sorted(self._used_letters)
+
+
+class AnagramIndex:
+    """
+    In-memory mirror of the ``Word`` table keyed by canonical form.
+
+    Each group maps its words (in insertion order) to their proper noun flag, so anagram
+    lookups, ``limit`` and ``include_proper_nouns`` are served without touching the database.
+    Groups are also bucketed by size, with and without their proper nouns, which keeps the "most anagrams"
+    leaderboard current on every write,
+    and indexed by letter counts for "words buildable from these letters" searches. Words are indexed by the letter
+    at each position for pattern searches. The letters used by the corpus are tracked for near-anagram and blank
+    tile searches.
+
+    Every change bumps ``version``, which HTTP caching uses to tell when responses go stale.
+
+    The index can sit on top of a memory-mapped ``CorpusSnapshot``: groups are then read from the
+    snapshot, and only the groups changed since it was opened are held in ``_groups`` (deleted ones
+    as empty dicts).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loader = None
+        self._loading = False
+        self._enabled = True
+        self._snapshot = None
+        self._groups = {}
+        self._word_count = 0
+        self._sizes = GroupSizes()
+        self._sizes.build(())
+        self._letter_counts = LetterCountIndex()
+        self._patterns = PatternIndex()
+        self._alphabet = Alphabet()
+        self._alphabet.build(())
+        # Changes made while a search structure is rebuilt outside the lock, see `_rebuild_if_stale`.
+        self._pending = {}
+        self._build_locks = {name: threading.Lock() for name in ('_sizes', '_letter_counts', '_patterns', '_alphabet')}
+        self._generation = secrets.token_hex(4)
+        self._shared_version = None
+        self._changes = 0
+
+    def __len__(self):
+        return self._word_count
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def version(self):
+        """
+        Token that changes whenever the indexed corpus does.
+
+        The generation is random per ``reset``, so versions are not reused by another process or after a restart.
+        An index reset with a shared ``version`` reports it until its first change, so processes serving the same
+        snapshot agree on ETags. A deferred index is loaded first, as the version describes its contents.
+        """
+        if not self.is_loaded:
+            self.load()
+
+        if self._shared_version is not None and not self._changes:
+            return self._shared_version
+
+        return f'{self._generation}-{self._changes}'
+
+    def reset(self, rows=(), snapshot=None, version=None):
+        with self._lock:
+            self._loader = None
+            self._enabled = True
+            self.clear()
+            self._generation = secrets.token_hex(4)
+            self._shared_version = version
+            self._changes = 0
+
+            if snapshot is not None:
+                self._snapshot = snapshot
+                self._word_count = snapshot.word_count
+                # Bucketing every group would copy the snapshot onto the heap, build the buckets on first use.
+                self._sizes.clear()
+                self._alphabet.clear()
+
+            self._add(rows)
+
+    def clear(self):
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot.close()
+
+            self._snapshot = None
+            self._groups = {}
+            self._word_count = 0
+            self._sizes.build(())
+            self._letter_counts.clear()
+            self._patterns.clear()
+            self._alphabet.build(())
+            self._pending = {}
+            self._changes += 1
+
+    def disable(self):
+        """
+        Drop the index and ignore further updates until the next ``reset``.
+
+        Used by processes that only write to the corpus, such as bulk loaders, so they do not hold a copy of it.
+        """
+        with self._lock:
+            self.clear()
+            self._loader = None
+            self._enabled = False
+
+    def defer(self, loader):
+        """
+        Fill the index with ``loader``, such as ``Word.build_index``, on first use instead of now.
+
+        Lookups and writes wait for it to finish. ``load`` runs it ahead of them, from a background thread for example.
+        """
+        with self._lock:
+            self._loader = loader
+
+    @property
+    def is_loaded(self):
+        """Whether the index can be used without running or waiting for the loader passed to ``defer``."""
+        return self._loader is None and not self._loading
+
+    def load(self):
+        """Run the loader passed to ``defer`` unless it has run already, or wait for it if it is running."""
+        with self._lock:
+            loader, self._loader = self._loader, None
+
+            if loader is None:
+                return
+
+            self._loading = True
+
+            try:
+                loader()
+            except BaseException:
+                # Tried again on next use.
+                self._loader = loader
+                raise
+            finally:
+                self._loading = False
+
+    @contextmanager
+    def _loaded(self):
+        with self._lock:
+            if self._loader is not None:
+                self.load()
+
+            yield
+
+    def _group(self, canonical_form):
+        group = self._groups.get(canonical_form)
+
+        if group is None and self._snapshot is not None:
+            group = self._snapshot.get_group(canonical_form)
+
+        return group
+
+    def _writable_group(self, canonical_form):
+        group = self._groups.get(canonical_form)
+
+        if group is None:
+            group = self._groups[canonical_form] = self._group(canonical_form) or {}
+
+        return group
+
+    def _discard_if_empty(self, canonical_form):
+        if not self._groups[canonical_form] and (self._snapshot is None or canonical_form not in self._snapshot):
+            del self._groups[canonical_form]
+
+    @staticmethod
+    def _iter_group_sizes(groups, snapshot):
+        """Yield ``(canonical_form, size, size without proper nouns)`` for the groups of ``groups`` and ``snapshot``."""
+        for canonical_form, group in groups.items():
+            if group:
+                yield canonical_form, len(group), _common_size(group)
+
+        if snapshot is not None:
+            for canonical_form, size, common_size in snapshot.iter_group_sizes():
+                if canonical_form not in groups:
+                    yield canonical_form, size, common_size
+
+    @staticmethod
+    def _iter_words(groups, snapshot):
+        """Yield ``(word, proper_noun)`` for the words of ``groups`` and ``snapshot``."""
+        for group in groups.values():
+            yield from group.items()
+
+        if snapshot is not None:
+            yield from snapshot.iter_words(exclude=groups)
+
+    def add(self, rows):
+        """Add ``(word, canonical_form, proper_noun)`` rows."""
+        with self._loaded():
+            self._add(rows)
+
+    def _add(self, rows):
+        if not self._enabled:
+            return
+
+        for word, canonical_form, proper_noun in rows:
+            group = self._writable_group(canonical_form)
+
+            if word in group:
+                continue
+
+            common_size = _common_size(group)
+            group[word] = proper_noun
+            self._update('_patterns', 'add', word, proper_noun)
+            self._word_count += 1
+            self._resize(canonical_form, len(group) - 1, len(group), common_size, common_size + (not proper_noun))
+
+    def remove_words(self, rows):
+        """Remove ``(word, canonical_form)`` pairs."""
+        with self._loaded():
+            for word, canonical_form in rows:
+                if word not in (self._group(canonical_form) or ()):
+                    continue
+
+                group = self._writable_group(canonical_form)
+                common_size = _common_size(group)
+                proper_noun = group.pop(word)
+                self._update('_patterns', 'remove', word)
+                self._word_count -= 1
+                self._resize(canonical_form, len(group) + 1, len(group), common_size, common_size - (not proper_noun))
+                self._discard_if_empty(canonical_form)
+
+    def remove_group(self, canonical_form):
+        with self._loaded():
+            group = self._group(canonical_form)
+
+            if not group:
+                return
+
+            self._groups[canonical_form] = {}
+            self._discard_if_empty(canonical_form)
+
+            for word in group:
+                self._update('_patterns', 'remove', word)
+
+            self._word_count -= len(group)
+            self._resize(canonical_form, len(group), 0, _common_size(group), 0)
+
+    def _resize(self, canonical_form, old_size, new_size, old_common_size, new_common_size):
+        self._changes += 1
+
+        if not old_size:
+            self._update('_letter_counts', 'add', canonical_form)
+            self._update('_alphabet', 'add', canonical_form)
+
+        if not new_size:
+            self._update('_letter_counts', 'remove', canonical_form)
+
+        self._update('_sizes', 'move', canonical_form, old_size, new_size, old_common_size, new_common_size)
+
+    def _update(self, name, method, *args):
+        """Apply a change to the search structure ``name``, and record it for a rebuild in progress."""
+        getattr(getattr(self, name), method)(*args)
+        pending = self._pending.get(name)
+
+        if pending is not None:
+            pending.append((method, args))
+
+    def _rebuild_if_stale(self, name, rows):
+        """
+        Rebuild the search structure ``name`` when it is stale, without holding the lock.
+
+        ``rows(groups, snapshot)`` reads what it is built from. Building takes about a second on a large corpus. Only
+        reading the groups held in memory holds the lock: a snapshot never changes, so it is read afterwards, kept
+        mapped by ``CorpusSnapshot.reading`` even if the index is reset meanwhile. Changes made from then on are
+        recorded by ``_update`` and replayed on the new structure before it is swapped in, unless the index was
+        cleared. Until then other lookups use the stale structure, which checks its changes directly, and only wait
+        for a first build.
+        """
+        build_lock = self._build_locks[name]
+
+        if not build_lock.acquire(blocking=not getattr(self, name).is_built):
+            return
+
+        try:
+            with ExitStack() as stack:
+                with self._loaded():
+                    structure = getattr(self, name)
+
+                    if not structure.is_stale:
+                        return
+
+                    built_from = list(rows(self._groups, None))
+                    snapshot = self._snapshot
+
+                    if snapshot is not None:
+                        stack.enter_context(snapshot.reading())
+                        # The changed forms, with empty groups: they add no rows but hide their forms in the snapshot.
+                        changed = dict.fromkeys(self._groups, {})
+
+                    pending = self._pending[name] = []
+
+                if snapshot is not None:
+                    built_from.extend(rows(changed, snapshot))
+
+            rebuilt = type(structure)()
+            rebuilt.build(built_from)
+
+            with self._lock:
+                if self._pending.get(name) is not pending:
+                    return
+
+                for method, args in pending:
+                    getattr(rebuilt, method)(*args)
+
+                setattr(self, name, rebuilt)
+                del self._pending[name]
+        finally:
+            build_lock.release()
+
+    def _built(self, name, rows):
+        """The search structure ``name``, built under the lock only if the index was reset since it was rebuilt."""
+        structure = getattr(self, name)
+
+        if not structure.is_built:
+            structure.build(rows(self._groups, self._snapshot))
+
+        return structure
+
+    def get_anagrams(self, canonical_form, exclude=None, include_proper_nouns=False, limit=None):
+        with self._loaded():
+            return self._get_anagrams(canonical_form, exclude, include_proper_nouns, limit)
+
+    def contains_words(self, words):
+        """Whether each ``(word, canonical_form)`` pair is in the corpus, looked up under one lock."""
+        with self._loaded():
+            return [word in (self._group(canonical_form) or ()) for word, canonical_form in words]
+
+    def get_anagrams_of_words(self, words, include_proper_nouns=False, limit=None):
+        """Anagrams of each ``(word, canonical_form)`` pair, looked up in a single pass under one lock."""
+        with self._loaded():
+            return {
+                word: self._get_anagrams(canonical_form, word, include_proper_nouns, limit)
+                for word, canonical_form in words
+            }
+
+    def _get_anagrams(self, canonical_form, exclude, include_proper_nouns, limit):
+        group = self._group(canonical_form)
+
+        if not group:
+            return []
+
+        words = (
+            word for word, proper_noun in group.items()
+            if word != exclude and (include_proper_nouns or not proper_noun)
+        )
+
+        return list(islice(words, limit))
+
+    def get_sub_anagrams(self, letters, min_length=1, include_proper_nouns=False, limit=None):
+        """Words that can be built from the multiset ``letters``, longest first."""
+        self._rebuild_letter_counts_if_stale()
+
+        with self._loaded():
+            words = (
+                word
+                for _, group in self._iter_sub_anagram_groups(letters, min_length, include_proper_nouns)
+                for word in group
+            )
+
+            return list(islice(words, limit))
+
+    def iter_sub_anagram_groups(self, letters, min_length=1, include_proper_nouns=False):
+        """
+        Yield ``(canonical_form, words)`` pairs of every group that can be built from ``letters``.
+
+        Nothing is read before the first pair is asked for. The lock is held while the canonical forms are found,
+        then their words are copied ``GROUP_BATCH_SIZE`` groups at a time, so other lookups run in between.
+        """
+        self._rebuild_letter_counts_if_stale()
+
+        with self._loaded():
+            letter_counts = self._built('_letter_counts', self._iter_canonical_forms)
+            canonical_forms = list(letter_counts.find(letters, min_length))
+
+        for i in range(0, len(canonical_forms), GROUP_BATCH_SIZE):
+            with self._lock:
+                groups = [
+                    (canonical_form, [
+                        word for word, proper_noun in (self._group(canonical_form) or {}).items()
+                        if include_proper_nouns or not proper_noun
+                    ])
+                    for canonical_form in canonical_forms[i:i + GROUP_BATCH_SIZE]
+                ]
+
+            for canonical_form, words in groups:
+                if words:
+                    yield canonical_form, words
+
+    @staticmethod
+    def _iter_canonical_forms(groups, snapshot):
+        """Yield the canonical form of every group, in the order of ``_iter_group_sizes``."""
+        for canonical_form, group in groups.items():
+            if group:
+                yield canonical_form
+
+        if snapshot is not None:
+            for canonical_form in snapshot.iter_canonical_forms():
+                if canonical_form not in groups:
+                    yield canonical_form
+
+    def _rebuild_letter_counts_if_stale(self):
+        self._rebuild_if_stale('_letter_counts', self._iter_canonical_forms)
+
+    def _iter_sub_anagram_groups(self, letters, min_length, include_proper_nouns):
+        letter_counts = self._built('_letter_counts', self._iter_canonical_forms)
+
+        for canonical_form in letter_counts.find(letters, min_length):
+            words = [
+                word for word, proper_noun in self._group(canonical_form).items()
+                if include_proper_nouns or not proper_noun
+            ]
+
+            if words:
+                yield canonical_form, words
+
+    def get_near_anagrams(self, canonical_form, include_proper_nouns=False, limit=None):
+        """
+        Groups one letter away from ``canonical_form``, as ``(added, removed)`` dicts of letter to words.
+
+        Forms with a letter removed are looked up directly, forms with a letter added are probed for each letter
+        of the corpus: at most ``len(canonical_form)`` plus alphabet size lookups, without scanning groups. Other
+        characters, such as hyphens, are kept but never added or removed.
+        """
+        self._rebuild_alphabet_if_stale()
+
+        with self._loaded():
+            added = {}
+            removed = {}
+
+            for letter in self._sorted_alphabet():
+                position = bisect(canonical_form, letter)
+                words = self._get_anagrams(
+                    canonical_form[:position] + letter + canonical_form[position:], None, include_proper_nouns, limit
+                )
+
+                if words:
+                    added[letter] = words
+
+            for letter in sorted(set(_letters(canonical_form))):
+                words = self._get_anagrams(canonical_form.replace(letter, '', 1), None, include_proper_nouns, limit)
+
+                if words:
+                    removed[letter] = words
+
+            return added, removed
+
+    def get_blank_anagrams(self, letters, blanks, include_proper_nouns=False, limit=None):
+        """
+        Anagrams of ``letters`` plus ``blanks`` letters of any kind, like blank tiles in a word game.
+
+        Each multiset of letters of the corpus the blanks can stand for is one group lookup, so a search costs
+        ``C(alphabet + blanks - 1, blanks)`` lookups: 26 for one blank over ``dictionary.txt``, 351 for two. Blanks
+        only stand for letters, not for hyphens.
+        """
+        self._rebuild_alphabet_if_stale()
+
+        with self._loaded():
+            canonical_forms = (
+                ''.join(sorted(letters + ''.join(blank_letters)))
+                for blank_letters in combinations_with_replacement(self._sorted_alphabet(), blanks)
+            )
+            words = (
+                word
+                for canonical_form in canonical_forms
+                for word in self._get_anagrams(canonical_form, None, include_proper_nouns, None)
+            )
+
+            return list(islice(words, limit))
+
+    def get_pattern_matches(self, pattern, include_proper_nouns=False, limit=None):
+        """Words matching ``pattern``, where ``?`` stands for one letter and ``*`` for any number, shortest first."""
+        self._rebuild_if_stale('_patterns', self._iter_words)
+
+        with self._loaded():
+            patterns = self._built('_patterns', self._iter_words)
+
+            return list(islice(patterns.find(pattern.lower(), include_proper_nouns), limit))
+
+    def _rebuild_alphabet_if_stale(self):
+        self._rebuild_if_stale('_alphabet', self._iter_canonical_forms)
+
+    def _sorted_alphabet(self):
+        return self._built('_alphabet', self._iter_canonical_forms).sorted()
+
+    @property
+    def has_group_sizes(self):
+        """Whether ``get_largest_groups`` can answer without bucketing every group first, as after a snapshot reset."""
+        return self._sizes.is_built
+
+    def build_group_sizes(self):
+        """Bucket the groups by size for ``get_largest_groups`` if they are not, outside the lock."""
+        self._rebuild_if_stale('_sizes', self._iter_group_sizes)
+
+    def get_largest_groups(self, k=None, include_proper_nouns=True):
+        """
+        Return ``(canonical_form, words)`` pairs of the ``k`` largest groups, largest first.
+
+        Without ``k`` every group tied for the largest size is returned. Without ``include_proper_nouns``
+        groups are ranked and listed by their common words only.
+        """
+        self.build_group_sizes()
+
+        with self._loaded():
+            sizes = self._built('_sizes', self._iter_group_sizes)
+
+            return [
+                (canonical_form, [
+                    word for word, proper_noun in self._group(canonical_form).items()
+                    if include_proper_nouns or not proper_noun
+                ])
+                for canonical_form in sizes.largest(k, include_proper_nouns)
+            ]
+
+
+anagram_index = AnagramIndex()
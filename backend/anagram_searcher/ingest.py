@@ -0,0 +1,188 @@
+import atexit
+import logging
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from itertools import chain
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+DONE = 'done'
+FAILED = 'failed'
+
+# Finished batches whose status can still be looked up.
+MAX_FINISHED_BATCHES = 10000
+# How long the queue is drained for when the process exits.
+EXIT_FLUSH_TIMEOUT = 30
+
+
+class IngestBatch:
+    def __init__(self, words):
+        self.id = uuid.uuid4().hex
+        self.words = words
+        self.status = QUEUED
+        self.error = None
+        self._finished = threading.Event()
+
+    def finish(self, error=None):
+        self.status = DONE if error is None else FAILED
+        self.error = error
+        self._finished.set()
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    def as_dict(self):
+        data = {'id': self.id, 'status': self.status, 'words': len(self.words)}
+
+        if self.error is not None:
+            data['error'] = self.error
+
+        return data
+
+
+class IngestQueue:
+    """
+    Words accepted by ``POST /words/`` in queued ingest mode, written by one background thread.
+
+    The worker takes every batch queued by the time it is free, up to ``ANAGRAM_INGEST_BATCH_SIZE`` words, and
+    stores them with a single ``Word.add_list_of_words``: one transaction and one index update for many requests.
+    Batches only live in the process that accepted them, and queued words are lost if the process is killed.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = OrderedDict()
+        self._pending = 0
+        self._worker = None
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def submit(self, words):
+        batch = IngestBatch(words)
+
+        with self._lock:
+            self._batches[batch.id] = batch
+            self._pending += 1
+
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='anagram-ingest', daemon=True)
+                self._worker.start()
+                atexit.register(self.flush, EXIT_FLUSH_TIMEOUT)
+
+        self._queue.put(batch)
+
+        return batch
+
+    def get(self, batch_id):
+        with self._lock:
+            return self._batches.get(batch_id)
+
+    def flush(self, timeout=None):
+        """Wait until every batch submitted so far is written, returns whether they all were within ``timeout``."""
+        with self._lock:
+            batches = [batch for batch in self._batches.values() if batch.status == QUEUED]
+
+        return all(batch.wait(timeout) for batch in batches)
+
+    def _run(self):
+        while True:
+            batches = [self._queue.get()]
+            size = len(batches[0].words)
+
+            while size < settings.ANAGRAM_INGEST_BATCH_SIZE:
+                try:
+                    batch = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                batches.append(batch)
+                size += len(batch.words)
+
+            close_old_connections()
+
+            try:
+                self._write(batches)
+            finally:
+                close_old_connections()
+
+    def _write(self, batches):
+        from backend.anagram_searcher.models import Word
+
+        try:
+            Word.add_list_of_words(list(chain.from_iterable(batch.words for batch in batches)))
+        except Exception as e:
+            if len(batches) > 1:
+                # Write them one by one, so one bad batch does not fail the others.
+                for batch in batches:
+                    self._write([batch])
+
+                return
+
+            logger.exception('Ingest batch %s failed', batches[0].id)
+            self._finish(batches, str(e))
+        else:
+            self._finish(batches)
+
+    def _finish(self, batches, error=None):
+        with self._lock:
+            for batch in batches:
+                batch.finish(error)
+
+            self._pending -= len(batches)
+            finished = len(self._batches) - self._pending
+
+            for batch_id in list(self._batches):
+                if finished <= MAX_FINISHED_BATCHES:
+                    break
+
+                if self._batches[batch_id].status != QUEUED:
+                    del self._batches[batch_id]
+                    finished -= 1
+
+
+ingest_queue = IngestQueue()
+
+
+class FlushIngestMiddleware:
+    """
+    With ``ANAGRAM_INGEST_FLUSH_ON_READ``, GET and HEAD requests wait for the queued words to be written, so every
+    read sees the writes accepted before it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _should_flush(self, request):
+        return settings.ANAGRAM_INGEST_FLUSH_ON_READ and request.method in ('GET', 'HEAD') and ingest_queue.pending
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        if self._should_flush(request):
+            ingest_queue.flush()
+
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self._should_flush(request):
+            await sync_to_async(ingest_queue.flush, thread_sensitive=False)()
+
+        return await self.get_response(request)
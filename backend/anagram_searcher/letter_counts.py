@@ -0,0 +1,117 @@
+from collections import Counter
+
+REBUILD_THRESHOLD = 2048
+
+
+def bitset(ids, size):
+    bits = bytearray((size + 7) // 8)
+
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+
+    return int.from_bytes(bits, 'little')
+
+
+def set_bits(bitset):
+    bits = bin(bitset)[:1:-1]
+    i = bits.find('1')
+
+    while i != -1:
+        yield i
+        i = bits.find('1', i + 1)
+
+
+class LetterCountIndex:
+    """
+    Per-letter bitsets over canonical forms answering "which forms fit in this multiset of letters".
+
+    Bit ``i`` of ``at_least[(letter, n)]`` is set when form ``i`` holds ``letter`` at least ``n`` times, so
+    the forms that need more of some letter than a rack has are the union of ``len(alphabet)`` bitsets.
+    Building is done in bulk; forms added or removed afterwards are kept aside and checked directly until
+    there are enough of them to make a rebuild worthwhile.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    @property
+    def is_built(self):
+        return self._canonical_forms is not None
+
+    @property
+    def is_stale(self):
+        return not self.is_built or len(self._added) + len(self._removed) > REBUILD_THRESHOLD
+
+    def build(self, canonical_forms):
+        # Ordering forms by length makes every length a contiguous run of ids, so queries only
+        # look at the slice of each bitset covering the lengths they accept.
+        self._canonical_forms = sorted(canonical_forms, key=len, reverse=True)
+        self._ids = {canonical_form: i for i, canonical_form in enumerate(self._canonical_forms)}
+        self._added = {}
+        self._removed = set()
+
+        at_least = {}
+        lengths = {}
+
+        for i, canonical_form in enumerate(self._canonical_forms):
+            start, end = lengths.get(len(canonical_form), (i, i))
+            lengths[len(canonical_form)] = (start, end + 1)
+            previous, n = None, 0
+
+            for letter in canonical_form:
+                n = n + 1 if letter == previous else 1
+                previous = letter
+                at_least.setdefault((letter, n), []).append(i)
+
+        size = len(self._canonical_forms)
+        self._at_least = {key: bitset(ids, size) for key, ids in at_least.items()}
+        self._lengths = lengths
+
+    def clear(self):
+        self._canonical_forms = None
+        self._ids = {}
+        self._at_least = {}
+        self._lengths = {}
+        self._added = {}
+        self._removed = set()
+
+    def add(self, canonical_form):
+        if canonical_form in self._ids:
+            self._removed.discard(canonical_form)
+        elif self.is_built:
+            self._added[canonical_form] = None
+
+    def remove(self, canonical_form):
+        if canonical_form in self._added:
+            del self._added[canonical_form]
+        elif canonical_form in self._ids:
+            self._removed.add(canonical_form)
+
+    def find(self, letters, min_length=1):
+        """Yield canonical forms buildable from ``letters``, longest first."""
+        rack = Counter(letters)
+        too_many = 0
+
+        for (letter, n), bitset in self._at_least.items():
+            if n == rack[letter] + 1:
+                too_many |= bitset
+
+        added = [
+            canonical_form for canonical_form in self._added
+            if min_length <= len(canonical_form) <= len(letters) and not Counter(canonical_form) - rack
+        ]
+
+        for length in range(len(letters), min_length - 1, -1):
+            yield from (canonical_form for canonical_form in added if len(canonical_form) == length)
+
+            if length not in self._lengths:
+                continue
+
+            start, end = self._lengths[length]
+            fitting = ~too_many >> start & ((1 << end - start) - 1)
+
+            for i in set_bits(fitting):
+                canonical_form = self._canonical_forms[start + i]
+
+                if canonical_form not in self._removed:
+                    yield canonical_form
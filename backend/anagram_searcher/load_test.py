@@ -0,0 +1,150 @@
+import asyncio
+import math
+import time
+from itertools import repeat
+from collections import Counter
+from urllib.parse import urlsplit
+
+ERROR_BACKOFF = 0.01
+
+
+class LoadTestResult:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+        self.elapsed = 0
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    @property
+    def requests_per_second(self):
+        return self.requests / self.elapsed if self.elapsed else 0
+
+    def percentile(self, p):
+        """Nearest-rank percentile of the request latencies, in seconds."""
+        if not self.latencies:
+            return None
+
+        latencies = sorted(self.latencies)
+
+        return latencies[max(math.ceil(p / 100 * len(latencies)), 1) - 1]
+
+
+def build_request(url, method='GET', body=None):
+    parts = urlsplit(url)
+    path = parts.path or '/'
+
+    if parts.query:
+        path = f'{path}?{parts.query}'
+
+    headers = [
+        f'{method} {path} HTTP/1.1',
+        f'Host: {parts.netloc}',
+        'Connection: keep-alive',
+    ]
+
+    if body is not None:
+        headers += ['Content-Type: application/json', f'Content-Length: {len(body)}']
+
+    return '\r\n'.join(headers).encode() + b'\r\n\r\n' + (body or b'')
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+
+    if not status_line:
+        raise ConnectionError('Connection closed by the server')
+
+    status = int(status_line.split()[1])
+    length, chunked, close = None, False, False
+
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.strip().lower(), value.strip().lower()
+
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding':
+            chunked = 'chunked' in value
+        elif name == 'connection':
+            close = value == 'close'
+
+    if chunked:
+        while size := int((await reader.readline()).split(b';')[0], 16):
+            await reader.readexactly(size + 2)
+
+        while await reader.readline() not in (b'\r\n', b''):
+            pass
+    elif length is not None:
+        await reader.readexactly(length)
+    else:
+        await reader.read()
+        close = True
+
+    return status, close
+
+
+async def _worker(host, port, requests, deadline, timeout, result):
+    writer = None
+
+    # ``requests`` is shared by every worker, each takes the next request when its connection is free.
+    for request in requests:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+
+        close = False
+
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+
+            start = time.perf_counter()
+            writer.write(request)
+            status, close = await asyncio.wait_for(_read_response(reader), timeout)
+            result.latencies.append(time.perf_counter() - start)
+            result.statuses[status] += 1
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            result.errors += 1
+            close = True
+            await asyncio.sleep(ERROR_BACKOFF)
+
+        if close and writer is not None:
+            writer.close()
+            writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def run_load_test(url, concurrency=100, duration=10, method='GET', body=None, timeout=10):
+    """
+    Request ``url`` for ``duration`` seconds over ``concurrency`` keep-alive connections, each sending its
+    next request as soon as the previous response is read.
+    """
+    return await _run(url, repeat(build_request(url, method, body)), concurrency, duration, timeout)
+
+
+async def run_requests(base_url, requests, concurrency=1, timeout=10):
+    """Send every ``(method, path, body)`` of ``requests`` once, over ``concurrency`` keep-alive connections."""
+    raw_requests = iter([build_request(base_url + path, method, body) for method, path, body in requests])
+
+    return await _run(base_url, raw_requests, concurrency, None, timeout)
+
+
+async def _run(url, requests, concurrency, duration, timeout):
+    parts = urlsplit(url)
+    result = LoadTestResult()
+    start = time.monotonic()
+    deadline = start + duration if duration is not None else None
+
+    await asyncio.gather(*(
+        _worker(parts.hostname, parts.port or 80, requests, deadline, timeout, result)
+        for _ in range(concurrency)
+    ))
+
+    result.elapsed = time.monotonic() - start
+
+    return result
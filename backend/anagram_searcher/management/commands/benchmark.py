@@ -0,0 +1,153 @@
+import json
+import logging
+import platform
+import time
+from io import StringIO
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from backend.anagram_searcher.benchmark import (
+    CLIENT, PERCENTILES, SERVER, SYNTHETIC_PREFIX, LocalServer, build_scenarios, find_regressions, run_scenario
+)
+from backend.anagram_searcher.models import Word
+
+
+class Command(BaseCommand):
+    help = (
+        'Load a dictionary into a fresh database and benchmark every endpoint through the test client and a local '
+        'server, reporting latency percentiles, throughput and SQL queries per request'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dictionary', default='dictionary.txt', help='Words loaded into the database (default: dictionary.txt)'
+        )
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario and mode (default: 200)')
+        parser.add_argument(
+            '--concurrency', type=int, default=4, help='Connections to the local server (default: 4)'
+        )
+        parser.add_argument(
+            '--mode', choices=[CLIENT, SERVER], action='append',
+            help='Only run through the test client or the local server (default: both)'
+        )
+        parser.add_argument('--output', default='benchmark.json', help='JSON results (default: benchmark.json)')
+        parser.add_argument('--baseline', help='JSON results of a previous run to compare with')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Allowed p95 and throughput change against the baseline before failing (default: 0.2)'
+        )
+        parser.add_argument(
+            '--response-cache', action='store_true',
+            help='Keep the GET response cache enabled, repeated queries then measure cache hits'
+        )
+        parser.add_argument(
+            '--keepdb', action='store_true', help='Keep the benchmark database, and reuse it if already loaded'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed used to sample words from the corpus')
+
+    def handle(self, *args, **options):
+        baseline = None
+
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline {options["baseline"]}: {e}')
+
+        modes = options['mode'] or [CLIENT, SERVER]
+        old_name = connection.settings_dict['NAME']
+
+        if connection.vendor == 'sqlite' and not connection.settings_dict['TEST']['NAME']:
+            # A file, unlike the default in-memory test database, is shared by the server threads.
+            connection.settings_dict['TEST']['NAME'] = 'benchmark.sqlite3'
+
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        # Failed requests are counted as errors, their tracebacks would bury the report.
+        request_logger = logging.getLogger('django.request')
+        request_logger.disabled = True
+
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=['testserver', '127.0.0.1'],
+                **({} if options['response_cache'] else {'ANAGRAM_RESPONSE_CACHE_SIZE': 0})
+            ):
+                report = self._run(modes, options)
+        finally:
+            request_logger.disabled = False
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+
+        self.stdout.write(f'Wrote {options["output"]}')
+
+        if baseline is not None:
+            regressions = find_regressions(report['results'], baseline, options['threshold'])
+
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    def _run(self, modes, options):
+        load_seconds = None
+
+        if not Word.objects.exists():
+            started_at = time.monotonic()
+            call_command('load_words_from_file', options['dictionary'], stdout=StringIO())
+            load_seconds = round(time.monotonic() - started_at, 2)
+            self.stdout.write(f'Loaded {options["dictionary"]} in {load_seconds}s')
+
+        Word.build_index()
+
+        words = list(Word.objects.values_list('word', flat=True))
+        read_scenarios, write_scenarios, final_scenario = build_scenarios(words, options['seed'])
+        results = []
+
+        self._header()
+
+        with LocalServer() as server:
+            for scenarios in (read_scenarios, write_scenarios):
+                for mode in modes:
+                    for scenario in scenarios:
+                        results.append(run_scenario(
+                            scenario, mode, options['requests'], server=server, concurrency=options['concurrency']
+                        ))
+                        self._row(results[-1])
+
+        # Leave the corpus as it was loaded, so --keepdb databases can be reused.
+        Word.delete_words(Word.objects.filter(word__startswith=SYNTHETIC_PREFIX))
+
+        with transaction.atomic():
+            results.append(run_scenario(final_scenario, CLIENT, 1))
+            self._row(results[-1])
+            transaction.set_rollback(True)
+
+        Word.build_index()
+
+        return {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'words': len(words),
+            'load_seconds': load_seconds,
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'response_cache': options['response_cache'],
+            'results': results,
+        }
+
+    def _header(self):
+        columns = ['scenario', 'mode', 'requests', 'errors', 'req/s'] + [f'p{p} ms' for p in PERCENTILES] + ['queries']
+        self.stdout.write(f'{columns[0]:<22}{columns[1]:<8}' + ''.join(f'{column:>10}' for column in columns[2:]))
+
+    def _row(self, row):
+        values = [row['requests'], row['errors'], row['requests_per_second']]
+        values += [row[f'p{p}_ms'] for p in PERCENTILES] + [row['queries_per_request']]
+        self.stdout.write(f'{row["scenario"]:<22}{row["mode"]:<8}' + ''.join(f'{value:>10}' for value in values))
@@ -0,0 +1,74 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.anagram_searcher.startup_benchmark import GUNICORN, WSGIREF, run_startup_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Start fresh worker processes with each settings module, profiling the import of config.wsgi with '
+        '`python -X importtime` and timing the first response of a server'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'settings_modules', nargs='*', default=['config.settings_production', 'config.settings_api'],
+            help='Settings modules to compare (default: config.settings_production config.settings_api)'
+        )
+        parser.add_argument(
+            '--path', default='/anagrams/read/', help='Path of the first request (default: /anagrams/read/)'
+        )
+        parser.add_argument('--runs', type=int, default=3, help='Processes started per measurement (default: 3)')
+        parser.add_argument(
+            '--server', choices=[WSGIREF, GUNICORN], default=WSGIREF,
+            help='Server serving config.wsgi for the first response (default: wsgiref)'
+        )
+        parser.add_argument(
+            '--env', action='append', default=[], metavar='NAME=VALUE',
+            help='Environment variable of the started processes, e.g. ANAGRAM_INDEX_BUILD=startup'
+        )
+        parser.add_argument('--top', type=int, default=10, help='Slowest imports listed (default: 10)')
+        parser.add_argument('--output', help='Also write the results as JSON')
+
+    def handle(self, *args, **options):
+        env = {}
+
+        for variable in options['env']:
+            name, sep, value = variable.partition('=')
+
+            if not sep:
+                raise CommandError(f'{variable} is not NAME=VALUE')
+
+            env[name] = value
+
+        results = []
+
+        for settings_module in options['settings_modules']:
+            try:
+                result = run_startup_benchmark(
+                    settings_module, options['path'], runs=options['runs'], server=options['server'], env=env,
+                    top=options['top']
+                )
+            except RuntimeError as e:
+                raise CommandError(str(e))
+
+            results.append(result)
+
+            self.stdout.write(settings_module + ''.join(f' {name}={value}' for name, value in env.items()))
+            self.stdout.write(
+                f'  import config.wsgi: {result["import_wall_time"] * 1000:.0f}ms in a fresh process, '
+                f'{result["import_time"] * 1000:.0f}ms of imports'
+            )
+            self.stdout.write(
+                f'  first response to GET {options["path"]}: {result["first_response"] * 1000:.0f}ms '
+                f'({options["server"]}, statuses: {", ".join(map(str, result["statuses"]))})'
+            )
+            self.stdout.write('  slowest imports (self, cumulative):')
+
+            for i in result['slowest_imports']:
+                self.stdout.write(f'    {i["module"]}: {i["self"] * 1000:.1f}ms, {i["cumulative"] * 1000:.1f}ms')
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2)
@@ -0,0 +1,41 @@
+import os
+import time
+from itertools import groupby
+from operator import itemgetter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.anagram_searcher.corpus_file import write_corpus
+from backend.anagram_searcher.models import Word
+
+EXPORT_CHUNK_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = 'Export the corpus with its canonical forms to a compressed file that import_corpus loads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='corpus.gz', help='File to write (default: corpus.gz)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        started_at = time.monotonic()
+
+        rows = Word.objects.order_by('canonical_form', 'id').values_list(
+            'canonical_form', 'canonical_key', 'word', 'is_proper_noun'
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        groups = (
+            (canonical_form, canonical_key, [(word, proper_noun) for _, _, word, proper_noun in members])
+            for (canonical_form, canonical_key), members in groupby(rows, key=itemgetter(0, 1))
+        )
+
+        try:
+            group_count, word_count = write_corpus(path, groups)
+        except OSError as e:
+            raise CommandError(f'Cannot write {path}: {e}')
+
+        elapsed = time.monotonic() - started_at
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {word_count} words in {group_count} groups to {path} '
+            f'({os.path.getsize(path) / 1024 / 1024:.1f} MiB) in {elapsed:.2f}s ({word_count / elapsed:.0f} words/s)'
+        ))
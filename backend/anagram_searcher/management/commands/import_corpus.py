@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend.anagram_searcher.corpus_file import CorpusFileError, read_corpus
+from backend.anagram_searcher.models import Word
+
+
+class Command(BaseCommand):
+    help = 'Load a corpus written by export_corpus in one transaction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='corpus.gz', help='File to read (default: corpus.gz)')
+        parser.add_argument('--replace', action='store_true', help='Delete the current corpus first')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        started_at = time.monotonic()
+
+        try:
+            with transaction.atomic():
+                if Word.objects.exists():
+                    if not options['replace']:
+                        raise CommandError('The corpus is not empty, pass --replace to delete it first')
+
+                    Word.delete_all_words()
+
+                word_count = Word.import_corpus_blocks(read_corpus(path))
+        except (OSError, CorpusFileError) as e:
+            raise CommandError(f'Cannot import {path}: {e}')
+
+        elapsed = time.monotonic() - started_at
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {word_count} words from {path} in {elapsed:.2f}s ({word_count / elapsed:.0f} words/s)'
+        ))
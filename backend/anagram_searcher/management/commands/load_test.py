@@ -0,0 +1,45 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.anagram_searcher.load_test import run_load_test
+
+
+class Command(BaseCommand):
+    help = 'Load test running servers over many concurrent keep-alive connections, e.g. a WSGI and an ASGI server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='URLs to test one after another')
+        parser.add_argument('--concurrency', type=int, default=100, help='Open connections (default: 100)')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per URL (default: 10)')
+        parser.add_argument('--method', default='GET', help='HTTP method (default: GET)')
+        parser.add_argument('--data', help='JSON request body')
+        parser.add_argument('--timeout', type=float, default=10, help='Seconds before a request fails (default: 10)')
+
+    def handle(self, *args, **options):
+        body = options['data'].encode() if options['data'] is not None else None
+
+        for url in options['urls']:
+            if not url.startswith('http://'):
+                raise CommandError(f'{url} is not an http:// URL')
+
+            result = asyncio.run(run_load_test(
+                url,
+                concurrency=options['concurrency'],
+                duration=options['duration'],
+                method=options['method'].upper(),
+                body=body,
+                timeout=options['timeout']
+            ))
+
+            self.stdout.write(f'{options["method"].upper()} {url}, {options["concurrency"]} connections')
+            self.stdout.write(
+                f'  {result.requests} requests in {result.elapsed:.1f}s ({result.requests_per_second:.0f} req/s), '
+                f'{result.errors} errors, statuses: '
+                + ', '.join(f'{status}={count}' for status, count in sorted(result.statuses.items()))
+            )
+
+            if result.requests:
+                self.stdout.write('  latency ms: ' + ', '.join(
+                    f'p{p} {result.percentile(p) * 1000:.1f}' for p in (50, 95, 99)
+                ) + f', max {max(result.latencies) * 1000:.1f}')
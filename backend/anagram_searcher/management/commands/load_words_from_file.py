@@ -1,13 +1,85 @@
-from django.core.management.base import BaseCommand
+import os
+import sys
+import time
+from itertools import islice
 
-from backend.anagram_searcher.models import Word
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend.anagram_searcher.models import Word, WordLoadCheckpoint
+
+STDIN = '-'
 
 
 class Command(BaseCommand):
-    help = 'Load words from a text file into the database'
+    help = 'Load words from a text file (or stdin) into the database in resumable batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='dictionary.txt',
+            help='File with one word per line, "-" reads from stdin (default: dictionary.txt)'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Lines committed per transaction')
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Skip the lines committed by a previous run of the same source'
+        )
+        parser.add_argument(
+            '--checkpoint', help='Name the progress is stored under (default: absolute path of the file, or "-")'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        batch_size = options['batch_size']
+
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive number')
+
+        source = options['checkpoint'] or (STDIN if path == STDIN else os.path.abspath(path))
+        checkpoint, _ = WordLoadCheckpoint.objects.get_or_create(source=source)
+
+        if not options['resume']:
+            checkpoint.lines_committed = 0
+
+        try:
+            file = sys.stdin if path == STDIN else open(path, 'r')
+        except OSError as e:
+            raise CommandError(f'Cannot open {path}: {e}')
+
+        with file:
+            self._load(file, checkpoint, batch_size)
+
+    def _load(self, file, checkpoint, batch_size):
+        lines = iter(file)
+        skipped = sum(1 for _ in islice(lines, checkpoint.lines_committed))
+
+        if skipped:
+            self.stdout.write(f'Resuming {checkpoint.source} after {skipped} lines')
+
+        started_at = time.monotonic()
+        loaded = 0
+
+        while batch := list(islice(lines, batch_size)):
+            words = [word for word in (line.rstrip('\r\n') for line in batch) if word]
+
+            with transaction.atomic():
+                checkpoint.lines_committed += len(batch)
+                checkpoint.save()
+                Word.add_list_of_words(words)
+
+            loaded += len(batch)
+            self.stdout.write(
+                f'Committed {checkpoint.lines_committed} lines ({self._rate(loaded, started_at):.0f} rows/s)'
+            )
+
+        checkpoint.save()
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {loaded} lines from {checkpoint.source} in {time.monotonic() - started_at:.2f}s '
+            f'({self._rate(loaded, started_at):.0f} rows/s)'
+        ))
 
-    def handle(self, *args, **kwargs):
-        with open('dictionary.txt', 'r') as file:
-            words = file.read().splitlines()
+    @staticmethod
+    def _rate(rows, started_at):
+        elapsed = time.monotonic() - started_at
 
-        Word.add_list_of_words(words)
+        return rows / elapsed if elapsed else 0
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.anagram_searcher.shared_index import SharedIndexControl, publish_generation
+from backend.anagram_searcher.snapshot import SnapshotError
+
+
+class Command(BaseCommand):
+    help = 'Publish the corpus as shared snapshot generations for workers, and a new one after every write'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default=settings.ANAGRAM_SHARED_INDEX or 'corpus.index',
+            help='Control file the workers read (default: ANAGRAM_SHARED_INDEX or corpus.index)'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=0.05, help='Seconds between checks for new writes (default: 0.05)'
+        )
+        parser.add_argument('--once', action='store_true', help='Publish one generation and exit')
+
+    def handle(self, *args, **options):
+        try:
+            control = SharedIndexControl(options['path'], create=True)
+        except (OSError, SnapshotError) as e:
+            raise CommandError(f'Cannot open {options["path"]}: {e}')
+
+        try:
+            self._publish(control)
+
+            while not options['once']:
+                state = control.read()
+
+                if state.requested_write > state.published_write:
+                    self._publish(control)
+                else:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            control.close()
+
+    def _publish(self, control):
+        started_at = time.monotonic()
+        generation, words = publish_generation(control)
+
+        self.stdout.write(
+            f'Published generation {generation} with {words} words in {time.monotonic() - started_at:.2f}s'
+        )
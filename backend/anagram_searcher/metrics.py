@@ -0,0 +1,259 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from backend.anagram_searcher.index import anagram_index
+
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+HISTOGRAMS = {
+    'anagram_request_duration_seconds': ('Wall time of requests until the response body is sent', DURATION_BUCKETS),
+    'anagram_request_db_queries': ('SQL queries run per request', QUERY_BUCKETS),
+    'anagram_request_db_duration_seconds': ('Time per request spent executing SQL queries', DURATION_BUCKETS),
+    'anagram_response_size_bytes': ('Size of response bodies', SIZE_BUCKETS),
+}
+
+_current_request = ContextVar('anagram_request_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('started_at', 'queries', 'db_time')
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class Metrics:
+    """Per-view histograms and request counters, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._histograms = {name: {} for name in HISTOGRAMS}
+            self._requests = Counter()
+
+    def observe(self, view, method, status, duration, queries, db_time, size):
+        labels = (('view', view), ('method', method))
+        values = (
+            ('anagram_request_duration_seconds', duration),
+            ('anagram_request_db_queries', queries),
+            ('anagram_request_db_duration_seconds', db_time),
+            ('anagram_response_size_bytes', size),
+        )
+
+        with self._lock:
+            for name, value in values:
+                histogram = self._histograms[name].get(labels)
+
+                if histogram is None:
+                    histogram = self._histograms[name][labels] = Histogram(HISTOGRAMS[name][1])
+
+                histogram.observe(value)
+
+            self._requests[labels + (('status', str(status)),)] += 1
+
+    def render(self):
+        lines = [
+            '# HELP anagram_requests_total Requests by view, method and status code.',
+            '# TYPE anagram_requests_total counter',
+        ]
+
+        with self._lock:
+            for labels, count in sorted(self._requests.items()):
+                lines.append(f'anagram_requests_total{_format_labels(labels)} {count}')
+
+            for name, histograms in self._histograms.items():
+                lines += [f'# HELP {name} {HISTOGRAMS[name][0]}.', f'# TYPE {name} histogram']
+
+                for labels, histogram in sorted(histograms.items()):
+                    cumulative = 0
+
+                    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_format_labels(labels + (("le", str(bound)),))} {cumulative}')
+
+                    lines.append(f'{name}_sum{_format_labels(labels)} {histogram.sum}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+
+        lines += [
+            '# HELP anagram_index_words Words held by the in-memory anagram index of this process.',
+            '# TYPE anagram_index_words gauge',
+            f'anagram_index_words {len(anagram_index)}',
+        ]
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def _time_query(execute, sql, params, many, context):
+    stats = _current_request.get()
+
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started_at = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started_at
+
+
+def _install_query_timer(connection, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def install_query_timer():
+    """
+    Time the queries of every connection, including those of other threads.
+
+    Queries are attributed to the request through a context variable, which ``sync_to_async`` carries into
+    the thread that runs the ORM for async views.
+    """
+    for connection in connections.all(initialized_only=True):
+        _install_query_timer(connection)
+
+    connection_created.connect(_install_query_timer, dispatch_uid='anagram_searcher.metrics')
+
+
+def get_view_label(request):
+    match = getattr(request, 'resolver_match', None)
+
+    if match is None:
+        return 'unmatched'
+
+    return getattr(match.func, 'view_class', match.func).__name__
+
+
+class MetricsMiddleware:
+    """
+    Records wall time, SQL query count and time, and response size of every request, labeled by view class.
+
+    With ``ANAGRAM_SERVER_TIMING`` the same numbers are sent back in a ``Server-Timing`` header. Streamed
+    responses are observed once their last chunk is sent.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+        install_query_timer()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+        return self._finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current_request.set(stats)
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+        return self._finish(request, response, stats)
+
+    def _finish(self, request, response, stats):
+        observe = self._observer(request, response, stats)
+
+        if settings.ANAGRAM_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={stats.db_time * 1000:.3f};desc="{stats.queries} queries", '
+                f'total;dur={(time.perf_counter() - stats.started_at) * 1000:.3f}'
+            )
+
+        if not response.streaming:
+            observe(len(response.content))
+        elif getattr(response, 'is_async', False):
+            response.streaming_content = self._measure_async_stream(response.streaming_content, observe)
+        else:
+            response.streaming_content = self._measure_stream(response.streaming_content, observe)
+
+        return response
+
+    @staticmethod
+    def _observer(request, response, stats):
+        view, method, status = get_view_label(request), request.method, response.status_code
+
+        def observe(size):
+            metrics.observe(
+                view, method, status, time.perf_counter() - stats.started_at, stats.queries, stats.db_time, size
+            )
+
+        return observe
+
+    @staticmethod
+    def _measure_stream(content, observe):
+        size = 0
+
+        try:
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            observe(size)
+
+    @staticmethod
+    async def _measure_async_stream(content, observe):
+        size = 0
+
+        try:
+            async for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            observe(size)
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:49
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Length
+
+
+def build_length_histogram(apps, schema_editor):
+    Word = apps.get_model('anagram_searcher', 'Word')
+    WordLengthCount = apps.get_model('anagram_searcher', 'WordLengthCount')
+
+    WordLengthCount.objects.bulk_create([
+        WordLengthCount(length=row['length'], count=row['count'])
+        for row in Word.objects.values(length=Length('word')).annotate(count=Count('id')).order_by('length')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anagram_searcher', '0002_word_load_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordLengthCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('length', models.PositiveIntegerField(unique=True)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(build_length_histogram, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:50
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_anagram_groups(apps, schema_editor):
+    Word = apps.get_model('anagram_searcher', 'Word')
+    AnagramGroup = apps.get_model('anagram_searcher', 'AnagramGroup')
+
+    AnagramGroup.objects.bulk_create(
+        (
+            AnagramGroup(canonical_form=row['canonical_form'], count=row['count'])
+            for row in Word.objects.values('canonical_form').annotate(count=Count('id')).order_by('canonical_form')
+        ),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anagram_searcher', '0003_word_length_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnagramGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('canonical_form', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['count', 'canonical_form'], name='anagram_sea_count_529fd9_idx')],
+            },
+        ),
+        migrations.RunPython(build_anagram_groups, migrations.RunPython.noop),
+    ]
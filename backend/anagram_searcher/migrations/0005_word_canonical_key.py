@@ -0,0 +1,57 @@
+# Generated by Django 4.2.13 on 2026-10-18 15:02
+
+from django.db import migrations, models
+from django.db.models import Count
+
+from backend.anagram_searcher.canonical import get_canonical_form, get_canonical_key
+
+BATCH_SIZE = 1000
+
+
+def recompute_canonical_forms(apps, schema_editor):
+    Word = apps.get_model('anagram_searcher', 'Word')
+    AnagramGroup = apps.get_model('anagram_searcher', 'AnagramGroup')
+
+    quote_name = schema_editor.quote_name
+    update = 'UPDATE {} SET {} = %s, {} = %s WHERE {} = %s'.format(
+        quote_name(Word._meta.db_table), quote_name('canonical_form'), quote_name('canonical_key'), quote_name('id')
+    )
+    rows = Word.objects.order_by('id').values_list('id', 'word')
+    last_id = 0
+
+    # bulk_update() builds a CASE per column, a plain executemany() is an order of magnitude faster here.
+    while batch := list(rows.filter(id__gt=last_id)[:BATCH_SIZE]):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(update, [
+                (canonical_form, get_canonical_key(canonical_form), pk)
+                for pk, canonical_form in ((pk, get_canonical_form(word)) for pk, word in batch)
+            ])
+
+        last_id = batch[-1][0]
+
+    # Mixed-case words used to get a different canonical form, so groups may have merged.
+    AnagramGroup.objects.all().delete()
+    AnagramGroup.objects.bulk_create(
+        (
+            AnagramGroup(canonical_form=row['canonical_form'], count=row['count'])
+            for row in Word.objects.values('canonical_form').annotate(count=Count('id')).order_by('canonical_form')
+        ),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anagram_searcher', '0004_anagram_group'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='word',
+            name='canonical_key',
+            field=models.BigIntegerField(db_index=True, default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(recompute_canonical_forms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.13 on 2026-10-18 16:10
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Length
+
+from backend.anagram_searcher.canonical import is_proper_noun
+
+BATCH_SIZE = 1000
+
+
+def classify_words(apps, schema_editor):
+    Word = apps.get_model('anagram_searcher', 'Word')
+    WordLengthCount = apps.get_model('anagram_searcher', 'WordLengthCount')
+    AnagramGroup = apps.get_model('anagram_searcher', 'AnagramGroup')
+
+    quote_name = schema_editor.quote_name
+    update = 'UPDATE {} SET {} = %s WHERE {} = %s'.format(
+        quote_name(Word._meta.db_table), quote_name('is_proper_noun'), quote_name('id')
+    )
+    rows = Word.objects.order_by('id').values_list('id', 'word')
+    last_id = 0
+
+    # The column defaults to false, so only proper nouns need writing.
+    while batch := list(rows.filter(id__gt=last_id)[:BATCH_SIZE]):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(update, [(True, pk) for pk, word in batch if is_proper_noun(word)])
+
+        last_id = batch[-1][0]
+
+    common_words = Word.objects.filter(is_proper_noun=False).order_by()
+
+    WordLengthCount.objects.update(common_count=0)
+    AnagramGroup.objects.update(common_count=0)
+
+    for row in common_words.values(length=Length('word')).annotate(count=Count('id')):
+        WordLengthCount.objects.filter(length=row['length']).update(common_count=row['count'])
+
+    update = 'UPDATE {} SET {} = %s WHERE {} = %s'.format(
+        quote_name(AnagramGroup._meta.db_table), quote_name('common_count'), quote_name('canonical_form')
+    )
+    groups = common_words.values_list('canonical_form').annotate(count=Count('id')).values_list(
+        'count', 'canonical_form'
+    )
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(update, list(groups))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anagram_searcher', '0005_word_canonical_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='word',
+            name='is_proper_noun',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='wordlengthcount',
+            name='common_count',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='anagramgroup',
+            name='common_count',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='anagramgroup',
+            index=models.Index(fields=['common_count', 'canonical_form'], name='anagram_sea_common__d8b12e_idx'),
+        ),
+        migrations.RunPython(classify_words, migrations.RunPython.noop),
+    ]
@@ -1,16 +1,553 @@
-from django.db import models
+import csv
+import io
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from itertools import accumulate, chain, repeat
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import Length
+
+from backend.anagram_searcher.canonical import get_canonical_form, get_canonical_key, is_proper_noun
+from backend.anagram_searcher.index import anagram_index
+from backend.anagram_searcher.shared_index import shared_index
+from backend.anagram_searcher.snapshot import CorpusSnapshot, SnapshotError
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_BATCH_SIZE = 500
+WORD_FIELDS = ['word', 'canonical_form', 'canonical_key', 'is_proper_noun']
+
+
+def _copy(cursor, table, columns, rows):
+    """Stream ``rows`` into ``table`` with PostgreSQL's ``COPY``."""
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    copy_sql = f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)'
+
+    if is_psycopg3:
+        with cursor.copy(copy_sql) as copy:
+            copy.write(buffer.getvalue())
+    else:
+        cursor.copy_expert(copy_sql, buffer)
+
+
+def _insert_rows(cursor, model, fields, rows, ignore_conflicts=False):
+    """
+    Insert ``rows`` of ``fields`` values in bulk, without building model instances.
+
+    ``ignore_conflicts`` skips rows violating a unique constraint. ``COPY`` cannot, so it is not used then.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(model._meta.get_field(field).column) for field in fields)
+
+    if connection.vendor == 'postgresql' and not ignore_conflicts:
+        _copy(cursor, table, columns, rows)
+    else:
+        cursor.executemany(
+            f'INSERT INTO {table} ({columns}) VALUES ({", ".join(["%s"] * len(fields))})'
+            + (' ON CONFLICT DO NOTHING' if ignore_conflicts else ''),
+            rows
+        )
+
+
+@contextmanager
+def deferred_indexes(*models):
+    """
+    Drop the secondary indexes of ``models`` and create them again on exit, so a bulk load does not update them row
+    by row. Indexes backing unique constraints stay. Meant for a transaction, which restores them on errors.
+    """
+    with connection.cursor() as cursor:
+        indexes = []
+
+        for model in models:
+            if connection.vendor == 'sqlite':
+                # Indexes created for constraints have no SQL.
+                cursor.execute(
+                    "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND sql IS NOT NULL",
+                    [model._meta.db_table]
+                )
+            elif connection.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s '
+                    'AND indexname NOT IN (SELECT conname FROM pg_constraint)',
+                    [model._meta.db_table]
+                )
+            else:
+                continue
+
+            indexes += cursor.fetchall()
+
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+
+    yield
+
+    with connection.cursor() as cursor:
+        for _, sql in indexes:
+            cursor.execute(sql)
 
 
 class Word(models.Model):
     word = models.CharField(max_length=100, unique=True)
     canonical_form = models.CharField(max_length=100, db_index=True)
+    canonical_key = models.BigIntegerField(db_index=True)
+    is_proper_noun = models.BooleanField(default=False, db_index=True)
+
+    def save(self, *args, **kwargs):
+        # Derived from the word on every save, a value set by the caller could disagree with it.
+        self.canonical_form = get_canonical_form(self.word)
+        self.canonical_key = get_canonical_key(self.canonical_form)
+        self.is_proper_noun = is_proper_noun(self.word)
+
+        if self._state.adding:
+            # New words are counted by the post_save signal.
+            return super().save(*args, **kwargs)
+
+        row = (self.word, self.canonical_form, self.is_proper_noun)
+
+        with transaction.atomic():
+            stored = Word.objects.filter(pk=self.pk).values_list('word', 'canonical_form', 'is_proper_noun').first()
+            super().save(*args, **kwargs)
+
+            if stored in (None, row):
+                return
+
+            # The word moves between length, group and proper noun counts.
+            Word.count_removed_words([stored])
+            Word.count_added_words([row])
+
+        shared_index.count_write()
+        anagram_index.remove_words([stored[:2]])
+        anagram_index.add([row])
+
+    @staticmethod
+    def build(word):
+        return Word(**dict(zip(WORD_FIELDS, Word.build_row(word))))
+
+    @staticmethod
+    def build_row(word):
+        """Values of ``WORD_FIELDS`` for ``word``."""
+        canonical_form = get_canonical_form(word)
+
+        return word, canonical_form, get_canonical_key(canonical_form), is_proper_noun(word)
+
+    @staticmethod
+    def filter_canonical_form(canonical_form):
+        # The integer key is what the index narrows on, the form only guards against hash collisions.
+        return Word.objects.filter(canonical_key=get_canonical_key(canonical_form), canonical_form=canonical_form)
 
     @staticmethod
     def add_list_of_words(words):
         if not words:
             return
 
-        Word.objects.bulk_create(
-            [Word(word=word, canonical_form=''.join(sorted(word)).lower()) for word in words],
-            ignore_conflicts=True
-        )
\ No newline at end of file
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                new_rows = Word._copy_new_words(words)
+            else:
+                new_rows = [Word.build_row(word) for word in Word._filter_new_words(words)]
+
+                with connection.cursor() as cursor:
+                    _insert_rows(cursor, Word, WORD_FIELDS, new_rows, ignore_conflicts=True)
+
+            new_words = [(word, canonical_form, proper_noun) for word, canonical_form, _, proper_noun in new_rows]
+            Word.count_added_words(new_words)
+
+        shared_index.count_write()
+        anagram_index.add(new_words)
+
+    @staticmethod
+    def _filter_new_words(words):
+        words = list(dict.fromkeys(words))
+        existing = set()
+
+        for i in range(0, len(words), LOOKUP_BATCH_SIZE):
+            existing.update(
+                Word.objects.filter(word__in=words[i:i + LOOKUP_BATCH_SIZE]).values_list('word', flat=True)
+            )
+
+        return [word for word in words if word not in existing]
+
+    @staticmethod
+    def _copy_new_words(words):
+        """
+        Store ``words`` on PostgreSQL with ``COPY`` into a temporary table and one ``INSERT ... ON CONFLICT``.
+
+        Returns the ``WORD_FIELDS`` rows of the words that were not stored yet, as reported by the insert itself, so
+        concurrent loads of the same words count each of them once.
+        """
+        new_rows = {word: Word.build_row(word) for word in words}
+        table = connection.ops.quote_name(Word._meta.db_table)
+        columns = ', '.join(WORD_FIELDS)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMPORARY TABLE anagram_searcher_word_staging ('
+                'position serial, word varchar(100), canonical_form varchar(100), canonical_key bigint, '
+                'is_proper_noun boolean)'
+            )
+
+            _copy(cursor, 'anagram_searcher_word_staging', columns, new_rows.values())
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) SELECT {columns} FROM anagram_searcher_word_staging '
+                f'ORDER BY position ON CONFLICT (word) DO NOTHING RETURNING word'
+            )
+            inserted = {word for word, in cursor.fetchall()}
+            cursor.execute('DROP TABLE anagram_searcher_word_staging')
+
+        return [row for word, row in new_rows.items() if word in inserted]
+
+    @staticmethod
+    def count_added_words(words):
+        """Count ``(word, canonical_form, is_proper_noun)`` rows of new words in the summary tables."""
+        lengths, canonical_forms = Word._tally(
+            (len(word), canonical_form, proper_noun, 1) for word, canonical_form, proper_noun in words
+        )
+
+        WordLengthCount.increment(*lengths)
+        AnagramGroup.increment(*canonical_forms)
+
+    @staticmethod
+    def count_removed_words(words):
+        """Remove ``(word, canonical_form, is_proper_noun)`` rows of deleted words from the summary tables."""
+        lengths, canonical_forms = Word._tally(
+            (len(word), canonical_form, proper_noun, 1) for word, canonical_form, proper_noun in words
+        )
+
+        WordLengthCount.decrement(*lengths)
+        AnagramGroup.decrement(*canonical_forms)
+
+    @staticmethod
+    def _tally(rows):
+        """
+        Sum ``(length, canonical_form, is_proper_noun, count)`` rows per length and per canonical form.
+
+        Each sum is a pair of counters: every word, and common words only.
+        """
+        lengths, common_lengths = Counter(), Counter()
+        canonical_forms, common_canonical_forms = Counter(), Counter()
+
+        for length, canonical_form, proper_noun, count in rows:
+            lengths[length] += count
+            canonical_forms[canonical_form] += count
+
+            if not proper_noun:
+                common_lengths[length] += count
+                common_canonical_forms[canonical_form] += count
+
+        return (lengths, common_lengths), (canonical_forms, common_canonical_forms)
+
+    @staticmethod
+    def _delete(queryset):
+        """Delete ``queryset`` in one statement, returns the number of words deleted and their canonical forms."""
+        with transaction.atomic():
+            rows = queryset.order_by().values_list(
+                Length('word'), 'canonical_form', 'is_proper_noun'
+            ).annotate(count=Count('id'))
+            lengths, canonical_forms = Word._tally(rows)
+
+            # Words have no cascades or delete signals, so nothing needs the rows collected before deleting them.
+            deleted = queryset._raw_delete(queryset.db)
+            WordLengthCount.decrement(*lengths)
+            AnagramGroup.decrement(*canonical_forms)
+
+        shared_index.count_write()
+
+        return deleted, canonical_forms[0]
+
+    @staticmethod
+    def delete_word(word):
+        deleted, canonical_forms = Word._delete(Word.objects.filter(word=word))
+        anagram_index.remove_words((word, canonical_form) for canonical_form in canonical_forms)
+
+        return deleted
+
+    @staticmethod
+    def delete_words(queryset):
+        """Delete the words of ``queryset`` from the corpus and the index, returns the number of words deleted."""
+        with transaction.atomic():
+            rows = list(queryset.values_list('word', 'canonical_form'))
+            deleted, _ = Word._delete(queryset)
+
+        anagram_index.remove_words(rows)
+
+        return deleted
+
+    @staticmethod
+    def delete_anagram_group(canonical_form):
+        deleted, _ = Word._delete(Word.filter_canonical_form(canonical_form))
+        anagram_index.remove_group(canonical_form)
+
+        return deleted
+
+    @staticmethod
+    def delete_all_words():
+        """Empty the corpus with ``TRUNCATE`` (``DELETE`` without a condition on SQLite), returns the words deleted."""
+        with transaction.atomic():
+            deleted = WordLengthCount.objects.aggregate(total=Sum('count'))['total'] or 0
+            connection.ops.execute_sql_flush(connection.ops.sql_flush(
+                no_style(), [model._meta.db_table for model in (Word, WordLengthCount, AnagramGroup)]
+            ))
+
+        shared_index.count_write()
+        anagram_index.clear()
+
+        return deleted
+
+    @staticmethod
+    def import_corpus_blocks(blocks):
+        """
+        Store the ``CorpusBlock`` columns of a corpus file into empty tables, returns the number of words stored.
+
+        Rows are inserted in bulk (``COPY`` on PostgreSQL) with the secondary indexes dropped until the end, and the
+        summary tables are filled from the group sizes of the file, so no canonical form is derived again. Run it in
+        a transaction: the corpus then appears all at once, and a failed import leaves the tables untouched.
+        """
+        lengths, common_lengths = Counter(), Counter()
+        words = 0
+
+        with deferred_indexes(Word, AnagramGroup, WordLengthCount), connection.cursor() as cursor:
+            for block in blocks:
+                ends = list(accumulate(block.sizes))
+                proper_nouns = [bool(proper_noun) for proper_noun in block.proper_nouns]
+
+                _insert_rows(cursor, Word, WORD_FIELDS, zip(
+                    block.words,
+                    chain.from_iterable(map(repeat, block.canonical_forms, block.sizes)),
+                    chain.from_iterable(map(repeat, block.canonical_keys, block.sizes)),
+                    proper_nouns
+                ))
+                _insert_rows(cursor, AnagramGroup, ['canonical_form', 'count', 'common_count'], (
+                    (canonical_form, size, size - sum(block.proper_nouns[end - size:end]))
+                    for canonical_form, size, end in zip(block.canonical_forms, block.sizes, ends)
+                ))
+
+                lengths.update(map(len, block.words))
+                common_lengths.update(
+                    len(word) for word, proper_noun in zip(block.words, proper_nouns) if not proper_noun
+                )
+                words += len(block.words)
+
+            _insert_rows(cursor, WordLengthCount, ['length', 'count', 'common_count'], (
+                (length, count, common_lengths[length]) for length, count in lengths.items()
+            ))
+
+        shared_index.count_write()
+
+        return words
+
+    @staticmethod
+    def build_index():
+        snapshot_path = settings.ANAGRAM_INDEX_SNAPSHOT
+
+        if shared_index.refresh(force=True):
+            return
+
+        if snapshot_path and os.path.exists(snapshot_path):
+            try:
+                snapshot = CorpusSnapshot(snapshot_path)
+            except SnapshotError as e:
+                logger.warning('Cannot use %s, building the index from the database: %s', snapshot_path, e)
+            else:
+                if Word.is_current(snapshot):
+                    anagram_index.reset(snapshot=snapshot)
+                    return
+
+                snapshot.close()
+                logger.warning('%s is out of date, building the index from the database', snapshot_path)
+
+        anagram_index.reset(
+            Word.objects.order_by('id').values_list('word', 'canonical_form', 'is_proper_noun').iterator()
+        )
+
+    @staticmethod
+    def last_id():
+        return Word.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+
+    @staticmethod
+    def is_current(snapshot):
+        """
+        Whether ``snapshot`` holds the stored corpus.
+
+        Ids are never reused, so words written since the snapshot change the word count or the highest id, unless
+        the only words deleted are ones added since, which leaves the same corpus.
+        """
+        word_count = WordLengthCount.objects.aggregate(total=Sum('count'))['total'] or 0
+
+        return snapshot.word_count == word_count and snapshot.last_word_id == Word.last_id()
+
+    @staticmethod
+    def iter_groups(last_id=None):
+        """
+        Yield ``(canonical_form, [(word, proper_noun), ...])`` for every group, sorted by canonical form.
+
+        With ``last_id``, only words with an id up to it are included.
+        """
+        groups = {}
+
+        rows = Word.objects.order_by('id').values_list('word', 'canonical_form', 'is_proper_noun')
+
+        if last_id is not None:
+            rows = rows.filter(id__lte=last_id)
+
+        for word, canonical_form, proper_noun in rows.iterator():
+            groups.setdefault(canonical_form, []).append((word, proper_noun))
+
+        for canonical_form in sorted(groups):
+            yield canonical_form, groups.pop(canonical_form)
+
+
+class CountSummary(models.Model):
+    """
+    Row per key with a running count, updated in bulk by the write paths of ``Word``.
+
+    ``common_count`` is the part of ``count`` that is not proper nouns.
+    """
+
+    key_field = None
+
+    count = models.PositiveBigIntegerField(default=0)
+    common_count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def count_field(include_proper_nouns):
+        return 'count' if include_proper_nouns else 'common_count'
+
+    @classmethod
+    def _columns(cls):
+        return [
+            connection.ops.quote_name(cls._meta.get_field(field).column)
+            for field in (cls.key_field, 'count', 'common_count')
+        ]
+
+    @classmethod
+    def increment(cls, counts, common_counts):
+        """Add to the counts of each key, creating missing rows, with one ``INSERT ... ON CONFLICT`` per batch."""
+        rows = [(key, count, common_counts[key]) for key, count in counts.items() if count]
+        table = connection.ops.quote_name(cls._meta.db_table)
+        key, count, common_count = cls._columns()
+        batch_size = min(LOOKUP_BATCH_SIZE, (connection.features.max_query_params or 3 * LOOKUP_BATCH_SIZE) // 3)
+
+        with connection.cursor() as cursor:
+            for i in range(0, len(rows), batch_size):
+                batch = rows[i:i + batch_size]
+                cursor.execute(
+                    f'INSERT INTO {table} ({key}, {count}, {common_count}) '
+                    f'VALUES {", ".join(["(%s, %s, %s)"] * len(batch))} '
+                    f'ON CONFLICT ({key}) DO UPDATE SET {count} = {table}.{count} + excluded.{count}, '
+                    f'{common_count} = {table}.{common_count} + excluded.{common_count}',
+                    list(chain.from_iterable(batch))
+                )
+
+    @classmethod
+    def decrement(cls, counts, common_counts):
+        """Subtract from the counts of each key, deleting the rows that reach zero."""
+        rows = [(count, common_counts[key], key) for key, count in counts.items() if count]
+        table = connection.ops.quote_name(cls._meta.db_table)
+        key, count, common_count = cls._columns()
+
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {table} WHERE {key} = %s AND {count} <= %s', [(k, delta) for delta, _, k in rows]
+            )
+            cursor.executemany(
+                f'UPDATE {table} SET {count} = {count} - %s, {common_count} = {common_count} - %s WHERE {key} = %s',
+                rows
+            )
+
+
+class WordLengthCount(CountSummary):
+    """Histogram of word lengths in the corpus, maintained on every write so statistics never scan ``Word``."""
+
+    key_field = 'length'
+
+    length = models.PositiveIntegerField(unique=True)
+
+    @staticmethod
+    def _histogram(include_proper_nouns):
+        count_field = WordLengthCount.count_field(include_proper_nouns)
+
+        return WordLengthCount.objects.filter(**{f'{count_field}__gt': 0}).order_by('length').values_list(
+            'length', count_field
+        )
+
+    @staticmethod
+    def get_stats(include_proper_nouns=True):
+        return WordLengthCount._summarize(list(WordLengthCount._histogram(include_proper_nouns)))
+
+    @staticmethod
+    async def aget_stats(include_proper_nouns=True):
+        return WordLengthCount._summarize([row async for row in WordLengthCount._histogram(include_proper_nouns)])
+
+    @staticmethod
+    def _summarize(histogram):
+        total_words = sum(count for _, count in histogram)
+
+        if not total_words:
+            return {
+                'total_words': 0,
+                'min_length': None,
+                'max_length': None,
+                'average_length': None,
+                'median_length': 0,
+            }
+
+        return {
+            'total_words': total_words,
+            'min_length': histogram[0][0],
+            'max_length': histogram[-1][0],
+            'average_length': sum(length * count for length, count in histogram) / total_words,
+            'median_length': WordLengthCount._median(histogram, total_words),
+        }
+
+    @staticmethod
+    def _median(histogram, total_words):
+        mid_index = total_words // 2
+        lower = upper = None
+        seen = 0
+
+        for length, count in histogram:
+            seen += count
+
+            if lower is None and seen > mid_index - 1:
+                lower = length
+
+            if seen > mid_index:
+                upper = length
+                break
+
+        if total_words % 2 != 0:
+            return upper
+
+        return (lower + upper) / 2
+
+
+class AnagramGroup(CountSummary):
+    """Materialized ``GROUP BY canonical_form``, one row per anagram class with its member count."""
+
+    key_field = 'canonical_form'
+
+    canonical_form = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['count', 'canonical_form']),
+            models.Index(fields=['common_count', 'canonical_form']),
+        ]
+
+
+class WordLoadCheckpoint(models.Model):
+    source = models.CharField(max_length=255, unique=True)
+    lines_committed = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,141 @@
+import functools
+import operator
+import re
+
+from backend.anagram_searcher.letter_counts import REBUILD_THRESHOLD, set_bits
+
+ANY_LETTER = '?'
+ANY_LETTERS = '*'
+
+
+def compile_pattern(pattern):
+    return re.compile(
+        ''.join('.' if c == ANY_LETTER else '.*' if c == ANY_LETTERS else re.escape(c) for c in pattern), re.DOTALL
+    )
+
+
+def _bits(flags):
+    """Bitset with bit ``i`` set when ``flags[i]`` is ``'1'``."""
+    return int(flags[::-1] or '0', 2)
+
+
+class PatternIndex:
+    """
+    Positional bitsets over the words of each length, answering crossword patterns such as ``r?ad`` and ``*ear``.
+
+    Words are bucketed by lowercased length and sorted, and bit ``i`` of ``positions[length][(position, letter)]``
+    is set when word ``i`` of that length has ``letter`` at ``position``. A pattern without ``*`` is the
+    intersection of one bitset per fixed letter in a single bucket. With ``*``, the letters before the first and
+    after the last one are matched from both ends of every bucket long enough, the letters in between narrow the
+    candidates to words holding them between those ends, and the rest is checked on the candidates left. Like
+    ``LetterCountIndex``, words changed after building are kept aside.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    @property
+    def is_built(self):
+        return self._words is not None
+
+    @property
+    def is_stale(self):
+        return not self.is_built or len(self._added) + len(self._removed) > REBUILD_THRESHOLD
+
+    def build(self, words):
+        """Index ``(word, proper_noun)`` pairs."""
+        buckets = {}
+
+        for word, proper_noun in words:
+            lowered = word.lower()
+            buckets.setdefault(len(lowered), []).append((lowered, word, proper_noun))
+
+        self._words = {}
+        self._positions = {}
+        self._proper_nouns = {}
+        self._added = {}
+        self._removed = set()
+
+        for length, bucket in buckets.items():
+            bucket.sort()
+            lowered, words, proper_nouns = zip(*bucket)
+            positions = {}
+
+            # Each column of letters is turned into one bitset per letter by string operations, which are much
+            # faster than setting bits word by word.
+            for position, column in enumerate(zip(*lowered)):
+                column = ''.join(column)
+                zeros = dict.fromkeys(map(ord, set(column)), '0')
+
+                for letter in set(column):
+                    positions[(position, letter)] = _bits(column.translate({**zeros, ord(letter): '1'}))
+
+            self._words[length] = list(words)
+            self._positions[length] = positions
+            self._proper_nouns[length] = _bits(''.join('1' if proper_noun else '0' for proper_noun in proper_nouns))
+
+    def clear(self):
+        self._words = None
+        self._positions = {}
+        self._proper_nouns = {}
+        self._added = {}
+        self._removed = set()
+
+    def add(self, word, proper_noun):
+        if word in self._removed:
+            self._removed.discard(word)
+        elif self.is_built:
+            self._added[word] = proper_noun
+
+    def remove(self, word):
+        if word in self._added:
+            del self._added[word]
+        elif self.is_built:
+            self._removed.add(word)
+
+    def find(self, pattern, include_proper_nouns=False):
+        """Yield words matching the lowercase ``pattern``, shortest first."""
+        parts = pattern.split(ANY_LETTERS)
+        min_length = len(pattern) - len(parts) + 1
+        prefix, suffix = parts[0], parts[-1] if len(parts) > 1 else ''
+        regex = compile_pattern(pattern)
+
+        added = sorted(
+            (word.lower(), word) for word, proper_noun in self._added.items()
+            if (include_proper_nouns or not proper_noun) and regex.fullmatch(word.lower())
+        )
+        lengths = {len(lowered) for lowered, _ in added}
+        lengths.update(self._words if len(parts) > 1 else (min_length,))
+
+        # Letters between two stars are not tied to a position: the candidates need one of them somewhere in the
+        # middle, and are checked against their order afterwards.
+        middle_letters = set(''.join(parts[1:-1])) - {ANY_LETTER}
+        check = regex.fullmatch if len(parts) > 2 else None
+
+        for length in sorted(length for length in lengths if length >= min_length):
+            yield from (word for lowered, word in added if len(lowered) == length)
+
+            if length not in self._words:
+                continue
+
+            positions = self._positions[length]
+            matching = (1 << len(self._words[length])) - 1
+
+            if not include_proper_nouns:
+                matching &= ~self._proper_nouns[length]
+
+            for position, letter in [*enumerate(prefix), *enumerate(suffix, length - len(suffix))]:
+                if letter != ANY_LETTER and matching:
+                    matching &= positions.get((position, letter), 0)
+
+            for letter in middle_letters:
+                if matching:
+                    matching &= functools.reduce(operator.or_, (
+                        positions.get((position, letter), 0) for position in range(len(prefix), length - len(suffix))
+                    ), 0)
+
+            for i in set_bits(matching):
+                word = self._words[length][i]
+
+                if word not in self._removed and (check is None or check(word.lower())):
+                    yield word
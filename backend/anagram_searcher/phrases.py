@@ -0,0 +1,142 @@
+import time
+from itertools import combinations_with_replacement, groupby, product
+
+# Groups read or indexed between two looks at the clock while the candidates are prepared.
+DEADLINE_CHECK_INTERVAL = 1000
+
+
+class PhraseAnagramSolver:
+    """
+    Finds combinations of corpus words that use exactly the letters of a phrase.
+
+    Candidates are the anagram groups that fit in the phrase, tried longest first. A combination only
+    picks candidates at or after its previous pick, so each multiset of groups is visited once instead
+    of once per permutation, and a branch is cut as soon as some letter it still needs is not held by
+    any candidate left to it. Subtrees without solutions are memoized by (remaining letters, first
+    candidate, words left), which is everything that determines them.
+
+    The time budget starts with the solver: reading ``groups``, an iterable of ``(canonical_form, words)``
+    such as ``AnagramIndex.iter_sub_anagram_groups``, and preparing the candidates count against it.
+    """
+
+    def __init__(self, letters, groups, max_words, max_results, time_budget, exclude=()):
+        self.deadline = time.monotonic() + time_budget
+        self.alphabet = sorted(set(letters))
+        self.max_words = max_words
+        self.max_results = max_results
+        self.exclude = tuple(sorted(exclude))
+        self.groups = {}
+        self.results = 0
+        self.timed_out = False
+
+        self._unread_groups = groups
+        self._target = self._vector(letters)
+        self._dead_ends = set()
+
+    def _vector(self, letters):
+        return tuple(map(letters.count, self.alphabet))
+
+    @staticmethod
+    def _mask(vector):
+        return sum(1 << i for i, count in enumerate(vector) if count)
+
+    def _is_late(self):
+        if time.monotonic() > self.deadline:
+            self.timed_out = True
+
+        return self.timed_out
+
+    def _candidates(self):
+        """Read the groups and return them as candidates, longest first, or ``None`` if time runs out."""
+        for i, (canonical_form, words) in enumerate(self._unread_groups):
+            if not i % DEADLINE_CHECK_INTERVAL and self._is_late():
+                return None
+
+            self.groups[canonical_form] = words
+
+        candidates = []
+
+        for i, canonical_form in enumerate(sorted(self.groups, key=len, reverse=True)):
+            if not i % DEADLINE_CHECK_INTERVAL and self._is_late():
+                return None
+
+            vector = self._vector(canonical_form)
+            candidates.append((i, canonical_form, vector, self._mask(vector)))
+
+        return candidates
+
+    @property
+    def is_exhausted(self):
+        return self.timed_out or self.results >= self.max_results
+
+    def solve(self):
+        """Yield lists of words until every combination is found, ``max_results`` is hit or time runs out."""
+        if self.is_exhausted:
+            return
+
+        candidates = self._candidates()
+
+        if candidates is None:
+            return
+
+        for canonical_forms in self._search(self._target, candidates, self.max_words):
+            for words in self._expand(canonical_forms):
+                if tuple(sorted(words)) == self.exclude:
+                    continue
+
+                self.results += 1
+                yield words
+
+                if self.is_exhausted:
+                    return
+
+    def _search(self, remaining, candidates, words_left):
+        if not any(remaining):
+            yield []
+            return
+
+        if not words_left or not candidates:
+            return
+
+        key = (remaining, candidates[0][0], words_left)
+
+        if key in self._dead_ends:
+            return
+
+        if self._is_late():
+            return
+
+        needed = sum(1 << i for i, count in enumerate(remaining) if count)
+        covered = 0
+
+        for candidate in candidates:
+            covered |= candidate[3]
+
+        found = False
+
+        if needed & ~covered == 0:
+            for position, (_, canonical_form, vector, _) in enumerate(candidates):
+                rest = tuple(have - use for have, use in zip(remaining, vector))
+                fitting = [
+                    candidate for candidate in candidates[position:]
+                    if all(use <= have for use, have in zip(candidate[2], rest))
+                ]
+
+                for tail in self._search(rest, fitting, words_left - 1):
+                    found = True
+                    yield [canonical_form] + tail
+
+                if self.is_exhausted:
+                    return
+
+        if not found:
+            self._dead_ends.add(key)
+
+    def _expand(self, canonical_forms):
+        choices = [
+            combinations_with_replacement(self.groups[canonical_form], len(list(repeats)))
+            for canonical_form, repeats in groupby(canonical_forms)
+        ]
+
+        for picks in product(*choices):
+            yield [word for pick in picks for word in pick]
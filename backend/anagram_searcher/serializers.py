@@ -1,3 +1,5 @@
+import math
+
 from rest_framework import serializers
 
 
@@ -6,3 +8,33 @@ class AnagramSerializer(serializers.Serializer):
 
     def get_anagrams(self, obj):
         return obj
+
+
+class IngestBatchQuerySerializer(serializers.Serializer):
+    wait = serializers.FloatField(min_value=0, required=False)
+
+    def validate_wait(self, value):
+        if not math.isfinite(value):
+            raise serializers.ValidationError('A finite number is required.')
+
+        return value
+
+
+class LimitSerializer(serializers.Serializer):
+    limit = serializers.IntegerField(min_value=0, required=False, allow_null=True)
+
+
+class SubAnagramQuerySerializer(LimitSerializer):
+    min_length = serializers.IntegerField(min_value=1, default=1)
+
+
+class PhraseAnagramQuerySerializer(serializers.Serializer):
+    max_words = serializers.IntegerField(min_value=1, default=3)
+    max_results = serializers.IntegerField(min_value=1, default=100)
+    min_length = serializers.IntegerField(min_value=1, default=2)
+    time_budget_ms = serializers.IntegerField(min_value=0, default=1000)
+
+
+class AnagramGroupQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(min_value=0, required=False)
+    offset = serializers.IntegerField(min_value=0, default=0)
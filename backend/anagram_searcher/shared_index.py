@@ -0,0 +1,221 @@
+import fcntl
+import mmap
+import os
+import secrets
+import struct
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import transaction
+
+from backend.anagram_searcher.index import anagram_index
+from backend.anagram_searcher.snapshot import CorpusSnapshot, SnapshotError, write_snapshot
+
+MAGIC = b'ANAGCTRL'
+# Magic, epoch, published generation, last write it includes, last write counted.
+CONTROL = struct.Struct('<8sQQQQ')
+GENERATION = slice(16, 24)
+GENERATION_BYTES = struct.Struct('<Q')
+# Older generations kept on disk, for workers that read the control file just before a newer one was published.
+KEEP_GENERATIONS = 2
+
+ControlState = namedtuple('ControlState', 'epoch generation published_write requested_write')
+
+
+class SharedIndexControl:
+    """
+    Memory-mapped control file through which the index owner and the workers agree on the current generation.
+
+    Workers count their committed writes in it, and the owner publishes a snapshot of the corpus as the next
+    generation once it has seen them. Generation ``n`` is the snapshot file ``{path}.{n}``. Updates are made under
+    an exclusive ``flock``. Readers compare the raw generation bytes and only lock to read the state again when
+    they changed.
+    """
+
+    def __init__(self, path, create=False):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | (os.O_CREAT if create else 0), 0o644)
+
+        try:
+            with self._locked(fcntl.LOCK_EX):
+                size = os.fstat(self._fd).st_size
+
+                if create and size == 0:
+                    # A random epoch keeps versions of a recreated control file from matching the old ones.
+                    os.write(self._fd, CONTROL.pack(MAGIC, secrets.randbits(64), 0, 0, 0))
+                elif size != CONTROL.size:
+                    raise SnapshotError(f'{path} is not a shared index control file')
+
+            self._mmap = mmap.mmap(self._fd, CONTROL.size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise SnapshotError(f'{path} is not a shared index control file')
+
+    def close(self):
+        self._mmap.close()
+        os.close(self._fd)
+
+    @contextmanager
+    def _locked(self, operation):
+        fcntl.flock(self._fd, operation)
+
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @property
+    def raw_generation(self):
+        return self._mmap[GENERATION]
+
+    def read(self):
+        with self._locked(fcntl.LOCK_SH):
+            return ControlState(*CONTROL.unpack_from(self._mmap)[1:])
+
+    def _write(self, state):
+        CONTROL.pack_into(self._mmap, 0, MAGIC, *state)
+
+    def count_write(self):
+        """Count a committed write, returns its number."""
+        with self._locked(fcntl.LOCK_EX):
+            state = ControlState(*CONTROL.unpack_from(self._mmap)[1:])
+            state = state._replace(requested_write=state.requested_write + 1)
+            self._write(state)
+
+        return state.requested_write
+
+    def publish(self, generation, published_write):
+        with self._locked(fcntl.LOCK_EX):
+            state = ControlState(*CONTROL.unpack_from(self._mmap)[1:])
+            self._write(state._replace(generation=generation, published_write=published_write))
+
+    def generation_path(self, generation):
+        return f'{self.path}.{generation}'
+
+
+def publish_generation(control):
+    """Snapshot the corpus from the database as the next generation, returns ``(generation, words)``."""
+    from backend.anagram_searcher.models import Word
+
+    # Read before the rows: every write counted so far was committed before it was counted, so it is in them.
+    state = control.read()
+    generation = state.generation + 1
+    path = control.generation_path(generation)
+
+    write_snapshot(path, Word.iter_groups())
+    snapshot = CorpusSnapshot(path)
+    words = snapshot.word_count
+    snapshot.close()
+
+    control.publish(generation, state.requested_write)
+
+    try:
+        os.remove(control.generation_path(generation - KEEP_GENERATIONS - 1))
+    except FileNotFoundError:
+        pass
+
+    return generation, words
+
+
+class SharedIndex:
+    """
+    Worker side of ``ANAGRAM_SHARED_INDEX``: serves the index from the published generation's snapshot.
+
+    Writes are applied to the local index as usual, so the worker reads its own writes at once, and counted in
+    the control file once committed. The index is swapped to a newer generation only when it includes every write
+    this process counted, so local writes are never dropped before the snapshot holds them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._control = None
+        self._seen = None
+        self._written = 0
+
+    def _get_control(self):
+        path = settings.ANAGRAM_SHARED_INDEX
+
+        if not path:
+            return None
+
+        if self._control is None or self._control.path != path:
+            try:
+                control = SharedIndexControl(path)
+            except FileNotFoundError:
+                return None
+
+            with self._lock:
+                if self._control is not None:
+                    self._control.close()
+
+                self._control, self._seen, self._written = control, None, 0
+
+        return self._control
+
+    def count_write(self):
+        """Count a write of this process in the control file once the current transaction commits."""
+        if self._get_control() is not None:
+            transaction.on_commit(self._count_write)
+
+    def _count_write(self):
+        written = self._control.count_write()
+
+        with self._lock:
+            self._written = max(self._written, written)
+
+    def refresh(self, force=False):
+        """Swap the index to the published generation if it changed, returns whether the index was reset."""
+        control = self._get_control()
+
+        if control is None or (not force and control.raw_generation == self._seen):
+            return False
+
+        with self._lock:
+            state = control.read()
+
+            if not state.generation or (not force and state.published_write < self._written):
+                # Wait for a generation with this process's writes, the owner publishes one since it has seen them.
+                self._seen = GENERATION_BYTES.pack(state.generation)
+                return False
+
+            try:
+                snapshot = CorpusSnapshot(control.generation_path(state.generation))
+            except FileNotFoundError:
+                # Replaced by a newer generation meanwhile, picked up on the next refresh.
+                return False
+
+            anagram_index.reset(snapshot=snapshot, version=f'{state.epoch:x}.{state.generation}')
+            self._seen = GENERATION_BYTES.pack(state.generation)
+
+            return True
+
+
+shared_index = SharedIndex()
+
+
+class SharedIndexMiddleware:
+    """With ``ANAGRAM_SHARED_INDEX``, moves the index to the latest published generation before each request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        # Only a few bytes of shared memory are compared unless a new generation was published, so it is not worth
+        # moving to a thread for async requests.
+        shared_index.refresh()
+
+        return self.get_response(request)
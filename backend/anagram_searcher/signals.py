@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from backend.anagram_searcher.index import anagram_index
+from backend.anagram_searcher.models import Word
+from backend.anagram_searcher.shared_index import shared_index
+
+
+@receiver(post_save, sender=Word)
+def add_saved_word(sender, instance, created, **kwargs):
+    if created:
+        row = (instance.word, instance.canonical_form, instance.is_proper_noun)
+
+        with transaction.atomic():
+            Word.count_added_words([row])
+
+        shared_index.count_write()
+        anagram_index.add([row])
+
+
+def rebuild_index_after_migrate(sender, **kwargs):
+    Word.build_index()
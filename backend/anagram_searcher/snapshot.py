@@ -0,0 +1,245 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate
+from operator import sub
+
+MAGIC = b'ANAGSNAP'
+VERSION = 2
+HEADER = struct.Struct('<8sHHIIQ')
+BYTE_ORDERS = {'little': 0, 'big': 1}
+MAX_OFFSET = 2 ** 32 - 1
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _padding(size):
+    return -size % 4
+
+
+def write_snapshot(path, groups, last_word_id=0):
+    """
+    Write ``(canonical_form, [(word, proper_noun), ...])`` groups, sorted by canonical form, to ``path``.
+
+    Layout after the header: key offsets, group start offsets, word offsets (native ``uint32`` arrays),
+    one proper noun byte per word, then the packed UTF-8 keys and words. The file is written next to
+    ``path`` and moved over it, so readers never see a partial snapshot. The header also holds the word count
+    and ``last_word_id``, the highest database id of the words, which tell whether the database changed since.
+    """
+    key_offsets, group_starts, word_offsets = array('I', [0]), array('I', [0]), array('I', [0])
+    proper_nouns, keys, words = bytearray(), bytearray(), bytearray()
+    previous = None
+
+    for canonical_form, members in groups:
+        if previous is not None and canonical_form <= previous:
+            raise SnapshotError('Groups must be sorted by canonical form without duplicates')
+
+        previous = canonical_form
+        keys += canonical_form.encode()
+        key_offsets.append(len(keys))
+
+        for word, proper_noun in members:
+            words += word.encode()
+            word_offsets.append(len(words))
+            proper_nouns.append(proper_noun)
+
+        group_starts.append(len(proper_nouns))
+
+    if len(words) > MAX_OFFSET or len(keys) > MAX_OFFSET:
+        raise SnapshotError('Corpus is too large for 32-bit snapshot offsets')
+
+    tmp_path = f'{path}.tmp'
+
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(
+            MAGIC, VERSION, BYTE_ORDERS[sys.byteorder], len(key_offsets) - 1, len(proper_nouns), last_word_id
+        ))
+
+        for offsets in (key_offsets, group_starts, word_offsets):
+            offsets.tofile(file)
+
+        file.write(proper_nouns + bytes(_padding(len(proper_nouns))))
+        file.write(keys)
+        file.write(words)
+
+    os.replace(tmp_path, path)
+
+    return os.path.getsize(path)
+
+
+class CorpusSnapshot:
+    """
+    Read-only view of a snapshot written by ``write_snapshot``.
+
+    The file is memory-mapped and lookups binary search the sorted keys in place, so processes opening the
+    same snapshot share one page-cache copy and only the groups they return are materialized.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise SnapshotError(f'{path} is not a corpus snapshot')
+
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, byte_order, self.group_count, self.word_count, self.last_word_id = HEADER.unpack_from(
+            self._mmap
+        )
+
+        if magic != MAGIC or version != VERSION:
+            raise SnapshotError(f'{path} is not a version {VERSION} corpus snapshot')
+
+        if byte_order != BYTE_ORDERS[sys.byteorder]:
+            raise SnapshotError(f'{path} was written on a machine with a different byte order')
+
+        self.path = path
+        self._readers = 0
+        self._closed = False
+        self._readers_lock = threading.Lock()
+        self._view = view = memoryview(self._mmap)
+        position = HEADER.size
+
+        def take(size):
+            nonlocal position
+            section = view[position:position + size]
+            position += size + _padding(size)
+
+            return section
+
+        self._key_offsets = take(4 * (self.group_count + 1)).cast('I')
+        self._group_starts = take(4 * (self.group_count + 1)).cast('I')
+        self._word_offsets = take(4 * (self.word_count + 1)).cast('I')
+        self._proper_nouns = take(self.word_count)
+        self._keys_start = position
+        self._words_start = self._keys_start + self._key_offsets[-1]
+
+    def __len__(self):
+        return self.group_count
+
+    def __contains__(self, canonical_form):
+        return self._find(canonical_form) is not None
+
+    def close(self):
+        """Unmap the snapshot, or let the last block of ``reading`` still running do it."""
+        with self._readers_lock:
+            self._closed = True
+
+            if self._readers:
+                return
+
+        self._unmap()
+
+    @contextmanager
+    def reading(self):
+        """Keep the snapshot mapped until the block exits, even if another thread closes it meanwhile."""
+        with self._readers_lock:
+            if self._closed:
+                raise SnapshotError(f'{self.path} is closed')
+
+            self._readers += 1
+
+        try:
+            yield self
+        finally:
+            with self._readers_lock:
+                self._readers -= 1
+                unmap = self._closed and not self._readers
+
+            if unmap:
+                self._unmap()
+
+    def _unmap(self):
+        for view in (self._key_offsets, self._group_starts, self._word_offsets, self._proper_nouns, self._view):
+            view.release()
+
+        self._mmap.close()
+
+    def _key(self, i):
+        return self._mmap[self._keys_start + self._key_offsets[i]:self._keys_start + self._key_offsets[i + 1]]
+
+    def _find(self, canonical_form):
+        key = canonical_form.encode()
+        low, high = 0, self.group_count
+
+        while low < high:
+            middle = (low + high) // 2
+
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self.group_count and self._key(low) == key:
+            return low
+
+        return None
+
+    def _group(self, i):
+        offsets, start = self._word_offsets, self._words_start
+
+        return {
+            self._mmap[start + offsets[j]:start + offsets[j + 1]].decode(): bool(self._proper_nouns[j])
+            for j in range(self._group_starts[i], self._group_starts[i + 1])
+        }
+
+    def get_group(self, canonical_form):
+        """Words of the group mapped to their proper noun flag, ``None`` if the group is not in the snapshot."""
+        i = self._find(canonical_form)
+
+        return self._group(i) if i is not None else None
+
+    def _decode_all(self, start, offsets):
+        """Decode every string of a section at once, ``offsets`` holding their bounds."""
+        data = self._mmap[start:start + offsets[-1]]
+        text = data.decode()
+        offsets = offsets.tolist()
+
+        if len(text) != len(data):
+            # Not ASCII: the offsets count bytes, not characters.
+            return [data[begin:end].decode() for begin, end in zip(offsets, offsets[1:])]
+
+        return [text[begin:end] for begin, end in zip(offsets, offsets[1:])]
+
+    def iter_canonical_forms(self):
+        return iter(self._decode_all(self._keys_start, self._key_offsets))
+
+    def iter_group_sizes(self):
+        """
+        Yield ``(canonical_form, size, size without proper nouns)`` for every group.
+
+        Keys are decoded at once and sizes are differences of running counts, so no group is visited in Python.
+        """
+        starts = self._group_starts.tolist()
+        # Proper nouns among the first n words, for every n.
+        proper_nouns = list(accumulate(self._proper_nouns, initial=0))
+        sizes = list(map(sub, starts[1:], starts))
+        proper_sizes = map(sub, map(proper_nouns.__getitem__, starts[1:]), map(proper_nouns.__getitem__, starts))
+
+        return zip(self._decode_all(self._keys_start, self._key_offsets), sizes, map(sub, sizes, proper_sizes))
+
+    def iter_groups(self):
+        for i in range(self.group_count):
+            yield self._key(i).decode(), self._group(i)
+
+    def iter_words(self, exclude=()):
+        """
+        Yield ``(word, proper_noun)`` for every word outside the groups of the canonical forms in ``exclude``.
+
+        Much faster than ``iter_groups``: the words are decoded at once, without building a dict per group.
+        """
+        words = self._decode_all(self._words_start, self._word_offsets)
+        proper_nouns = bytes(self._proper_nouns)
+        starts = self._group_starts
+        start = 0
+
+        for i in sorted(i for i in map(self._find, exclude) if i is not None):
+            yield from zip(words[start:starts[i]], map(bool, proper_nouns[start:starts[i]]))
+            start = starts[i + 1]
+
+        yield from zip(words[start:], map(bool, proper_nouns[start:]))
@@ -0,0 +1,40 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite with two extra ``OPTIONS``.
+
+    ``pragmas`` maps PRAGMA names to values set on every new connection. ``transaction_mode`` is how ``atomic``
+    blocks begin: with ``IMMEDIATE`` a transaction takes the write lock up front and waits for other writers within
+    the busy timeout, instead of failing with "database is locked" when it reads first and writes later.
+    """
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.pop('pragmas', None)
+        kwargs.pop('transaction_mode', None)
+
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+
+        if mode is None:
+            return super()._start_transaction_under_autocommit()
+
+        if mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f'transaction_mode must be one of {", ".join(TRANSACTION_MODES)}, not {mode}')
+
+        self.cursor().execute(f'BEGIN {mode}')
@@ -0,0 +1,159 @@
+import http.client
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+WSGIREF = 'wsgiref'
+GUNICORN = 'gunicorn'
+
+# Serves `config.wsgi` on the port passed as argument, importing it first like a WSGI server's worker does.
+SERVE_WSGIREF = '''
+import sys
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from config.wsgi import application
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+make_server('127.0.0.1', int(sys.argv[1]), application, handler_class=QuietHandler).serve_forever()
+'''
+
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+ImportTime = namedtuple('ImportTime', 'module self_us cumulative_us depth')
+
+
+class ImportProfile:
+    def __init__(self, wall_time, imports):
+        self.wall_time = wall_time
+        self.imports = imports
+
+    @property
+    def total(self):
+        """Seconds spent importing, as reported by ``-X importtime`` for the top-level imports."""
+        return sum(i.cumulative_us for i in self.imports if i.depth == 0) / 1e6
+
+    def slowest(self, n):
+        """The ``n`` imports with the most time spent in their own module body, slowest first."""
+        return sorted(self.imports, key=lambda i: i.self_us, reverse=True)[:n]
+
+
+def parse_import_times(output):
+    imports = []
+
+    for line in output.splitlines():
+        match = IMPORT_TIME.match(line)
+
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append(ImportTime(module, int(self_us), int(cumulative_us), len(indent) // 2))
+
+    return imports
+
+
+def _environ(settings_module, env):
+    return {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module, 'PYTHONUNBUFFERED': '1', **env}
+
+
+def profile_imports(settings_module, env=None):
+    """Import ``config.wsgi`` in a fresh interpreter under ``python -X importtime``."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import config.wsgi'],
+        cwd=settings.BASE_DIR, env=_environ(settings_module, env or {}), capture_output=True, text=True
+    )
+    wall_time = time.perf_counter() - started
+
+    if result.returncode:
+        raise RuntimeError(f'Importing config.wsgi with {settings_module} failed:\n{result.stderr[-2000:]}')
+
+    return ImportProfile(wall_time, parse_import_times(result.stderr))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+
+        return sock.getsockname()[1]
+
+
+def _server_command(server, port):
+    if server == GUNICORN:
+        return [sys.executable, '-m', 'gunicorn', 'config.wsgi', '--bind', f'127.0.0.1:{port}', '--workers', '1']
+
+    return [sys.executable, '-c', SERVE_WSGIREF, str(port)]
+
+
+def _get(port, path, timeout):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        response.read()
+
+        return response.status
+    finally:
+        connection.close()
+
+
+def time_to_first_response(settings_module, path, server=WSGIREF, env=None, timeout=60):
+    """
+    Start a server process and poll ``GET path`` until it answers, returning ``(seconds, status)``.
+
+    The time runs from starting the process, interpreter startup included, to the end of the first response.
+    """
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        _server_command(server, port), cwd=settings.BASE_DIR, env=_environ(settings_module, env or {}),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f'Server exited with {process.returncode}:\n{process.stderr.read()[-2000:]}')
+
+            try:
+                status = _get(port, path, timeout)
+            except (ConnectionError, http.client.HTTPException):
+                # Not listening yet, or the connection was dropped while the worker booted.
+                time.sleep(0.005)
+                continue
+
+            return time.perf_counter() - started, status
+
+        raise RuntimeError(f'No response within {timeout}s')
+    finally:
+        process.terminate()
+        process.wait()
+        process.stderr.close()
+
+
+def run_startup_benchmark(settings_module, path, runs=3, server=WSGIREF, env=None, top=10):
+    """Median import and first response times of ``runs`` fresh processes, with the import profile of the last run."""
+    profiles = [profile_imports(settings_module, env) for _ in range(runs)]
+    responses = [time_to_first_response(settings_module, path, server, env) for _ in range(runs)]
+
+    return {
+        'settings': settings_module,
+        'env': env or {},
+        'import_wall_time': statistics.median(profile.wall_time for profile in profiles),
+        'import_time': statistics.median(profile.total for profile in profiles),
+        'first_response': statistics.median(seconds for seconds, _ in responses),
+        'statuses': sorted({status for _, status in responses}),
+        'slowest_imports': [
+            {'module': i.module, 'self': i.self_us / 1e6, 'cumulative': i.cumulative_us / 1e6}
+            for i in profiles[-1].slowest(top)
+        ],
+    }
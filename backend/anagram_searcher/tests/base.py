@@ -0,0 +1,9 @@
+from django.test import TestCase
+
+from backend.anagram_searcher.models import Word
+
+
+class AnagramSearcherTestCase(TestCase):
+    def setUp(self):
+        # In-memory structures are not rolled back with the test transaction, start each test from the database.
+        Word.build_index()
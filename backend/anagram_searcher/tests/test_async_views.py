@@ -0,0 +1,178 @@
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from backend.anagram_searcher.index import anagram_index
+from backend.anagram_searcher.models import Word
+from backend.anagram_searcher.tests.base import AnagramSearcherTestCase
+
+
+async def aread_ndjson(response):
+    return [json.loads(line) for line in b''.join([chunk async for chunk in response.streaming_content]).splitlines()]
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+
+class AsyncViewsTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.async_client = AsyncClient()
+
+        self.client.post('/words/', {'words': ['read', 'dear', 'dare', 'Ared', 'book', 'cat', 'act']}, format='json')
+
+    async def test_get_anagrams_matches_sync_view(self):
+        for path in ('/anagrams/read/', '/anagrams/Read/?include_proper_nouns=true', '/anagrams/read/?limit=1'):
+            response = await self.async_client.get(f'/async{path}')
+
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+            self.assertEqual((await sync_to_async(self.client.get)(path)).json(), response.json())
+
+    async def test_stream_ndjson_matches_sync_view(self):
+        paths = (
+            '/anagrams/read/?stream=ndjson', '/anagrams/read/?stream=ndjson&limit=1',
+            '/most_anagrams/?stream=ndjson', '/most_anagrams/?k=2&stream=ndjson&include_proper_nouns=false'
+        )
+
+        for path in paths:
+            response = await self.async_client.get(f'/async{path}')
+
+            self.assertEqual('application/x-ndjson', response['Content-Type'])
+            self.assertEqual(read_ndjson(await sync_to_async(self.client.get)(path)), await aread_ndjson(response))
+
+        response = await self.async_client.get('/async/most_anagrams/?k=0&stream=ndjson')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    async def test_bulk_anagrams(self):
+        response = await self.async_client.post(
+            '/async/anagrams/', {'words': ['read', 'cat', 'zzz']}, content_type='application/json'
+        )
+
+        self.assertEqual({'anagrams': {'read': ['dear', 'dare'], 'cat': ['act'], 'zzz': []}}, response.json())
+
+    async def test_bulk_anagrams_invalid_body(self):
+        response = await self.async_client.post('/async/anagrams/', 'words', content_type='application/json')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+        response = await self.async_client.post(
+            '/async/anagrams/', {'words': 'read'}, content_type='application/json'
+        )
+
+        self.assertEqual('words must be a list of strings', response.json()['error'])
+
+        for limit in (-1, 'x'):
+            response = await self.async_client.post(
+                '/async/anagrams/', {'words': ['read'], 'limit': limit}, content_type='application/json'
+            )
+
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+            self.assertIn('limit', response.json()['error'])
+
+    async def test_get_corpus_stats_matches_sync_view(self):
+        for path in ('/corpus_stats/', '/corpus_stats/?include_proper_nouns=false'):
+            response = await self.async_client.get(f'/async{path}')
+
+            self.assertEqual((await sync_to_async(self.client.get)(path)).json(), response.json())
+
+    async def test_get_most_anagrams_matches_sync_view(self):
+        for path in ('/most_anagrams/', '/most_anagrams/?k=2', '/most_anagrams/?include_proper_nouns=false'):
+            response = await self.async_client.get(f'/async{path}')
+
+            self.assertEqual((await sync_to_async(self.client.get)(path)).json(), response.json())
+
+        response = await self.async_client.get('/async/most_anagrams/?k=x')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    async def test_check_anagrams(self):
+        response = await self.async_client.post(
+            '/async/check_anagrams/', {'words': ['Read', 'dEAr']}, content_type='application/json'
+        )
+
+        self.assertTrue(response.json()['are_anagrams'])
+
+        response = await self.async_client.post(
+            '/async/check_anagrams/', {'words': []}, content_type='application/json'
+        )
+
+        self.assertEqual('No words provided', response.json()['error'])
+
+    async def test_check_anagrams_groups_matches_sync_view(self):
+        data = {'words': ['read', 'book', 'Dear', 'cat', 'kobo'], 'groups': True, 'in_corpus': True}
+
+        response = await self.async_client.post('/async/check_anagrams/', data, content_type='application/json')
+        expected = await sync_to_async(self.client.post)('/check_anagrams/', data, format='json')
+
+        self.assertEqual(expected.json(), response.json())
+        self.assertEqual([True, True, False, True, False], response.json()['in_corpus'])
+
+        response = await self.async_client.post(
+            '/async/check_anagrams/', {'words': ['read', 1], 'groups': True}, content_type='application/json'
+        )
+
+        self.assertEqual('words must be a list of strings', response.json()['error'])
+
+    async def test_reads_follow_writes(self):
+        await Word.objects.acreate(word='tac', canonical_form='act')
+
+        response = await self.async_client.get('/async/anagrams/cat/')
+
+        self.assertEqual(['act', 'tac'], response.json()['anagrams'])
+
+
+class AsyncDeferredIndexTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.async_client = AsyncClient()
+
+        Word.objects.bulk_create([Word.build('read'), Word.build('dear')])
+
+    def tearDown(self):
+        anagram_index.clear()
+
+    async def test_lazy_index_is_loaded_outside_event_loop(self):
+        anagram_index.defer(Word.build_index)
+
+        response = await self.async_client.get('/async/anagrams/read/')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(['dear'], response.json()['anagrams'])
+        self.assertTrue(anagram_index.is_loaded)
+
+    async def test_background_load_does_not_block_event_loop(self):
+        started = threading.Event()
+        released = threading.Event()
+        events = []
+
+        def loader():
+            started.set()
+            released.wait(5)
+            events.append('loaded')
+            # The test's transaction keeps other threads out of the database.
+            anagram_index.reset([('read', 'ader', False), ('dear', 'ader', False)])
+
+        anagram_index.defer(loader)
+        thread = threading.Thread(target=anagram_index.load)
+        thread.start()
+        started.wait(5)
+
+        async def release():
+            # Only runs if the request waits for the load without blocking the event loop.
+            await asyncio.sleep(0.05)
+            events.append('released')
+            released.set()
+
+        response, _ = await asyncio.gather(self.async_client.get('/async/anagrams/read/'), release())
+        await sync_to_async(thread.join)()
+
+        self.assertEqual(['released', 'loaded'], events)
+        self.assertEqual(['dear'], response.json()['anagrams'])
@@ -0,0 +1,261 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from backend.anagram_searcher.benchmark import CLIENT, SYNTHETIC_PREFIX, build_scenarios, find_regressions, run_scenario
+from backend.anagram_searcher.index import anagram_index
+from backend.anagram_searcher.models import AnagramGroup, Word, WordLengthCount, WordLoadCheckpoint
+from backend.anagram_searcher.snapshot import CorpusSnapshot
+from backend.anagram_searcher.tests.base import AnagramSearcherTestCase
+
+
+class LoadWordsFromFileCommandTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.file = tempfile.NamedTemporaryFile('w', suffix='.txt')
+        self.file.write('read\ndear\n\ndare\nbook\n')
+        self.file.flush()
+
+    def tearDown(self):
+        self.file.close()
+
+    def test_load_words_in_batches(self):
+        out = io.StringIO()
+
+        call_command('load_words_from_file', self.file.name, batch_size=2, stdout=out)
+
+        self.assertEqual(4, Word.objects.count())
+        self.assertEqual('ader', Word.objects.get(word='dare').canonical_form)
+        self.assertEqual(5, WordLoadCheckpoint.objects.get(source=self.file.name).lines_committed)
+        self.assertIn('Committed 4 lines', out.getvalue())
+        self.assertIn('rows/s', out.getvalue())
+
+    def test_load_words_resumes_after_last_committed_batch(self):
+        WordLoadCheckpoint.objects.create(source=self.file.name, lines_committed=3)
+
+        call_command('load_words_from_file', self.file.name, resume=True, stdout=io.StringIO())
+
+        self.assertEqual(['book', 'dare'], sorted(Word.objects.values_list('word', flat=True)))
+
+    def test_load_words_from_stdin(self):
+        with mock.patch('sys.stdin', io.StringIO('listen\nsilent\n')):
+            call_command('load_words_from_file', '-', stdout=io.StringIO())
+
+        self.assertEqual(2, Word.objects.filter(canonical_form='eilnst').count())
+        self.assertEqual(2, WordLoadCheckpoint.objects.get(source='-').lines_committed)
+
+
+class DumpCorpusSnapshotCommandTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'corpus.snapshot')
+
+        Word.add_list_of_words(['read', 'dare', 'Ared', 'book', 'éclair'])
+
+    def tearDown(self):
+        anagram_index.clear()
+        self.directory.cleanup()
+
+    def test_dump_corpus_snapshot(self):
+        out = io.StringIO()
+
+        call_command('dump_corpus_snapshot', self.path, stdout=out)
+
+        snapshot = CorpusSnapshot(self.path)
+
+        self.assertEqual(5, snapshot.word_count)
+        self.assertEqual(3, len(snapshot))
+        self.assertEqual({'read': False, 'dare': False, 'Ared': True}, snapshot.get_group('ader'))
+        self.assertEqual({'éclair': True}, snapshot.get_group('acilré'))
+        self.assertIsNone(snapshot.get_group('abc'))
+        self.assertIn('Wrote 5 words in 3 groups', out.getvalue())
+
+        snapshot.close()
+
+    def test_index_served_from_snapshot(self):
+        call_command('dump_corpus_snapshot', self.path, stdout=io.StringIO())
+
+        with override_settings(ANAGRAM_INDEX_SNAPSHOT=self.path):
+            Word.build_index()
+
+        self.assertIsNotNone(anagram_index.snapshot)
+        self.assertEqual(['dare'], self.client.get('/anagrams/read/').data['anagrams'])
+
+        self.client.post('/words/', {'words': ['ared']}, format='json')
+        self.client.delete('/words/dare/')
+        self.client.delete('/delete_word/book/')
+
+        self.assertEqual(['ared'], self.client.get('/anagrams/read/').data['anagrams'])
+        self.assertEqual([], self.client.get('/anagrams/book/').data['anagrams'])
+        self.assertEqual(
+            [{'canonical_form': 'ader', 'count': 3, 'words': ['read', 'Ared', 'ared']}],
+            self.client.get('/most_anagrams/?k=1').data['groups']
+        )
+        self.assertEqual(4, len(anagram_index))
+        self.assertEqual({'s': ['read', 'ared']}, self.client.get('/near_anagrams/reads/').data['removed'])
+        self.assertEqual({'a': ['read', 'ared']}, self.client.get('/near_anagrams/red/').data['added'])
+
+    def test_outdated_snapshot_is_not_served(self):
+        call_command('dump_corpus_snapshot', self.path, stdout=io.StringIO())
+
+        for write in (lambda: Word.add_list_of_words(['dear']), lambda: Word.delete_word('read')):
+            # The count alone would not tell: one word added, then one deleted.
+            write()
+
+            with override_settings(ANAGRAM_INDEX_SNAPSHOT=self.path), self.assertLogs(
+                'backend.anagram_searcher.models', 'WARNING'
+            ):
+                Word.build_index()
+
+            self.assertIsNone(anagram_index.snapshot)
+
+        self.assertEqual(['dare', 'dear'], self.client.get('/anagrams/read/').data['anagrams'])
+
+    def test_unreadable_snapshot_is_not_served(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'ANAGSNAP' + bytes(100))
+
+        with override_settings(ANAGRAM_INDEX_SNAPSHOT=self.path), self.assertLogs(
+            'backend.anagram_searcher.models', 'WARNING'
+        ):
+            Word.build_index()
+
+        self.assertIsNone(anagram_index.snapshot)
+        self.assertEqual(['dare'], self.client.get('/anagrams/read/').data['anagrams'])
+
+
+class CorpusExportImportCommandTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'corpus.gz')
+
+        Word.add_list_of_words(['read', 'dare', 'Ared', 'book', 'éclair', 'Éclair', 'a'])
+
+    def tearDown(self):
+        anagram_index.clear()
+        self.directory.cleanup()
+
+    def corpus(self):
+        return (
+            sorted(Word.objects.values_list('word', 'canonical_form', 'canonical_key', 'is_proper_noun')),
+            sorted(AnagramGroup.objects.values_list('canonical_form', 'count', 'common_count')),
+            sorted(WordLengthCount.objects.values_list('length', 'count', 'common_count')),
+        )
+
+    def test_round_trip(self):
+        corpus = self.corpus()
+        out = io.StringIO()
+
+        call_command('export_corpus', self.path, stdout=out)
+
+        self.assertIn('Exported 7 words in 4 groups', out.getvalue())
+
+        Word.delete_all_words()
+        call_command('import_corpus', self.path, stdout=out)
+        Word.build_index()
+
+        self.assertIn('Imported 7 words', out.getvalue())
+        self.assertEqual(corpus, self.corpus())
+        self.assertEqual(['dare', 'Ared'], anagram_index.get_anagrams('ader', 'read', include_proper_nouns=True))
+
+    def test_import_keeps_indexes(self):
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(cursor, Word._meta.db_table)
+
+        call_command('export_corpus', self.path, stdout=io.StringIO())
+        call_command('import_corpus', self.path, replace=True, stdout=io.StringIO())
+
+        with connection.cursor() as cursor:
+            self.assertEqual(indexes, connection.introspection.get_constraints(cursor, Word._meta.db_table))
+
+    def test_import_needs_empty_corpus_or_replace(self):
+        call_command('export_corpus', self.path, stdout=io.StringIO())
+        Word.add_list_of_words(['cat'])
+
+        with self.assertRaisesMessage(CommandError, 'The corpus is not empty, pass --replace to delete it first'):
+            call_command('import_corpus', self.path, stdout=io.StringIO())
+
+        call_command('import_corpus', self.path, replace=True, stdout=io.StringIO())
+
+        self.assertEqual(7, Word.objects.count())
+        self.assertFalse(Word.objects.filter(word='cat').exists())
+
+    def test_import_rejects_damaged_files(self):
+        call_command('export_corpus', self.path, stdout=io.StringIO())
+        Word.delete_all_words()
+
+        with open(self.path, 'rb') as file:
+            data = file.read()
+
+        with open(self.path, 'wb') as file:
+            file.write(data[:len(data) // 2])
+
+        with self.assertRaisesMessage(CommandError, 'Corpus file is truncated'):
+            call_command('import_corpus', self.path, stdout=io.StringIO())
+
+        self.assertEqual(0, Word.objects.count())
+
+
+@override_settings(ANAGRAM_RESPONSE_CACHE_SIZE=0)
+class BenchmarkTestCase(TransactionTestCase):
+    # The words of the ingest_batch scenario are written by the ingest thread through its own connection.
+
+    def setUp(self):
+        Word.build_index()
+        Word.add_list_of_words(['read', 'dear', 'dare', 'Ared', 'book', 'cat', 'act', 'listen', 'silent'])
+        self.read_scenarios, self.write_scenarios, self.final_scenario = build_scenarios(
+            list(Word.objects.values_list('word', flat=True))
+        )
+
+    def test_scenarios_run_through_client(self):
+        for scenario in self.read_scenarios + self.write_scenarios:
+            row = run_scenario(scenario, CLIENT, 3)
+
+            self.assertEqual(3, row['requests'], scenario.name)
+            self.assertEqual(0, row['errors'], scenario.name)
+            self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+
+        self.assertFalse(Word.objects.filter(word__startswith=SYNTHETIC_PREFIX, word__contains='delete').exists())
+
+    def test_scenarios_count_queries(self):
+        rows = {
+            scenario.name: run_scenario(scenario, CLIENT, 2)
+            for scenario in self.read_scenarios if scenario.name in ('anagrams', 'corpus_stats', 'anagram_group')
+        }
+
+        self.assertEqual(0, rows['anagrams']['queries_per_request'])
+        self.assertEqual(1, rows['corpus_stats']['queries_per_request'])
+        self.assertEqual(2, rows['anagram_group']['queries_per_request'])
+
+    def test_find_regressions(self):
+        baseline = {'results': [
+            {'scenario': 'anagrams', 'mode': CLIENT, 'p95_ms': 1.0, 'requests_per_second': 1000,
+             'queries_per_request': 0},
+        ]}
+        results = [
+            {'scenario': 'anagrams', 'mode': CLIENT, 'p95_ms': 1.1, 'requests_per_second': 900,
+             'queries_per_request': 0},
+            {'scenario': 'corpus_stats', 'mode': CLIENT, 'p95_ms': 5.0, 'requests_per_second': 10,
+             'queries_per_request': 1},
+        ]
+
+        self.assertEqual([], find_regressions(results, baseline, 0.2))
+
+        results[0].update(p95_ms=1.5, queries_per_request=1)
+
+        self.assertEqual([
+            'anagrams (client): p95_ms 1.0 -> 1.5',
+            'anagrams (client): queries_per_request 0 -> 1',
+        ], find_regressions(results, baseline, 0.2))
@@ -0,0 +1,13 @@
+from django.test import SimpleTestCase
+
+from backend.anagram_searcher import grouping
+
+
+class GroupAnagramsTestCase(SimpleTestCase):
+    words = ['listen', 'Silent', 'éclair', 'Éclair', 'ΟΔΟΣ', 'οδος', 'İi', 'a', '', 'enlist', 'a', 'inlets']
+
+    def test_groups_in_order_of_first_appearance(self):
+        group_ids, canonical_forms = grouping.group_anagrams(self.words)
+
+        self.assertEqual([0, 0, 1, 1, 2, 2, 3, 4, 5, 0, 4, 0], group_ids)
+        self.assertEqual(['eilnst', 'acilré', 'δοος', 'ii\u0307', 'a', ''], canonical_forms)
@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from backend.anagram_searcher.http_cache import response_cache
+from backend.anagram_searcher.index import anagram_index
+from backend.anagram_searcher.models import AnagramGroup, Word, WordLengthCount
+from backend.anagram_searcher.tests.base import AnagramSearcherTestCase
+
+
+class HttpCacheTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+        self.word_read = Word.objects.create(word='read', canonical_form='ader')
+        self.word_dear = Word.objects.create(word='dear', canonical_form='ader')
+
+    def test_get_sends_etag_and_cache_control(self):
+        response = self.client.get('/anagrams/read/')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertEqual('max-age=0', response['Cache-Control'])
+
+    def test_get_if_none_match_returns_not_modified(self):
+        etag = self.client.get('/anagrams/read/')['ETag']
+
+        response = self.client.get('/anagrams/read/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        self.assertEqual(etag, response['ETag'])
+
+    def test_writes_change_etag(self):
+        etags = {self.client.get('/most_anagrams/')['ETag']}
+
+        self.client.post('/words/', {'words': ['dare']}, format='json')
+        etags.add(self.client.get('/most_anagrams/')['ETag'])
+
+        self.client.delete('/words/dare/')
+        etags.add(self.client.get('/most_anagrams/')['ETag'])
+
+        self.client.delete('/delete_word/read/')
+        etags.add(self.client.get('/most_anagrams/')['ETag'])
+
+        self.client.delete('/words/')
+        response = self.client.get('/most_anagrams/', HTTP_IF_NONE_MATCH=', '.join(etags))
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertNotIn(response['ETag'], etags)
+        self.assertEqual(5, len(etags | {response['ETag']}))
+
+    def test_adding_existing_words_keeps_etag(self):
+        etag = self.client.get('/anagrams/read/')['ETag']
+
+        self.client.post('/words/', {'words': ['read']}, format='json')
+
+        self.assertEqual(etag, self.client.get('/anagrams/read/')['ETag'])
+
+    def test_repeated_get_skips_view(self):
+        self.client.get('/most_anagrams/?k=1')
+
+        with mock.patch.object(anagram_index, 'get_largest_groups') as get_largest_groups:
+            response = self.client.get('/most_anagrams/?k=1')
+
+        get_largest_groups.assert_not_called()
+        self.assertEqual(['read', 'dear'], response.json()['groups'][0]['words'])
+
+        self.client.post('/words/', {'words': ['dare']}, format='json')
+
+        self.assertEqual(['read', 'dear', 'dare'], self.client.get('/most_anagrams/?k=1').json()['groups'][0]['words'])
+
+    def test_database_views_are_not_cached(self):
+        for path in ('/corpus_stats/', '/anagram_group/2/', '/async/corpus_stats/'):
+            self.assertFalse(self.client.get(path).has_header('ETag'))
+
+        # Another process adding 'dare' only shows in the database.
+        WordLengthCount.increment({4: 1}, {4: 1})
+        AnagramGroup.increment({'ader': 1}, {'ader': 1})
+
+        self.assertEqual(3, self.client.get('/corpus_stats/').json()['total_words'])
+        self.assertEqual(3, self.client.get('/async/corpus_stats/').json()['total_words'])
+
+    def test_errors_are_not_cached(self):
+        response = self.client.get('/most_anagrams/?k=0')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertFalse(response.has_header('ETag'))
+
+    @override_settings(ANAGRAM_RESPONSE_CACHE_SIZE=2)
+    def test_cache_evicts_least_recently_used(self):
+        response_cache.clear()
+
+        for path in ('/anagrams/read/', '/anagrams/dear/', '/anagrams/read/', '/most_anagrams/'):
+            self.client.get(path)
+
+        self.assertEqual(2, len(response_cache))
+
+        with mock.patch.object(anagram_index, 'get_largest_groups', return_value=[]) as get_largest_groups:
+            self.client.get('/most_anagrams/')
+            get_largest_groups.assert_not_called()
+
+            self.client.get('/most_anagrams/?include_proper_nouns=false')
+            get_largest_groups.assert_called_once()
@@ -0,0 +1,109 @@
+import threading
+from unittest import mock
+
+from django.test import TransactionTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from backend.anagram_searcher.ingest import ingest_queue
+from backend.anagram_searcher.models import AnagramGroup, Word
+
+
+@override_settings(ANAGRAM_INGEST_QUEUE=True)
+class IngestQueueTestCase(TransactionTestCase):
+    # The ingest thread writes through its own connection, so the data has to be committed.
+
+    def setUp(self):
+        Word.build_index()
+        self.client = APIClient()
+
+    def tearDown(self):
+        ingest_queue.flush(5)
+
+    def test_post_words_returns_batch(self):
+        response = self.client.post('/words/', {'words': ['read', 'dear']}, format='json')
+
+        self.assertEqual(status.HTTP_202_ACCEPTED, response.status_code)
+        self.assertEqual(f'/words/batches/{response.data["id"]}/', response['Location'])
+        self.assertEqual(2, response.data['words'])
+
+        response = self.client.get(f'{response["Location"]}?wait=5')
+
+        self.assertEqual({'id': response.data['id'], 'status': 'done', 'words': 2}, response.data)
+        self.assertEqual(['dear'], self.client.get('/anagrams/read/').data['anagrams'])
+
+    def test_unknown_batch(self):
+        response = self.client.get('/words/batches/missing/')
+
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_invalid_wait(self):
+        location = self.client.post('/words/', {'words': ['read']}, format='json')['Location']
+
+        for wait in ('abc', 'nan', 'inf', '-1'):
+            response = self.client.get(f'{location}?wait={wait}')
+
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+            self.assertIn('wait', response.data['error'])
+
+    def test_words_must_be_strings(self):
+        response = self.client.post('/words/', {'words': 'read'}, format='json')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual('words must be a list of strings', response.data['error'])
+
+    def test_queued_batches_are_stored_together(self):
+        calls = []
+        release = threading.Event()
+        add_list_of_words = Word.add_list_of_words
+
+        def add_after_release(words):
+            calls.append(words)
+            release.wait(5)
+            add_list_of_words(words)
+
+        with mock.patch.object(Word, 'add_list_of_words', side_effect=add_after_release):
+            batches = [ingest_queue.submit(words) for words in (['read'], ['dear'], ['dare', 'read'])]
+            release.set()
+
+            self.assertTrue(ingest_queue.flush(5))
+
+        self.assertLess(len(calls), 3)
+        self.assertEqual(['read', 'dear', 'dare', 'read'], [word for words in calls for word in words])
+        self.assertEqual(['done'] * 3, [batch.status for batch in batches])
+        self.assertEqual(3, AnagramGroup.objects.get(canonical_form='ader').count)
+
+    def test_failed_batch_does_not_fail_others(self):
+        release = threading.Event()
+        add_list_of_words = Word.add_list_of_words
+
+        def add_or_fail(words):
+            release.wait(5)
+
+            if 'bad' in words:
+                raise ValueError('bad word')
+
+            add_list_of_words(words)
+
+        with mock.patch.object(Word, 'add_list_of_words', side_effect=add_or_fail):
+            with self.assertLogs('backend.anagram_searcher.ingest', 'ERROR'):
+                batches = [ingest_queue.submit(words) for words in (['read'], ['bad'], ['dear'])]
+                release.set()
+                ingest_queue.flush(5)
+
+        self.assertEqual(['done', 'failed', 'done'], [batch.status for batch in batches])
+        self.assertEqual('bad word', batches[1].as_dict()['error'])
+        self.assertEqual(2, Word.objects.count())
+
+    @override_settings(ANAGRAM_INGEST_FLUSH_ON_READ=True)
+    def test_flush_on_read(self):
+        self.client.post('/words/', {'words': ['read', 'dear']}, format='json')
+
+        self.assertEqual(['dear'], self.client.get('/anagrams/read/').data['anagrams'])
+
+    def test_delete_waits_for_queued_words(self):
+        self.client.post('/words/', {'words': ['read', 'dear']}, format='json')
+        self.client.delete('/words/')
+
+        self.assertTrue(ingest_queue.flush(5))
+        self.assertEqual(0, Word.objects.count())
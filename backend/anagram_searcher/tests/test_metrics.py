@@ -0,0 +1,79 @@
+from django.test import AsyncClient, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from backend.anagram_searcher.metrics import metrics
+from backend.anagram_searcher.models import Word
+from backend.anagram_searcher.tests.base import AnagramSearcherTestCase
+
+
+@override_settings(ANAGRAM_RESPONSE_CACHE_SIZE=0)
+class MetricsTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+        Word.objects.create(word='read', canonical_form='ader')
+        Word.objects.create(word='dear', canonical_form='ader')
+        metrics.clear()
+
+    def get_metrics(self):
+        response = self.client.get('/metrics')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+        return response.content.decode()
+
+    def test_requests_are_labeled_by_view(self):
+        self.client.get('/anagrams/read/')
+        self.client.get('/anagrams/dear/')
+        self.client.get('/corpus_stats/')
+        self.client.get('/most_anagrams/?k=0')
+
+        body = self.get_metrics()
+
+        self.assertIn('anagram_requests_total{view="AnagramView",method="GET",status="200"} 2', body)
+        self.assertIn('anagram_requests_total{view="CorpusStatsView",method="GET",status="200"} 1', body)
+        self.assertIn('anagram_requests_total{view="MostAnagramsView",method="GET",status="400"} 1', body)
+        self.assertIn('anagram_request_duration_seconds_count{view="AnagramView",method="GET"} 2', body)
+        self.assertIn('anagram_index_words 2', body)
+
+    def test_db_queries_and_response_size_are_recorded(self):
+        self.client.get('/anagram_group/1/')
+        size = len(self.client.get('/anagrams/read/').content)
+
+        body = self.get_metrics()
+
+        self.assertIn('anagram_request_db_queries_sum{view="AnagramGroupView",method="GET"} 2', body)
+        self.assertIn('anagram_request_db_queries_bucket{view="AnagramView",method="GET",le="0"} 1', body)
+        self.assertIn('anagram_request_db_queries_sum{view="AnagramView",method="GET"} 0', body)
+        self.assertIn(f'anagram_response_size_bytes_sum{{view="AnagramView",method="GET"}} {size}', body)
+
+    def test_streamed_responses_are_recorded_once_sent(self):
+        response = self.client.get('/phrase_anagrams/read/')
+
+        self.assertNotIn('view="PhraseAnagramView"', self.get_metrics())
+
+        content = b''.join(response.streaming_content)
+
+        self.assertIn(
+            f'anagram_response_size_bytes_sum{{view="PhraseAnagramView",method="GET"}} {len(content)}',
+            self.get_metrics()
+        )
+
+    async def test_async_views_are_recorded(self):
+        await AsyncClient().get('/async/corpus_stats/')
+
+        body = metrics.render()
+
+        self.assertIn('anagram_requests_total{view="AsyncCorpusStatsView",method="GET",status="200"} 1', body)
+        self.assertIn('anagram_request_db_queries_sum{view="AsyncCorpusStatsView",method="GET"} 1', body)
+
+    def test_server_timing_is_optional(self):
+        self.assertFalse(self.client.get('/anagrams/read/').has_header('Server-Timing'))
+
+        with self.settings(ANAGRAM_SERVER_TIMING=True):
+            response = self.client.get('/anagram_group/1/')
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="2 queries", total;dur=[\d.]+$')
@@ -0,0 +1,141 @@
+import io
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import AsyncClient, override_settings
+from rest_framework.test import APIClient
+
+from backend.anagram_searcher.index import anagram_index
+from backend.anagram_searcher.models import Word
+from backend.anagram_searcher.shared_index import SharedIndexControl, publish_generation
+from backend.anagram_searcher.snapshot import CorpusSnapshot, write_snapshot
+from backend.anagram_searcher.tests.base import AnagramSearcherTestCase
+
+
+class SharedIndexTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'corpus.index')
+
+        settings = override_settings(ANAGRAM_SHARED_INDEX=self.path, ANAGRAM_RESPONSE_CACHE_SIZE=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        super().setUp()
+        self.client = APIClient()
+
+        Word.objects.create(word='read')
+        self.control = SharedIndexControl(self.path, create=True)
+        publish_generation(self.control)
+        Word.build_index()
+
+    def tearDown(self):
+        self.control.close()
+        anagram_index.clear()
+        self.directory.cleanup()
+
+    def get_anagrams(self, word):
+        return self.client.get(f'/anagrams/{word}/').data['anagrams']
+
+    def test_index_is_served_from_published_generation(self):
+        state = self.control.read()
+
+        self.assertEqual(1, state.generation)
+        self.assertEqual(self.path + '.1', anagram_index.snapshot.path)
+        self.assertEqual(f'{state.epoch:x}.1', anagram_index.version)
+
+    def test_writes_of_other_processes_are_picked_up(self):
+        # Written by another worker: stored and counted, but not in this process's index.
+        Word.objects.bulk_create([Word.build('dear'), Word.build('dare')])
+        self.control.count_write()
+
+        self.assertEqual([], self.get_anagrams('read'))
+
+        publish_generation(self.control)
+
+        self.assertEqual(['dear', 'dare'], self.get_anagrams('read'))
+        self.assertEqual(self.path + '.2', anagram_index.snapshot.path)
+
+    def test_local_writes_are_kept_until_published(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/words/', {'words': ['dear']}, format='json')
+
+        self.assertEqual(1, self.control.read().requested_write)
+
+        # A generation published before the owner saw the write does not replace the local index.
+        write_snapshot(self.control.generation_path(2), [])
+        self.control.publish(2, 0)
+
+        self.assertEqual(['dear'], self.get_anagrams('read'))
+        self.assertEqual(self.path + '.1', anagram_index.snapshot.path)
+
+        publish_generation(self.control)
+
+        self.assertEqual(['dear'], self.get_anagrams('read'))
+        self.assertEqual(self.path + '.3', anagram_index.snapshot.path)
+
+    def test_search_structures_follow_generations(self):
+        self.assertEqual(['read'], self.client.get('/pattern/r%3Fad/').data['words'])
+
+        Word.objects.bulk_create([Word.build('dear'), Word.build('ride')])
+        self.control.count_write()
+        publish_generation(self.control)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/words/', {'words': ['dare', 'reads']}, format='json')
+
+        self.assertFalse(anagram_index.has_group_sizes)
+        self.assertEqual(
+            [{'canonical_form': 'ader', 'count': 3, 'words': ['read', 'dear', 'dare']}],
+            self.client.get('/most_anagrams/?k=1').data['groups']
+        )
+        self.assertEqual(['dare'], self.client.get('/pattern/d%3Fre/').data['words'])
+        self.assertEqual(['reads'], self.client.get('/near_anagrams/read/').data['added']['s'])
+
+    async def test_async_most_anagrams_buckets_groups_in_thread(self):
+        build_group_sizes = anagram_index.build_group_sizes
+        threads = []
+
+        def build():
+            threads.append(threading.get_ident())
+            build_group_sizes()
+
+        self.assertFalse(anagram_index.has_group_sizes)
+
+        with mock.patch.object(anagram_index, 'build_group_sizes', side_effect=build):
+            response = await AsyncClient().get('/async/most_anagrams/?k=1')
+
+        self.assertNotEqual(threading.get_ident(), threads[0])
+        self.assertEqual([{'canonical_form': 'ader', 'count': 1, 'words': ['read']}], response.json()['groups'])
+
+    def test_snapshot_stays_mapped_while_read(self):
+        snapshot = CorpusSnapshot(self.control.generation_path(1))
+
+        with snapshot.reading():
+            snapshot.close()
+
+            self.assertEqual({'read': False}, snapshot.get_group('ader'))
+
+        with self.assertRaises(ValueError):
+            snapshot.get_group('ader')
+
+    def test_old_generations_are_removed(self):
+        for _ in range(4):
+            publish_generation(self.control)
+
+        self.assertEqual(
+            ['corpus.index', 'corpus.index.3', 'corpus.index.4', 'corpus.index.5'],
+            sorted(os.listdir(self.directory.name))
+        )
+
+    def test_serve_shared_index_once(self):
+        out = io.StringIO()
+
+        call_command('serve_shared_index', self.path, once=True, stdout=out)
+        Word.build_index()
+
+        self.assertIn('Published generation 2 with 1 words', out.getvalue())
+        self.assertEqual(self.path + '.2', anagram_index.snapshot.path)
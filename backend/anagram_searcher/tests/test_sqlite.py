@@ -0,0 +1,49 @@
+import os
+import sqlite3
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase
+
+from backend.anagram_searcher.sqlite.base import DatabaseWrapper
+
+
+class SqliteBackendTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'db.sqlite3')
+
+    def get_connection(self, **options):
+        settings_dict = {**connection.settings_dict, 'NAME': self.path, 'OPTIONS': options}
+        wrapper = DatabaseWrapper(settings_dict, alias='tuned')
+        self.addCleanup(wrapper.close)
+
+        return wrapper
+
+    def test_pragmas_are_set_on_new_connections(self):
+        wrapper = self.get_connection(timeout=1, pragmas={'journal_mode': 'WAL', 'synchronous': 'NORMAL'})
+
+        with wrapper.cursor() as cursor:
+            self.assertEqual(('wal',), cursor.execute('PRAGMA journal_mode').fetchone())
+            self.assertEqual((1,), cursor.execute('PRAGMA synchronous').fetchone())
+
+    def test_immediate_transactions_take_the_write_lock(self):
+        wrapper = self.get_connection(transaction_mode='IMMEDIATE')
+        other = sqlite3.connect(self.path, timeout=0)
+        self.addCleanup(other.close)
+
+        wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+            other.execute('BEGIN IMMEDIATE')
+
+        wrapper.rollback()
+        other.execute('BEGIN IMMEDIATE')
+
+    def test_unknown_transaction_mode_is_rejected(self):
+        wrapper = self.get_connection(transaction_mode='LAZY')
+
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
@@ -0,0 +1,117 @@
+from unittest import mock
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from backend.anagram_searcher.index import anagram_index
+from backend.anagram_searcher.models import Word
+from backend.anagram_searcher.startup_benchmark import parse_import_times
+from backend.anagram_searcher.tests.base import AnagramSearcherTestCase
+
+
+class DeferredIndexTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+        Word.objects.bulk_create([Word.build('read'), Word.build('dear')])
+
+    def tearDown(self):
+        anagram_index.clear()
+
+    def test_index_is_loaded_on_first_use(self):
+        loader = mock.Mock(wraps=Word.build_index)
+        anagram_index.defer(loader)
+
+        loader.assert_not_called()
+        self.assertEqual(['dear'], self.client.get('/anagrams/read/').data['anagrams'])
+        self.assertEqual(['read'], self.client.get('/anagrams/dear/').data['anagrams'])
+        loader.assert_called_once()
+
+    def test_words_added_before_loading_are_kept(self):
+        anagram_index.defer(Word.build_index)
+
+        self.client.post('/words/', {'words': ['dare']}, format='json')
+
+        self.assertEqual(['dear', 'dare'], self.client.get('/anagrams/read/').data['anagrams'])
+
+    def test_failed_load_is_retried(self):
+        loader = mock.Mock(side_effect=[OperationalError('database is locked'), None])
+        anagram_index.defer(loader)
+
+        with self.assertRaises(OperationalError):
+            anagram_index.get_anagrams('ader')
+
+        anagram_index.get_anagrams('ader')
+        anagram_index.get_anagrams('ader')
+
+        self.assertEqual(2, loader.call_count)
+
+    def test_loader_runs_once(self):
+        loader = mock.Mock()
+        anagram_index.defer(loader)
+
+        anagram_index.load()
+        anagram_index.load()
+
+        loader.assert_called_once_with()
+
+
+class IndexBuildSettingTestCase(AnagramSearcherTestCase):
+    def tearDown(self):
+        Word.build_index()
+
+    def ready(self):
+        apps.get_app_config('anagram_searcher').ready()
+
+    @override_settings(ANAGRAM_INDEX_BUILD='lazy')
+    def test_lazy_build_defers_index(self):
+        Word.objects.create(word='read')
+
+        with mock.patch.object(anagram_index, 'defer') as defer:
+            self.ready()
+
+        defer.assert_called_once_with(Word.build_index)
+
+    @override_settings(ANAGRAM_INDEX_BUILD='background')
+    def test_background_build_loads_index_in_thread(self):
+        with mock.patch.object(anagram_index, 'defer'), mock.patch('threading.Thread') as thread:
+            self.ready()
+
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once_with()
+
+    def test_database_commands_do_not_build_index(self):
+        argv = ['manage.py', 'load_words_from_file', 'dictionary.txt']
+
+        with mock.patch('sys.argv', argv), mock.patch.object(Word, 'build_index') as build_index, \
+                mock.patch.object(anagram_index, 'disable') as disable:
+            self.ready()
+
+        build_index.assert_not_called()
+        disable.assert_called_once_with()
+
+    @override_settings(ANAGRAM_INDEX_BUILD='eager')
+    def test_invalid_build_mode(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "got 'eager'"):
+            self.ready()
+
+
+class ParseImportTimesTestCase(AnagramSearcherTestCase):
+    def test_parse_import_times(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       177 |        177 |   _io\n'
+            'import time:       374 |       1040 | _frozen_importlib_external\n'
+            'Traceback is ignored\n'
+            'import time:      1150 |      42159 |     asgiref.sync\n'
+        )
+
+        imports = parse_import_times(output)
+
+        self.assertEqual(['_io', '_frozen_importlib_external', 'asgiref.sync'], [i.module for i in imports])
+        self.assertEqual([1, 0, 2], [i.depth for i in imports])
+        self.assertEqual((1150, 42159), (imports[2].self_us, imports[2].cumulative_us))
@@ -1,13 +1,25 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from unittest import mock
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from backend.anagram_searcher.index import anagram_index
+from backend.anagram_searcher.letter_counts import LetterCountIndex
 from backend.anagram_searcher.models import Word
+from backend.anagram_searcher.patterns import PatternIndex
+from backend.anagram_searcher.tests.base import AnagramSearcherTestCase
 
 
-class WordsViewTestCase(TestCase):
+def read_ndjson(response):
+    return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+
+class WordsViewTestCase(AnagramSearcherTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
 
         self.word = Word.objects.create(word='read', canonical_form='ader')
@@ -23,6 +35,20 @@ class WordsViewTestCase(TestCase):
         self.assertEqual(status.HTTP_201_CREATED, response.status_code)
         self.assertEqual(3, Word.objects.all().count())
 
+    def test_create_words_stores_canonical_form_and_key(self):
+        self.client.post('/words/', {'words': ['Dear']}, format='json')
+
+        word = Word.objects.get(word='Dear')
+
+        self.assertEqual(self.word.canonical_form, word.canonical_form)
+        self.assertEqual(self.word.canonical_key, word.canonical_key)
+
+    def test_create_words_classifies_proper_nouns(self):
+        self.client.post('/words/', {'words': ['Dear', 'dare']}, format='json')
+
+        self.assertEqual(['Dear'], list(Word.objects.filter(is_proper_noun=True).values_list('word', flat=True)))
+        self.assertFalse(self.word.is_proper_noun)
+
     def test_create_words_no_words_passed(self):
         data = {
             'words': []
@@ -38,11 +64,13 @@ class WordsViewTestCase(TestCase):
         response = self.client.delete('/words/')
 
         self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+        self.assertEqual('1', response['X-Words-Deleted'])
         self.assertEqual(0, Word.objects.all().count())
 
 
-class WordsDetailViewTestCase(TestCase):
+class WordsDetailViewTestCase(AnagramSearcherTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
 
         self.word = Word.objects.create(word='read', canonical_form='ader')
@@ -53,11 +81,28 @@ class WordsDetailViewTestCase(TestCase):
         response = self.client.delete(f'/words/{self.word.word}/')
 
         self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+        self.assertEqual('1', response['X-Words-Deleted'])
         self.assertEqual(0, Word.objects.all().count())
 
+    def test_delete_words(self):
+        Word.add_list_of_words(['dear', 'dare', 'book'])
+
+        self.assertEqual(2, Word.delete_words(Word.objects.filter(word__startswith='d')))
+        self.assertEqual(['read', 'book'], list(Word.objects.order_by('id').values_list('word', flat=True)))
+        self.assertEqual([], self.client.get('/anagrams/read/').data['anagrams'])
+        self.assertEqual(2, self.client.get('/corpus_stats/').data['total_words'])
 
-class AnagramViewTestCase(TestCase):
+    def test_delete_missing_word(self):
+        response = self.client.delete('/words/missing/')
+
+        self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+        self.assertEqual('0', response['X-Words-Deleted'])
+        self.assertEqual(1, Word.objects.all().count())
+
+
+class AnagramViewTestCase(AnagramSearcherTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
 
         self.word_read = Word.objects.create(word='read', canonical_form='ader')
@@ -88,9 +133,353 @@ class AnagramViewTestCase(TestCase):
         self.assertIn(self.word_dare.word, response.data['anagrams'])
         self.assertNotIn(self.word_dear.word, response.data['anagrams'])
 
+    def test_get_anagram_mixed_case_word(self):
+        response = self.client.get('/anagrams/DARE/?include_proper_nouns=true')
+
+        self.assertEqual([self.word_read.word, self.word_dare.word, self.word_dear.word], response.data['anagrams'])
+
+    def test_get_anagram_does_not_query_database(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/anagrams/{self.word_read.word}/?limit=5')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual([self.word_dare.word], response.data['anagrams'])
+
+    def test_get_anagram_stream_ndjson(self):
+        response = self.client.get('/anagrams/read/?stream=ndjson&include_proper_nouns=true')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('application/x-ndjson', response['Content-Type'])
+        self.assertEqual([{'word': 'dare'}, {'word': 'Dear'}], read_ndjson(response))
+
+    def test_get_anagram_reflects_added_and_deleted_words(self):
+        self.client.post('/words/', {'words': ['ared']}, format='json')
+        self.client.delete(f'/words/{self.word_dare.word}/')
+
+        response = self.client.get(f'/anagrams/{self.word_read.word}/')
+
+        self.assertEqual(['ared'], response.data['anagrams'])
+
+        self.client.delete(f'/delete_word/{self.word_read.word}/')
+
+        response = self.client.get('/anagrams/ared/?include_proper_nouns=true')
+
+        self.assertEqual([], response.data['anagrams'])
+
+
+class BulkAnagramViewTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+        Word.add_list_of_words(['read', 'dare', 'Ared', 'book', 'cat', 'act', 'tac'])
+
+    def test_bulk_anagrams_match_single_lookups(self):
+        words = ['read', 'cat', 'book', 'missing']
+
+        with self.assertNumQueries(0):
+            response = self.client.post('/anagrams/', {'words': words, 'limit': 1}, format='json')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        for word in words:
+            single = self.client.get(f'/anagrams/{word}/?limit=1')
+            self.assertEqual(single.data['anagrams'], response.data['anagrams'][word])
+
+    def test_bulk_anagrams_include_proper_nouns(self):
+        data = {'words': ['read'], 'include_proper_nouns': True}
+        response = self.client.post('/anagrams/', data, format='json')
+
+        self.assertEqual(['dare', 'Ared'], response.data['anagrams']['read'])
+
+    def test_bulk_anagrams_invalid_limit(self):
+        for limit in (-1, 'x'):
+            response = self.client.post('/anagrams/', {'words': ['read'], 'limit': limit}, format='json')
+
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+            self.assertIn('limit', response.data['error'])
+
+    def test_bulk_anagrams_no_words_passed(self):
+        response = self.client.post('/anagrams/', {'words': []}, format='json')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual('No words provided', response.data['error'])
+
+
+class SubAnagramViewTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+        Word.add_list_of_words(['read', 'dare', 'red', 'ad', 'a', 'Ed', 'book', 'readd'])
+
+    def test_get_sub_anagrams_longest_first(self):
+        response = self.client.get('/sub_anagrams/erad/')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(['read', 'dare', 'red', 'ad', 'a'], response.data['words'])
+
+    def test_get_sub_anagrams_min_length_limit_and_proper_nouns(self):
+        response = self.client.get('/sub_anagrams/ERAD/?min_length=2&limit=4&include_proper_nouns=true')
+
+        self.assertEqual(['read', 'dare', 'red', 'ad'], response.data['words'])
+
+        response = self.client.get('/sub_anagrams/de/?include_proper_nouns=true')
+
+        self.assertEqual(['Ed'], response.data['words'])
+
+    def test_get_sub_anagrams_invalid_limit_and_min_length(self):
+        for query in ('limit=-1', 'limit=x', 'min_length=0', 'min_length=x'):
+            response = self.client.get(f'/sub_anagrams/erad/?{query}')
+
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+            self.assertIn(query.split('=')[0], response.data['error'])
+
+    def test_get_sub_anagrams_follows_added_and_deleted_words(self):
+        self.client.get('/sub_anagrams/erad/')
+        self.client.post('/words/', {'words': ['are', 'era']}, format='json')
+        self.client.delete('/delete_word/red/')
+
+        response = self.client.get('/sub_anagrams/erad/?min_length=3')
+
+        self.assertEqual(['read', 'dare', 'are', 'era'], response.data['words'])
+
+    def test_get_sub_anagrams_keeps_words_written_while_building(self):
+        build = LetterCountIndex.build
+
+        def build_after_write(letter_counts, canonical_forms):
+            anagram_index.add([('are', 'aer', False)])
+            anagram_index.remove_words([('red', 'der')])
+            build(letter_counts, canonical_forms)
+
+        with mock.patch.object(LetterCountIndex, 'build', build_after_write):
+            response = self.client.get('/sub_anagrams/erad/?min_length=3')
+
+        self.assertEqual(['read', 'dare', 'are'], response.data['words'])
+
+
+class NearAnagramViewTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+        Word.add_list_of_words(['read', 'dare', 'red', 'are', 'ear', 'Rae', 'dear', 'dears', 'reads', 'bread', 'book'])
+
+    def test_get_near_anagrams_by_letter(self):
+        response = self.client.get('/near_anagrams/Dear/')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual({
+            'added': {'b': ['bread'], 's': ['dears', 'reads']},
+            'removed': {'a': ['red'], 'd': ['are', 'ear']},
+        }, response.data)
+
+    def test_get_near_anagrams_limit_and_proper_nouns(self):
+        response = self.client.get('/near_anagrams/dare/?limit=1&include_proper_nouns=true')
+
+        self.assertEqual({'b': ['bread'], 's': ['dears']}, response.data['added'])
+        self.assertEqual({'a': ['red'], 'd': ['are']}, response.data['removed'])
+
+        response = self.client.get('/near_anagrams/er/?include_proper_nouns=true')
+
+        self.assertEqual({'a': ['are', 'ear', 'Rae'], 'd': ['red']}, response.data['added'])
+
+    def test_get_near_anagrams_invalid_limit(self):
+        for query in ('limit=-1', 'limit=x'):
+            response = self.client.get(f'/near_anagrams/dare/?{query}')
+
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+            self.assertIn('limit', response.data['error'])
+
+    def test_get_near_anagrams_follows_added_and_deleted_words(self):
+        self.client.get('/near_anagrams/read/')
+        self.client.post('/words/', {'words': ['adder', 'Zeda']}, format='json')
+        self.client.delete('/delete_word/reads/')
+
+        response = self.client.get('/near_anagrams/read/')
+
+        self.assertEqual({'b': ['bread'], 'd': ['adder']}, response.data['added'])
+
+    def test_get_near_anagrams_without_neighbours(self):
+        response = self.client.get('/near_anagrams/xyz/')
+
+        self.assertEqual({'added': {}, 'removed': {}}, response.data)
+
+    def test_get_near_anagrams_ignores_hyphens(self):
+        # Hyphenated words are proper nouns.
+        self.client.post('/words/', {'words': ['re-ad', 'bre-ad']}, format='json')
+
+        response = self.client.get('/near_anagrams/read/?include_proper_nouns=true')
+
+        self.assertEqual({'b': ['bread'], 's': ['dears', 'reads']}, response.data['added'])
+        self.assertEqual({'a': ['red'], 'd': ['are', 'ear', 'Rae']}, response.data['removed'])
+
+        response = self.client.get('/near_anagrams/re-ad/?include_proper_nouns=true')
+
+        self.assertEqual({'b': ['bre-ad']}, response.data['added'])
+        self.assertEqual({}, response.data['removed'])
+
+
+class PatternViewTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+        Word.add_list_of_words([
+            'read', 'road', 'reed', 'Reid', 'dear', 'bear', 'ear', 'linear', 'rebar', 'dare', 'bread'
+        ])
+
+    def test_single_letter_wildcards(self):
+        response = self.client.get('/pattern/r%3Fad/')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(['read', 'road'], response.data['words'])
+
+        response = self.client.get('/pattern/R..D/?include_proper_nouns=true')
+
+        self.assertEqual(['read', 'reed', 'Reid', 'road'], response.data['words'])
+
+    def test_any_letters(self):
+        self.assertEqual(['ear', 'bear', 'dear', 'linear'], self.client.get('/pattern/*ear/').data['words'])
+        self.assertEqual(['bear', 'bread'], self.client.get('/pattern/*b*r*/?limit=2').data['words'])
+        self.assertEqual(['bear', 'bread', 'rebar'], self.client.get('/pattern/*b*r*/').data['words'])
+        self.assertEqual(['bread'], self.client.get('/pattern/b*e*d/').data['words'])
+
+    def test_pattern_follows_added_and_deleted_words(self):
+        self.client.get('/pattern/*ear/')
+        self.client.post('/words/', {'words': ['tear', 'Lear']}, format='json')
+        self.client.delete('/delete_word/bear/')
+
+        response = self.client.get('/pattern/%3Fear/?include_proper_nouns=true')
+
+        self.assertEqual(['Lear', 'tear', 'dear'], response.data['words'])
+
+    def test_pattern_index_is_built_without_holding_the_index_lock(self):
+        build = PatternIndex.build
+        lookups = []
+
+        def lookup_and_write():
+            lookups.append(anagram_index.get_anagrams('ader'))
+            anagram_index.add([('tear', 'aert', False)])
+            anagram_index.remove_words([('bear', 'aber')])
+
+        def build_while_other_thread_writes(patterns, words):
+            thread = threading.Thread(target=lookup_and_write)
+            thread.start()
+            thread.join(5)
+            build(patterns, words)
+
+        with mock.patch.object(PatternIndex, 'build', build_while_other_thread_writes):
+            response = self.client.get('/pattern/%3Fear/')
+
+        self.assertEqual([['read', 'dear', 'dare']], lookups)
+        self.assertEqual(['tear', 'dear'], response.data['words'])
+
+    def test_blank_tile_anagrams(self):
+        response = self.client.get('/pattern/re%3Fd/?anagrams=true')
+
+        self.assertEqual(['read', 'dear', 'dare', 'reed'], response.data['words'])
+
+        response = self.client.get('/pattern/..ed/?anagrams=true&include_proper_nouns=true&limit=5')
+
+        self.assertEqual(['read', 'dear', 'dare', 'reed', 'Reid'], response.data['words'])
+
+    def test_blank_tile_anagrams_ignore_hyphens(self):
+        self.client.post('/words/', {'words': ['re-ad', 're-a']}, format='json')
+
+        response = self.client.get('/pattern/rea%3F/?anagrams=true&include_proper_nouns=true')
+
+        self.assertEqual(['bear', 'read', 'dear', 'dare'], response.data['words'])
+
+    def test_invalid_limit(self):
+        for query in ('limit=-2', 'limit=x', 'anagrams=true&limit=-2'):
+            response = self.client.get(f'/pattern/r.ad/?{query}')
+
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+            self.assertIn('limit', response.data['error'])
+
+    def test_blank_tile_anagrams_are_limited(self):
+        response = self.client.get('/pattern/re*d/?anagrams=true')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+        response = self.client.get('/pattern/r..../?anagrams=true')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual('At most 3 blanks are supported', response.data['error'])
+
+
+class PhraseAnagramViewTestCase(AnagramSearcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+        Word.add_list_of_words(['dormitory', 'dirty', 'room', 'moor', 'dirt', 'yo', 'my', 'riot', 'dory', 'rot'])
+
+    def _get_lines(self, url):
+        response = self.client.get(url)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('application/x-ndjson', response['Content-Type'])
+
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_get_phrase_anagrams(self):
+        lines = self._get_lines('/phrase_anagrams/dormitory/')
+
+        self.assertEqual([
+            {'words': ['dirty', 'room']},
+            {'words': ['dirty', 'moor']},
+        ], lines[:-1])
+        self.assertEqual({'status': 'complete', 'results': 2}, lines[-1])
+
+    def test_get_phrase_anagrams_max_words_and_max_results(self):
+        lines = self._get_lines('/phrase_anagrams/dirty%20room/?max_words=2&max_results=1')
+
+        self.assertEqual([{'words': ['dormitory']}, {'status': 'max_results', 'results': 1}], lines)
+
+    def test_get_phrase_anagrams_invalid_parameters(self):
+        queries = (
+            'max_results=0', 'max_results=-1', 'max_results=all', 'max_words=abc', 'max_words=0', 'min_length=x',
+            'time_budget_ms=-1', 'time_budget_ms=1.5'
+        )
+
+        for query in queries:
+            response = self.client.get(f'/phrase_anagrams/dormitory/?{query}')
+
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+            self.assertIn(query.split('=')[0], response.data['error'])
+
+    def test_get_phrase_anagrams_phrase_length_is_limited(self):
+        response = self.client.get(f'/phrase_anagrams/{"dormitory" * 5}/')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual('At most 40 letters are supported', response.data['error'])
+
+    def test_get_phrase_anagrams_time_budget(self):
+        lines = self._get_lines('/phrase_anagrams/dormitory/?time_budget_ms=0')
+
+        self.assertEqual({'status': 'timeout', 'results': 0}, lines[-1])
+
+    def test_get_phrase_anagrams_reads_groups_within_time_budget(self):
+        def slow_groups(*args, **kwargs):
+            time.sleep(0.02)
+            yield 'dmoiorrty', ['dormitory']
+
+        with mock.patch.object(anagram_index, 'iter_sub_anagram_groups', side_effect=slow_groups):
+            lines = self._get_lines('/phrase_anagrams/dirty%20room/?time_budget_ms=10')
+
+        self.assertEqual([{'status': 'timeout', 'results': 0}], lines)
+
+    def test_get_phrase_anagrams_no_letters(self):
+        response = self.client.get('/phrase_anagrams/123/')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
 
-class CorpusStatsViewTestCase(TestCase):
+class CorpusStatsViewTestCase(AnagramSearcherTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
 
         self.word_a = Word.objects.create(word='a', canonical_form='a')
@@ -121,9 +510,73 @@ class CorpusStatsViewTestCase(TestCase):
         self.assertEqual(10 / 4, response.data['average_length'])
         self.assertEqual(2.5, response.data['median_length'])
 
+    def test_get_corpus_stats_follows_added_and_deleted_words(self):
+        self.client.post('/words/', {'words': ['cat', 'act', 'tac', 'elephant']}, format='json')
+        self.client.delete(f'/words/{self.word_a.word}/')
+        self.client.delete(f'/delete_word/{self.word_book.word}/')
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/corpus_stats/')
+
+        self.assertEqual(4, response.data['total_words'])
+        self.assertEqual(3, response.data['min_length'])
+        self.assertEqual(8, response.data['max_length'])
+        self.assertEqual(17 / 4, response.data['average_length'])
+        self.assertEqual(3, response.data['median_length'])
+
+    def test_get_corpus_stats_empty_corpus(self):
+        self.client.delete('/words/')
+
+        response = self.client.get('/corpus_stats/')
+
+        self.assertEqual(0, response.data['total_words'])
+        self.assertIsNone(response.data['min_length'])
+        self.assertEqual(0, response.data['median_length'])
+
+    def test_get_corpus_stats_without_proper_nouns(self):
+        self.client.post('/words/', {'words': ['Elephant']}, format='json')
+
+        response = self.client.get('/corpus_stats/?include_proper_nouns=false')
+
+        self.assertEqual(3, response.data['total_words'])
+        self.assertEqual(4, response.data['max_length'])
+
+        self.client.delete('/words/Elephant/')
+        self.client.delete(f'/words/{self.word_book.word}/')
+
+        response = self.client.get('/corpus_stats/?include_proper_nouns=false')
+
+        self.assertEqual(2, response.data['total_words'])
+        self.assertEqual(3, response.data['max_length'])
+
+    def test_saved_words_get_their_canonical_form(self):
+        word = Word.objects.create(word='read', canonical_form='zzz')
+
+        self.assertEqual(('ader', 'ader'), (word.canonical_form, Word.objects.get(pk=word.pk).canonical_form))
+
+        self.word_cat.word = 'dog'
+        self.word_cat.save()
+
+        self.assertEqual('dgo', Word.objects.get(pk=self.word_cat.pk).canonical_form)
+        self.assertEqual(['dog'], self.client.get('/anagrams/god/').data['anagrams'])
+        self.assertEqual([], self.client.get('/anagrams/tac/').data['anagrams'])
+
+    def test_get_corpus_stats_follows_updated_words(self):
+        self.word_cat.word = 'Cat'
+        self.word_cat.save()
+
+        response = self.client.get('/corpus_stats/?include_proper_nouns=false')
+
+        self.assertEqual(2, response.data['total_words'])
+        self.assertEqual(2.5, response.data['median_length'])
+        self.assertEqual(3, self.client.get('/corpus_stats/').data['total_words'])
+        self.assertEqual(['Cat'], self.client.get('/anagrams/tac/?include_proper_nouns=true').data['anagrams'])
+        self.assertEqual([], self.client.get('/anagrams/tac/').data['anagrams'])
+
 
-class MostAnagramsViewTestCase(TestCase):
+class MostAnagramsViewTestCase(AnagramSearcherTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
 
         self.word_read = Word.objects.create(word='read', canonical_form='ader')
@@ -141,9 +594,76 @@ class MostAnagramsViewTestCase(TestCase):
         self.assertIn(self.word_dare.word, response.data['words'])
         self.assertIn(self.word_dear.word, response.data['words'])
 
+    def test_get_most_anagrams_top_k(self):
+        self.client.post('/words/', {'words': ['cat', 'act']}, format='json')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/most_anagrams/?k=2')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual([
+            {'canonical_form': 'ader', 'count': 3, 'words': ['read', 'dare', 'dear']},
+            {'canonical_form': 'act', 'count': 2, 'words': ['cat', 'act']},
+        ], response.data['groups'])
+
+    def test_get_most_anagrams_stream_ndjson(self):
+        self.client.post('/words/', {'words': ['cat', 'act']}, format='json')
+
+        response = self.client.get('/most_anagrams/?k=2&stream=ndjson')
+
+        self.assertEqual([
+            {'canonical_form': 'ader', 'count': 3, 'words': ['read', 'dare', 'dear']},
+            {'canonical_form': 'act', 'count': 2, 'words': ['cat', 'act']},
+        ], read_ndjson(response))
+
+        response = self.client.get('/most_anagrams/?stream=ndjson')
+
+        self.assertEqual(
+            [{'canonical_form': 'ader', 'count': 3, 'words': ['read', 'dare', 'dear']}], read_ndjson(response)
+        )
+
+        response = self.client.get('/most_anagrams/?k=0&stream=ndjson')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_get_most_anagrams_follows_deleted_words(self):
+        self.client.post('/words/', {'words': ['cat', 'act']}, format='json')
+        self.client.delete(f'/words/{self.word_read.word}/')
+        self.client.delete(f'/words/{self.word_dare.word}/')
+
+        response = self.client.get('/most_anagrams/')
 
-class CheckAnagramsViewTestCase(TestCase):
+        self.assertEqual(['cat', 'act'], response.data['words'])
+
+    def test_get_most_anagrams_without_proper_nouns(self):
+        self.client.post('/words/', {'words': ['cat', 'act', 'tac', 'Dear', 'Ared']}, format='json')
+        self.client.delete(f'/words/{self.word_dear.word}/')
+
+        response = self.client.get('/most_anagrams/')
+
+        self.assertEqual(['read', 'dare', 'Dear', 'Ared'], response.data['words'])
+
+        response = self.client.get('/most_anagrams/?include_proper_nouns=false')
+
+        self.assertEqual(['cat', 'act', 'tac'], response.data['words'])
+
+        response = self.client.get('/most_anagrams/?k=2&include_proper_nouns=false')
+
+        self.assertEqual([
+            {'canonical_form': 'act', 'count': 3, 'words': ['cat', 'act', 'tac']},
+            {'canonical_form': 'ader', 'count': 2, 'words': ['read', 'dare']},
+        ], response.data['groups'])
+
+    def test_get_most_anagrams_invalid_k(self):
+        response = self.client.get('/most_anagrams/?k=0')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual('k must be a positive integer', response.data['error'])
+
+
+class CheckAnagramsViewTestCase(AnagramSearcherTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
 
     def test_check_anagrams_returns_true(self):
@@ -156,6 +676,14 @@ class CheckAnagramsViewTestCase(TestCase):
 
         self.assertTrue(response.data['are_anagrams'])
 
+    def test_check_anagrams_ignores_case(self):
+        data = {
+            'words': ['Read', 'dEAr']
+        }
+        response = self.client.post('/check_anagrams/', data, format='json')
+
+        self.assertTrue(response.data['are_anagrams'])
+
     def test_check_anagrams_returns_false(self):
         data = {
             'words': ['read', 'book']
@@ -174,9 +702,34 @@ class CheckAnagramsViewTestCase(TestCase):
         self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
         self.assertEqual('No words provided', response.data['error'])
 
+    def test_check_anagrams_groups(self):
+        Word.add_list_of_words(['listen', 'Silent', 'book'])
+
+        data = {'words': ['listen', 'book', 'silent', 'Enlist', 'kobo', 'cat'], 'groups': True, 'in_corpus': True}
+        response = self.client.post('/check_anagrams/', data, format='json')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual({
+            'are_anagrams': False,
+            'group_ids': [0, 1, 0, 0, 1, 2],
+            'groups': [
+                {'id': 0, 'canonical_form': 'eilnst', 'size': 3, 'words': ['listen', 'silent', 'Enlist']},
+                {'id': 1, 'canonical_form': 'bkoo', 'size': 2, 'words': ['book', 'kobo']},
+                {'id': 2, 'canonical_form': 'act', 'size': 1, 'words': ['cat']},
+            ],
+            'in_corpus': [True, True, False, False, False, False],
+        }, response.data)
+
+    def test_check_anagrams_groups_words_must_be_strings(self):
+        response = self.client.post('/check_anagrams/', {'words': ['read', 1], 'groups': True}, format='json')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual('words must be a list of strings', response.data['error'])
+
 
-class AnagramGroupViewTestCase(TestCase):
+class AnagramGroupViewTestCase(AnagramSearcherTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
 
         self.word_read = Word.objects.create(word='read', canonical_form='ader')
@@ -209,9 +762,99 @@ class AnagramGroupViewTestCase(TestCase):
         self.assertIn(self.word_dare.word, response.data[self.word_read.canonical_form])
         self.assertIn(self.word_dear.word, response.data[self.word_read.canonical_form])
 
+    def test_get_anagrams_group_runs_two_queries(self):
+        self.client.post('/words/', {'words': ['cat', 'act', 'tab', 'bat']}, format='json')
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/anagram_group/2/')
+
+        self.assertEqual(3, len(response.data))
+
+    def test_get_anagrams_group_paginated(self):
+        self.client.post('/words/', {'words': ['cat', 'act']}, format='json')
+
+        response = self.client.get('/anagram_group/1/?limit=2')
+
+        self.assertEqual({'bkoo': ['book'], 'act': ['cat', 'act']}, response.data)
+        self.assertIn('offset=2', response['Link'])
+
+        response = self.client.get('/anagram_group/1/?limit=2&offset=2')
 
-class DeleteWordViewTestCase(TestCase):
+        self.assertEqual({'ader': ['read', 'dare', 'dear']}, response.data)
+        self.assertFalse(response.has_header('Link'))
+
+    def test_get_anagrams_group_without_proper_nouns(self):
+        self.client.post('/words/', {'words': ['Bat', 'tab', 'Book']}, format='json')
+
+        response = self.client.get('/anagram_group/2/?include_proper_nouns=false&limit=1')
+
+        self.assertEqual({'ader': ['read', 'dare', 'dear']}, response.data)
+        self.assertIn('include_proper_nouns=false', response['Link'])
+
+        response = self.client.get('/anagram_group/1/?include_proper_nouns=false')
+
+        self.assertEqual({'abt': ['tab'], 'bkoo': ['book'], 'ader': ['read', 'dare', 'dear']}, response.data)
+
+    def test_get_anagrams_group_stream_ndjson(self):
+        self.client.post('/words/', {'words': ['cat', 'act', 'tab', 'Bat']}, format='json')
+
+        with mock.patch('backend.anagram_searcher.views.LOOKUP_BATCH_SIZE', 1):
+            response = self.client.get('/anagram_group/2/?stream=ndjson&include_proper_nouns=false')
+
+            self.assertEqual('application/x-ndjson', response['Content-Type'])
+
+            # One query for the groups, then one per chunk of groups (of one here) for their members.
+            with self.assertNumQueries(3):
+                lines = read_ndjson(response)
+
+        self.assertEqual([
+            {'canonical_form': 'act', 'words': ['cat', 'act']},
+            {'canonical_form': 'ader', 'words': ['read', 'dare', 'dear']},
+        ], lines)
+
+        response = self.client.get('/anagram_group/1/?stream=ndjson&limit=2&offset=1')
+
+        self.assertEqual(['abt', 'act'], [line['canonical_form'] for line in read_ndjson(response)])
+
+    def test_get_anagrams_group_follows_deleted_words(self):
+        self.client.delete(f'/words/{self.word_dare.word}/')
+        self.client.delete(f'/words/{self.word_dear.word}/')
+
+        response = self.client.get('/anagram_group/2/')
+
+        self.assertEqual({}, response.data)
+
+    def test_get_anagrams_group_tolerates_groups_written_between_queries(self):
+        filter_words = Word.objects.filter
+
+        def filter_after_write(*args, **kwargs):
+            if 'canonical_form__in' in kwargs:
+                # Another request adds a group once the page of groups has been read.
+                Word.add_list_of_words(['cat', 'act'])
+
+            return filter_words(*args, **kwargs)
+
+        with mock.patch.object(Word.objects, 'filter', side_effect=filter_after_write):
+            response = self.client.get('/anagram_group/1/')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual({'bkoo': ['book'], 'ader': ['read', 'dare', 'dear']}, response.data)
+
+    def test_get_anagrams_group_invalid_limit_and_offset(self):
+        for query in ('limit=-1', 'limit=two', 'offset=-1'):
+            response = self.client.get(f'/anagram_group/1/?{query}')
+
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+        response = self.client.get('/anagram_group/1/?limit=0')
+
+        self.assertEqual({}, response.data)
+        self.assertFalse(response.has_header('Link'))
+
+
+class DeleteWordViewTestCase(AnagramSearcherTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
 
         self.word_read = Word.objects.create(word='read', canonical_form='ader')
@@ -219,6 +862,12 @@ class DeleteWordViewTestCase(TestCase):
         self.word_dear = Word.objects.create(word='dear', canonical_form='ader')
         self.word_book = Word.objects.create(word='book', canonical_form='bkoo')
 
+    def test_delete_word_mixed_case(self):
+        response = self.client.delete('/delete_word/DEAR/')
+
+        self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+        self.assertEqual(['book'], list(Word.objects.values_list('word', flat=True)))
+
     def test_delete_word_deletes_all_anagrams(self):
         self.assertEqual(4, Word.objects.all().count())
 
@@ -227,6 +876,7 @@ class DeleteWordViewTestCase(TestCase):
         response = self.client.delete(f'/delete_word/{self.word_read.word}/')
 
         self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+        self.assertEqual('3', response['X-Words-Deleted'])
 
         self.assertEqual(1, Word.objects.all().count())
         self.assertEqual(0, Word.objects.filter(canonical_form=anagram).count())
@@ -1,11 +1,33 @@
-from django.db.models import Count, Min, Max, Avg, Q
-from django.db.models.functions import Length
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from backend.anagram_searcher.models import Word
-from backend.anagram_searcher.serializers import AnagramSerializer
+from backend.anagram_searcher.canonical import get_canonical_form
+from backend.anagram_searcher.grouping import describe_anagram_classes
+from backend.anagram_searcher.http_cache import CachedGetMixin
+from backend.anagram_searcher.index import anagram_index
+from backend.anagram_searcher.ingest import ingest_queue
+from backend.anagram_searcher.metrics import metrics
+from backend.anagram_searcher.models import LOOKUP_BATCH_SIZE, AnagramGroup, Word, WordLengthCount
+from backend.anagram_searcher.phrases import PhraseAnagramSolver
+from backend.anagram_searcher.serializers import (
+    AnagramGroupQuerySerializer, AnagramSerializer, IngestBatchQuerySerializer, LimitSerializer,
+    PhraseAnagramQuerySerializer, SubAnagramQuerySerializer
+)
+
+
+def wants_ndjson(request):
+    return request.query_params.get('stream') == 'ndjson'
+
+
+def ndjson_response(objects):
+    """Stream ``objects`` as newline-delimited JSON, each serialized only when the client is ready for it."""
+    return StreamingHttpResponse((json.dumps(obj) + '\n' for obj in objects), content_type='application/x-ndjson')
 
 
 class WordsView(APIView):
@@ -15,78 +37,270 @@ class WordsView(APIView):
         if not words:
             return Response({'error': 'No words provided'}, status.HTTP_400_BAD_REQUEST)
 
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            return Response({'error': 'words must be a list of strings'}, status.HTTP_400_BAD_REQUEST)
+
+        if settings.ANAGRAM_INGEST_QUEUE:
+            batch = ingest_queue.submit(words)
+
+            return Response(
+                batch.as_dict(), status=status.HTTP_202_ACCEPTED, headers={'Location': f'/words/batches/{batch.id}/'}
+            )
+
         Word.add_list_of_words(words)
 
         return Response(status=status.HTTP_201_CREATED)
 
     def delete(self, request, format=None):
-        Word.objects.all().delete()
+        # Deletes apply to every word accepted before them, queued or not.
+        ingest_queue.flush()
+        deleted = Word.delete_all_words()
+
+        return Response(status=status.HTTP_204_NO_CONTENT, headers={'X-Words-Deleted': str(deleted)})
+
+
+class IngestBatchView(APIView):
+    MAX_WAIT = 30
+
+    def get(self, request, batch_id, format=None):
+        batch = ingest_queue.get(batch_id)
+
+        if batch is None:
+            return Response({'error': 'Unknown batch'}, status.HTTP_404_NOT_FOUND)
 
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        query = IngestBatchQuerySerializer(data=request.query_params)
+
+        if not query.is_valid():
+            return Response({'error': query.errors}, status.HTTP_400_BAD_REQUEST)
+
+        wait = query.validated_data.get('wait')
+
+        if wait is not None:
+            # Read-your-writes: answer once the batch is written, or when the wait runs out.
+            batch.wait(min(wait, self.MAX_WAIT))
+
+        return Response(batch.as_dict())
 
 
 class WordsDetailView(APIView):
     def delete(self, request, word, format=None):
-        Word.objects.filter(word=word).delete()
+        ingest_queue.flush()
+        deleted = Word.delete_word(word)
 
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(status=status.HTTP_204_NO_CONTENT, headers={'X-Words-Deleted': str(deleted)})
 
 
-class AnagramView(APIView):
+class AnagramView(CachedGetMixin, APIView):
     def get(self, request, word, format=None):
-        limit = int(request.query_params.get('limit', Word.objects.all().count()))
+        limit = request.query_params.get('limit')
         include_proper_nouns = request.query_params.get('include_proper_nouns', 'false').lower() == 'true'
 
-        f = Q(canonical_form=''.join(sorted(word)))
+        anagrams = anagram_index.get_anagrams(
+            get_canonical_form(word),
+            exclude=word,
+            include_proper_nouns=include_proper_nouns,
+            limit=int(limit) if limit is not None else None
+        )
 
-        if not include_proper_nouns:
-            f &= Q(word__regex=r'^[a-z]+$')
+        if wants_ndjson(request):
+            return ndjson_response({'word': anagram} for anagram in anagrams)
+
+        return Response(AnagramSerializer(anagrams).data)
+
+
+class BulkAnagramView(APIView):
+    def post(self, request, format=None):
+        words = request.data.get('words')
+
+        if not words:
+            return Response({'error': 'No words provided'}, status.HTTP_400_BAD_REQUEST)
+
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            return Response({'error': 'words must be a list of strings'}, status.HTTP_400_BAD_REQUEST)
+
+        query = LimitSerializer(data=request.data)
+
+        if not query.is_valid():
+            return Response({'error': query.errors}, status.HTTP_400_BAD_REQUEST)
 
-        return Response(
-            AnagramSerializer(Word.objects.filter(f).exclude(word=word).values_list('word', flat=True)[:limit]).data
+        include_proper_nouns = str(request.data.get('include_proper_nouns', 'false')).lower() == 'true'
+
+        anagrams = anagram_index.get_anagrams_of_words(
+            ((word, get_canonical_form(word)) for word in words),
+            include_proper_nouns=include_proper_nouns,
+            limit=query.validated_data.get('limit')
         )
 
+        return Response(AnagramSerializer(anagrams).data)
 
-class CorpusStatsView(APIView):
-    def get(self, request):
-        total_words = Word.objects.count()
-        word_length_stats = Word.objects.aggregate(
-            min_length=Min(Length('word')),
-            max_length=Max(Length('word')),
-            average_length=Avg(Length('word'))
+
+class SubAnagramView(CachedGetMixin, APIView):
+    def get(self, request, letters, format=None):
+        query = SubAnagramQuerySerializer(data=request.query_params)
+
+        if not query.is_valid():
+            return Response({'error': query.errors}, status.HTTP_400_BAD_REQUEST)
+
+        include_proper_nouns = request.query_params.get('include_proper_nouns', 'false').lower() == 'true'
+
+        words = anagram_index.get_sub_anagrams(
+            letters.lower(),
+            min_length=query.validated_data['min_length'],
+            include_proper_nouns=include_proper_nouns,
+            limit=query.validated_data.get('limit')
+        )
+
+        return Response({'words': words})
+
+
+class NearAnagramView(CachedGetMixin, APIView):
+    def get(self, request, word, format=None):
+        query = LimitSerializer(data=request.query_params)
+
+        if not query.is_valid():
+            return Response({'error': query.errors}, status.HTTP_400_BAD_REQUEST)
+
+        include_proper_nouns = request.query_params.get('include_proper_nouns', 'false').lower() == 'true'
+
+        added, removed = anagram_index.get_near_anagrams(
+            get_canonical_form(word),
+            include_proper_nouns=include_proper_nouns,
+            limit=query.validated_data.get('limit')
+        )
+
+        return Response({'added': added, 'removed': removed})
+
+
+class PatternView(CachedGetMixin, APIView):
+    MAX_BLANKS = 3
+
+    def get(self, request, pattern, format=None):
+        query = LimitSerializer(data=request.query_params)
+
+        if not query.is_valid():
+            return Response({'error': query.errors}, status.HTTP_400_BAD_REQUEST)
+
+        limit = query.validated_data.get('limit')
+        include_proper_nouns = request.query_params.get('include_proper_nouns', 'false').lower() == 'true'
+        # '?' has to be sent as %3F in a URL, '.' is accepted in its place.
+        pattern = pattern.lower().replace('.', '?')
+
+        if request.query_params.get('anagrams', 'false').lower() != 'true':
+            words = anagram_index.get_pattern_matches(pattern, include_proper_nouns=include_proper_nouns, limit=limit)
+
+            return Response({'words': words})
+
+        if '*' in pattern:
+            return Response({'error': '* is not supported in anagram searches'}, status.HTTP_400_BAD_REQUEST)
+
+        blanks = pattern.count('?')
+
+        if blanks > self.MAX_BLANKS:
+            return Response({'error': f'At most {self.MAX_BLANKS} blanks are supported'}, status.HTTP_400_BAD_REQUEST)
+
+        words = anagram_index.get_blank_anagrams(
+            get_canonical_form(pattern.replace('?', '')),
+            blanks,
+            include_proper_nouns=include_proper_nouns,
+            limit=limit
+        )
+
+        return Response({'words': words})
+
+
+class PhraseAnagramView(APIView):
+    # Longer phrases fit most of the corpus, finding the candidates alone would hold the index lock too long.
+    MAX_LETTERS = 40
+    MAX_WORDS = 6
+    MAX_RESULTS = 10000
+    MAX_TIME_BUDGET_MS = 10000
+
+    def get(self, request, phrase, format=None):
+        letters = ''.join(letter for letter in phrase.lower() if letter.isalpha())
+
+        if not letters:
+            return Response({'error': 'No letters provided'}, status.HTTP_400_BAD_REQUEST)
+
+        if len(letters) > self.MAX_LETTERS:
+            return Response(
+                {'error': f'At most {self.MAX_LETTERS} letters are supported'}, status.HTTP_400_BAD_REQUEST
+            )
+
+        query = PhraseAnagramQuerySerializer(data=request.query_params)
+
+        if not query.is_valid():
+            return Response({'error': query.errors}, status.HTTP_400_BAD_REQUEST)
+
+        params = query.validated_data
+        include_proper_nouns = request.query_params.get('include_proper_nouns', 'false').lower() == 'true'
+
+        # The groups are read by the solver, within its time budget.
+        solver = PhraseAnagramSolver(
+            letters,
+            anagram_index.iter_sub_anagram_groups(
+                letters, min_length=params['min_length'], include_proper_nouns=include_proper_nouns
+            ),
+            max_words=min(params['max_words'], self.MAX_WORDS),
+            max_results=min(params['max_results'], self.MAX_RESULTS),
+            time_budget=min(params['time_budget_ms'], self.MAX_TIME_BUDGET_MS) / 1000,
+            exclude=phrase.lower().split()
         )
-        word_lengths = list(Word.objects.annotate(length=Length('word')).values_list('length', flat=True))
 
-        if not word_lengths:
-            median_length = 0
+        return StreamingHttpResponse(self._stream(solver), content_type='application/x-ndjson')
+
+    @staticmethod
+    def _stream(solver):
+        for words in solver.solve():
+            yield json.dumps({'words': words}) + '\n'
+
+        if solver.timed_out:
+            result = 'timeout'
+        elif solver.results >= solver.max_results:
+            result = 'max_results'
         else:
-            word_lengths.sort()
-            mid_index = len(word_lengths) // 2
+            result = 'complete'
 
-            if len(word_lengths) % 2 != 0:
-                median_length = word_lengths[mid_index]
-            else:
-                median_length = (word_lengths[mid_index - 1] + word_lengths[mid_index]) / 2
+        yield json.dumps({'status': result, 'results': solver.results}) + '\n'
+
+
+class CorpusStatsView(APIView):
+    def get(self, request):
+        include_proper_nouns = request.query_params.get('include_proper_nouns', 'true').lower() == 'true'
 
-        stats = {
-            'total_words': total_words,
-            'min_length': word_length_stats['min_length'],
-            'max_length': word_length_stats['max_length'],
-            'average_length': word_length_stats['average_length'],
-            'median_length': median_length,
-        }
-        return Response(stats, status=status.HTTP_200_OK)
+        return Response(WordLengthCount.get_stats(include_proper_nouns), status=status.HTTP_200_OK)
 
 
-class MostAnagramsView(APIView):
+class MostAnagramsView(CachedGetMixin, APIView):
     def get(self, request):
-        anagram_counts = Word.objects.values('canonical_form').annotate(count=Count('id')).order_by('-count')
-        max_anagrams = anagram_counts[0]['count'] if anagram_counts else 0
-        words_with_most_anagrams = Word.objects.filter(
-            canonical_form__in=[item['canonical_form'] for item in anagram_counts if item['count'] == max_anagrams]
-        ).values_list('word', flat=True)
+        k = request.query_params.get('k')
+        include_proper_nouns = request.query_params.get('include_proper_nouns', 'true').lower() == 'true'
+
+        if k is not None and (not k.isdigit() or int(k) < 1):
+            return Response({'error': 'k must be a positive integer'}, status.HTTP_400_BAD_REQUEST)
+
+        if wants_ndjson(request):
+            return ndjson_response(
+                {'canonical_form': canonical_form, 'count': len(group), 'words': group}
+                for canonical_form, group in anagram_index.get_largest_groups(
+                    int(k) if k is not None else None, include_proper_nouns
+                )
+            )
+
+        if k is None:
+            words = [
+                word
+                for _, group in anagram_index.get_largest_groups(include_proper_nouns=include_proper_nouns)
+                for word in group
+            ]
 
-        return Response({'words': words_with_most_anagrams}, status=status.HTTP_200_OK)
+            return Response({'words': words}, status=status.HTTP_200_OK)
+
+        groups = [
+            {'canonical_form': canonical_form, 'count': len(group), 'words': group}
+            for canonical_form, group in anagram_index.get_largest_groups(int(k), include_proper_nouns)
+        ]
+
+        return Response({'groups': groups}, status=status.HTTP_200_OK)
 
 
 class CheckAnagramsView(APIView):
@@ -96,24 +310,91 @@ class CheckAnagramsView(APIView):
         if not words:
             return Response({'error': 'No words provided'}, status.HTTP_400_BAD_REQUEST)
 
-        canonical_forms = {''.join(sorted(word)) for word in words}
+        if str(request.data.get('groups', 'false')).lower() != 'true':
+            canonical_forms = {get_canonical_form(word) for word in words}
+
+            return Response({'are_anagrams': len(canonical_forms) == 1})
 
-        return Response({'are_anagrams': len(canonical_forms) == 1})
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            return Response({'error': 'words must be a list of strings'}, status.HTTP_400_BAD_REQUEST)
+
+        in_corpus = str(request.data.get('in_corpus', 'false')).lower() == 'true'
+
+        return Response(describe_anagram_classes(words, in_corpus))
 
 
 class AnagramGroupView(APIView):
     def get(self, request, size, format=None):
-        anagram_groups = Word.objects.values('canonical_form').annotate(count=Count('id')).filter(count__gte=size)
-        groups = {
-            group['canonical_form']: list(Word.objects.filter(
-                canonical_form=group['canonical_form']).values_list('word', flat=True)) for group in anagram_groups
-        }
+        query = AnagramGroupQuerySerializer(data=request.query_params)
+
+        if not query.is_valid():
+            return Response({'error': query.errors}, status.HTTP_400_BAD_REQUEST)
+
+        limit = query.validated_data.get('limit')
+        offset = query.validated_data['offset']
+        include_proper_nouns = request.query_params.get('include_proper_nouns', 'true').lower() == 'true'
+        count_field = AnagramGroup.count_field(include_proper_nouns)
+
+        page = AnagramGroup.objects.filter(**{f'{count_field}__gte': size}).order_by(count_field, 'canonical_form')[
+            offset:offset + limit if limit is not None else None
+        ]
+
+        if wants_ndjson(request):
+            return ndjson_response(
+                self._stream_groups(page.values_list('canonical_form', flat=True), include_proper_nouns)
+            )
 
-        return Response(groups)
+        canonical_forms = list(page.values_list('canonical_form', flat=True))
+        groups = self._add_members(canonical_forms, page.values('canonical_form'), include_proper_nouns)
+        response = Response(groups)
+
+        if limit and len(canonical_forms) == limit:
+            query = request.query_params.copy()
+            query['offset'] = offset + limit
+            next_page = request.build_absolute_uri(f'?{query.urlencode()}')
+            response['Link'] = f'<{next_page}>; rel="next"'
+
+        return response
+
+    @staticmethod
+    def _add_members(canonical_forms, members_of, include_proper_nouns):
+        """
+        Map each of ``canonical_forms`` to its words, read from the groups ``members_of`` (a list or a subquery).
+
+        The groups and their members are separate queries, so words written in between are tolerated: members of
+        groups outside the page are skipped, and groups left without members are dropped.
+        """
+        groups = {canonical_form: [] for canonical_form in canonical_forms}
+        members = Word.objects.filter(canonical_form__in=members_of).order_by('id')
+
+        if not include_proper_nouns:
+            members = members.filter(is_proper_noun=False)
+
+        for canonical_form, word in members.values_list('canonical_form', 'word'):
+            if canonical_form in groups:
+                groups[canonical_form].append(word)
+
+        return {canonical_form: words for canonical_form, words in groups.items() if words}
+
+    def _stream_groups(self, canonical_forms, include_proper_nouns):
+        # Groups are read with a server-side cursor and their members fetched one chunk of groups at a time.
+        canonical_forms = canonical_forms.iterator(chunk_size=LOOKUP_BATCH_SIZE)
+
+        while chunk := list(islice(canonical_forms, LOOKUP_BATCH_SIZE)):
+            groups = self._add_members(chunk, chunk, include_proper_nouns)
+
+            for canonical_form, words in groups.items():
+                yield {'canonical_form': canonical_form, 'words': words}
 
 
 class DeleteWordView(APIView):
     def delete(self, request, word, format=None):
-        Word.objects.filter(canonical_form=''.join(sorted(word))).delete()
+        ingest_queue.flush()
+        deleted = Word.delete_anagram_group(get_canonical_form(word))
+
+        return Response(status=status.HTTP_204_NO_CONTENT, headers={'X-Words-Deleted': str(deleted)})
+
 
-        return Response(status=status.HTTP_204_NO_CONTENT)
+class MetricsView(APIView):
+    def get(self, request, format=None):
+        return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
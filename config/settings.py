@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,6 +51,9 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'backend.anagram_searcher.metrics.MetricsMiddleware',
+    'backend.anagram_searcher.ingest.FlushIngestMiddleware',
+    'backend.anagram_searcher.shared_index.SharedIndexMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -131,3 +135,37 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Anagram searcher
+
+# Corpus snapshot written by `manage.py dump_corpus_snapshot`. When the file exists, workers memory-map it
+# instead of loading the anagram index from the database.
+ANAGRAM_INDEX_SNAPSHOT = os.environ.get('ANAGRAM_INDEX_SNAPSHOT')
+
+# Rendered GET responses kept per process, keyed on the request and the corpus version (0 disables the cache).
+ANAGRAM_RESPONSE_CACHE_SIZE = 1024
+
+# Cache-Control max-age of GET responses. With 0 clients revalidate every time and get a 304 until the corpus changes.
+ANAGRAM_CACHE_MAX_AGE = 0
+
+# Send a Server-Timing header with the SQL and total time of each request (metrics are collected either way).
+ANAGRAM_SERVER_TIMING = os.environ.get('ANAGRAM_SERVER_TIMING', '').lower() == 'true'
+
+# Queue `POST /words/` for a background thread that stores many requests in one transaction, answering 202 with a
+# batch id instead of 201.
+ANAGRAM_INGEST_QUEUE = os.environ.get('ANAGRAM_INGEST_QUEUE', '').lower() == 'true'
+
+# Most words the ingest thread stores in one transaction (a single larger request is stored whole).
+ANAGRAM_INGEST_BATCH_SIZE = 10000
+
+# Make GET requests wait until queued words are stored.
+ANAGRAM_INGEST_FLUSH_ON_READ = os.environ.get('ANAGRAM_INGEST_FLUSH_ON_READ', '').lower() == 'true'
+
+# When the in-memory index is built: "startup" before the app serves requests, "lazy" on first use, or "background" in
+# a thread started at startup. Requests that need the index wait for the build in every mode.
+ANAGRAM_INDEX_BUILD = os.environ.get('ANAGRAM_INDEX_BUILD', 'startup').lower()
+
+# Control file of an index published by `manage.py serve_shared_index`. Workers serve the latest published generation
+# from shared memory instead of holding their own copy of the corpus.
+ANAGRAM_SHARED_INDEX = os.environ.get('ANAGRAM_SHARED_INDEX')
@@ -0,0 +1,37 @@
+"""
+API-only settings for serving workers: ``DJANGO_SETTINGS_MODULE=config.settings_api``.
+
+The production settings without the admin, auth, sessions, messages and the middleware serving them, none of which
+the anagram endpoints use, and with the index built in the background so a worker accepts requests right away.
+Run migrations and management commands with the production settings.
+"""
+
+import os
+
+from config.settings_production import *
+
+INSTALLED_APPS = [
+    'backend.anagram_searcher',
+]
+
+MIDDLEWARE = [
+    'backend.anagram_searcher.metrics.MetricsMiddleware',
+    'backend.anagram_searcher.ingest.FlushIngestMiddleware',
+    'backend.anagram_searcher.shared_index.SharedIndexMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+TEMPLATES = []
+
+AUTH_PASSWORD_VALIDATORS = []
+
+REST_FRAMEWORK = {
+    # Without django.contrib.auth requests have no user, and only JSON is rendered (no browsable API).
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
+
+ANAGRAM_INDEX_BUILD = os.environ.get('ANAGRAM_INDEX_BUILD', 'background').lower()
@@ -0,0 +1,55 @@
+"""
+Production settings: ``DJANGO_SETTINGS_MODULE=config.settings_production``.
+
+The database is SQLite tuned for concurrent readers and writers, or PostgreSQL when ``POSTGRES_DB`` is set.
+"""
+
+import os
+
+from config.settings import *
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+DEBUG = os.environ.get('DJANGO_DEBUG', '').lower() == 'true'
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',') if host]
+
+# Connections are kept for this many seconds instead of being opened for every request.
+CONN_MAX_AGE = int(os.environ.get('DJANGO_CONN_MAX_AGE', 600))
+
+if os.environ.get('POSTGRES_DB'):
+    # Needs `pip install psycopg`. Words are then loaded with COPY, see `Word.add_list_of_words`.
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ['POSTGRES_DB'],
+            'USER': os.environ.get('POSTGRES_USER', ''),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', ''),
+            'PORT': os.environ.get('POSTGRES_PORT', ''),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'backend.anagram_searcher.sqlite',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Write transactions queue on the lock for up to the busy timeout instead of failing.
+                'transaction_mode': 'IMMEDIATE',
+                'pragmas': {
+                    # Readers keep reading while a writer commits.
+                    'journal_mode': 'WAL',
+                    # With WAL, commits survive a crash of the process but not of the machine, without an fsync each.
+                    'synchronous': 'NORMAL',
+                    'busy_timeout': 20000,
+                    'mmap_size': 256 * 1024 * 1024,
+                    'temp_store': 'MEMORY',
+                },
+            },
+        }
+    }
@@ -14,22 +14,38 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.apps import apps
 from django.contrib import admin
 from django.urls import path
 from rest_framework.urlpatterns import format_suffix_patterns
 
+from backend.anagram_searcher.async_views import *
 from backend.anagram_searcher.views import *
 
 urlpatterns = [
     path('words/', WordsView.as_view()),
+    path('words/batches/<str:batch_id>/', IngestBatchView.as_view()),
     path('words/<str:word>/', WordsDetailView.as_view()),
+    path('anagrams/', BulkAnagramView.as_view()),
     path('anagrams/<str:word>/', AnagramView.as_view()),
+    path('sub_anagrams/<str:letters>/', SubAnagramView.as_view()),
+    path('near_anagrams/<str:word>/', NearAnagramView.as_view()),
+    path('pattern/<str:pattern>/', PatternView.as_view()),
+    path('phrase_anagrams/<str:phrase>/', PhraseAnagramView.as_view()),
     path('corpus_stats/', CorpusStatsView.as_view()),
     path('most_anagrams/', MostAnagramsView.as_view()),
     path('check_anagrams/', CheckAnagramsView.as_view()),
     path('anagram_group/<int:size>/', AnagramGroupView.as_view()),
     path('delete_word/<str:word>/', DeleteWordView.as_view()),
-    path('admin/', admin.site.urls),
+    path('async/anagrams/', AsyncBulkAnagramView.as_view()),
+    path('async/anagrams/<str:word>/', AsyncAnagramView.as_view()),
+    path('async/corpus_stats/', AsyncCorpusStatsView.as_view()),
+    path('async/most_anagrams/', AsyncMostAnagramsView.as_view()),
+    path('async/check_anagrams/', AsyncCheckAnagramsView.as_view()),
+    path('metrics', MetricsView.as_view()),
 ]
 
+if apps.is_installed('django.contrib.admin'):
+    urlpatterns.append(path('admin/', admin.site.urls))
+
 urlpatterns = format_suffix_patterns(urlpatterns)